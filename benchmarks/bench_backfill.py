@@ -0,0 +1,112 @@
+# benchmarks/bench_backfill.py
+"""Benchmark: backfilling PairCreated logs with one eth_getLogs call vs parallel chunked calls.
+
+Needs a local dev node with unlocked accounts (anvil or hardhat) and the
+UniswapV2Factory build artifact from @uniswap/v2-core (build/UniswapV2Factory.json).
+Thousands of synthetic pairs are created against random token addresses, which
+createPair accepts since it never calls the tokens.
+
+Run from the project root:
+    anvil --gas-limit 100000000 &
+    python -m benchmarks.bench_backfill --artifact node_modules/@uniswap/v2-core/build/UniswapV2Factory.json
+"""
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+from utils.monitor import PAIR_CREATED_TOPIC, decode_pair_created, get_logs_chunked
+
+CREATE_PAIR = "c9c65396"  # createPair(address,address)
+CREATE_PAIR_GAS = 3_000_000
+
+
+def rpc(provider, method, params):
+    response = provider.make_request(method, params)
+    if 'error' in response:
+        raise RuntimeError(f"{method} failed: {response['error']}")
+    return response['result']
+
+
+def wait_for_receipt(provider, tx_hash):
+    while True:
+        receipt = rpc(provider, 'eth_getTransactionReceipt', [tx_hash])
+        if receipt is not None:
+            return receipt
+        time.sleep(0.05)
+
+
+def deploy_factory(provider, account, artifact_path):
+    """Deploy UniswapV2Factory(feeToSetter=account) from its build artifact."""
+    with open(artifact_path) as f:
+        artifact = json.load(f)
+    bytecode = artifact.get('bytecode') or artifact['evm']['bytecode']['object']
+    bytecode = bytecode[2:] if bytecode.startswith('0x') else bytecode
+    tx_hash = rpc(provider, 'eth_sendTransaction', [{
+        'from': account, 'data': '0x' + bytecode + '0' * 24 + account[2:].lower(), 'gas': hex(6_000_000)}])
+    return wait_for_receipt(provider, tx_hash)['contractAddress']
+
+
+def create_pairs(provider, account, factory, count, per_block, seed=1):
+    """Create `count` pairs of random token addresses, `per_block` pairs per mined block."""
+    rng = random.Random(seed)
+    rpc(provider, 'evm_setAutomine', [False])
+    try:
+        for created in range(0, count, per_block):
+            for _ in range(min(per_block, count - created)):
+                token_a, token_b = ('%040x' % rng.getrandbits(160) for _ in range(2))
+                rpc(provider, 'eth_sendTransaction', [{
+                    'from': account, 'to': factory, 'gas': hex(CREATE_PAIR_GAS),
+                    'data': '0x' + CREATE_PAIR + '0' * 24 + token_a + '0' * 24 + token_b}])
+            rpc(provider, 'evm_mine', [])
+    finally:
+        rpc(provider, 'evm_setAutomine', [True])
+
+
+def bench(label, fetch, repeat):
+    """Time a backfill, keeping the best of `repeat` runs, and return (seconds, pairs decoded)."""
+    best, pairs = float('inf'), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pairs = len([decode_pair_created(log, 'Uniswap', 'ETH') for log in fetch()])
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<36} {best * 1000:9.1f} ms  {pairs:7,} pairs  {pairs / best:10,.0f} pairs/s")
+    return best, pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rpc-url', default='http://127.0.0.1:8545')
+    parser.add_argument('--artifact', required=True, help="path to UniswapV2Factory.json")
+    parser.add_argument('--pairs', type=int, default=5000)
+    parser.add_argument('--pairs-per-block', type=int, default=5)
+    parser.add_argument('--chunks', type=int, nargs='+', default=[100, 250, 500])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    provider = Web3.HTTPProvider(args.rpc_url, request_kwargs={'timeout': 60})
+    account = rpc(provider, 'eth_accounts', [])[0]
+    factory = deploy_factory(provider, account, args.artifact)
+    first_block = int(rpc(provider, 'eth_blockNumber', []), 16) + 1
+    start = time.perf_counter()
+    create_pairs(provider, account, factory, args.pairs, args.pairs_per_block)
+    last_block = int(rpc(provider, 'eth_blockNumber', []), 16)
+    print(f"Created {args.pairs:,} pairs over blocks {first_block}-{last_block} "
+          f"in {time.perf_counter() - start:.1f}s (factory {factory})\n")
+
+    log_filter = {'address': factory, 'topics': [PAIR_CREATED_TOPIC]}
+    span = last_block - first_block + 1
+    baseline, expected = bench("single eth_getLogs", lambda: get_logs_chunked(
+        provider, log_filter, first_block, last_block, span), args.repeat)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        for chunk in args.chunks:
+            seconds, pairs = bench(f"{chunk}-block chunks x{args.workers} workers", lambda: get_logs_chunked(
+                provider, log_filter, first_block, last_block, chunk, executor), args.repeat)
+            assert pairs == expected, f"chunked backfill returned {pairs} pairs, expected {expected}"
+            print(f"{'':<36} speedup {baseline / seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_decode.py
+"""Microbenchmark: raw PairCreated decoding vs web3's contract.events.PairCreated path.
+
+Run from the project root:  python -m benchmarks.bench_decode [--logs 20000]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from config import WRAPPED_NATIVE
+from utils.monitor import Monitoring, PAIR_CREATED_TOPIC, decode_pair_created
+
+FACTORY_ADDRESS = "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f"
+ABI_PATH = os.path.join(os.path.dirname(__file__), '..', 'abis', 'uniswap-v2-factory.abi.json')
+
+
+def random_word(rng, address=False):
+    """Return a random 32-byte hex word, optionally left-padded like an address."""
+    if address:
+        return '0x' + '0' * 24 + '%040x' % rng.getrandbits(160)
+    return '0x' + '%064x' % rng.getrandbits(256)
+
+
+def synthetic_logs(count, seed=1):
+    """Build raw JSON-RPC PairCreated logs as a node would return them."""
+    rng = random.Random(seed)
+    weth_topic = '0x' + '0' * 24 + WRAPPED_NATIVE['ETH'][2:].lower()  # New tokens are listed against WETH
+    logs = []
+    for i in range(count):
+        logs.append({
+            'address': FACTORY_ADDRESS.lower(),
+            'topics': [PAIR_CREATED_TOPIC, random_word(rng, True), weth_topic],
+            'data': random_word(rng, True) + '%064x' % (i + 1),
+            'blockNumber': hex(19_000_000 + i // 10),
+            'blockHash': random_word(rng),
+            'transactionHash': random_word(rng),
+            'transactionIndex': hex(i % 200),
+            'logIndex': hex(i % 500),
+            'removed': False,
+        })
+    return logs
+
+
+def web3_formatted(log):
+    """Apply the formatting web3 does to every log before contract events see it."""
+    return AttributeDict({
+        'address': Web3.to_checksum_address(log['address']),
+        'topics': [HexBytes(topic) for topic in log['topics']],
+        'data': HexBytes(log['data']),
+        'blockNumber': int(log['blockNumber'], 16),
+        'blockHash': HexBytes(log['blockHash']),
+        'transactionHash': HexBytes(log['transactionHash']),
+        'transactionIndex': int(log['transactionIndex'], 16),
+        'logIndex': int(log['logIndex'], 16),
+        'removed': log['removed'],
+    })
+
+
+class Unseen(OrderedDict):
+    """Seen-pairs map that never matches, so every repeat decodes every log in full."""
+
+    def __contains__(self, item):
+        return False
+
+
+def bench(label, fn, logs, repeat):
+    """Time fn over every log, keeping the best of `repeat` runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for log in logs:
+            fn(log)
+        best = min(best, time.perf_counter() - start)
+    per_log_us = best / len(logs) * 1e6
+    print(f"{label:<28} {per_log_us:8.2f} us/log  {len(logs) / best:12,.0f} logs/s")
+    return per_log_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logs', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(ABI_PATH) as abi_file:
+        abi = json.load(abi_file)
+    pair_event = Web3().eth.contract(address=FACTORY_ADDRESS, abi=abi).events.PairCreated()
+    # A bare monitor is enough for process_event: no connections, reserve tracking or dedupe
+    monitor = Monitoring.__new__(Monitoring)
+    monitor.reserves = {}
+    monitor._seen_pairs = Unseen()
+    logs = synthetic_logs(args.logs)
+
+    # Sanity check: both paths must agree on every field
+    for log in logs[:100]:
+        fast = decode_pair_created(log, 'Uniswap', 'ETH')
+        decoded = pair_event.process_log(web3_formatted(log))['args']
+        assert (fast.token0, fast.token1, fast.pair) == tuple(
+            address.lower() for address in (decoded.token0, decoded.token1, decoded.pair))
+
+    logging.disable(logging.CRITICAL)  # Time decoding, not the per-pair log line
+    slow = bench("contract.events.PairCreated", lambda log: monitor.process_event(
+        pair_event.process_log(web3_formatted(log)), 'Uniswap', 'ETH'), logs, args.repeat)
+    fast = bench("raw topic/data decode", lambda log: monitor.process_event(log, 'Uniswap', 'ETH'), logs, args.repeat)
+    print(f"speedup: {slow / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+# benchmarks/bench_e2e.py
+"""Benchmark: end-to-end detection -> analysis -> buy against a local anvil chain.
+
+Starts anvil (unless --rpc-url points at a running node) and deploys WETH9,
+UniswapV2Factory and UniswapV2Router02 from the @uniswap/v2-core and
+@uniswap/v2-periphery build artifacts. WETH and the router are then placed at
+the mainnet addresses the bot is configured with (anvil_setCode), so the bot
+runs unmodified. Each burst launches N fresh ERC20 tokens with
+router.addLiquidityETH in a single block; this creates each pair and seeds its
+reserves. The real Monitoring -> sniper pipeline (analyze_token, simulation
+screen, sizing, swap template buy) then processes them with anvil's default
+account 0 as the bot wallet.
+
+Reported per run: detection latency (block mined -> PairCreated log handled),
+analysis time, mined -> buy broadcast, pairs per second through the pipeline
+and the buy success rate (token balance in the wallet after the buys are mined).
+Results are written as JSON; pass --baseline to diff against an earlier run.
+
+Run from the project root:
+    npm install @uniswap/v2-core @uniswap/v2-periphery
+    python -m benchmarks.bench_e2e --core node_modules/@uniswap/v2-core/build \\
+        --periphery node_modules/@uniswap/v2-periphery/build --bursts 5 --pairs 20
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import numpy as np
+
+# Anvil's default account 0; the bot trades from it
+BOT_ADDRESS = "0xf39Fd6e51aad88F6F4ce6aB8827279cffFb92266"
+BOT_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+APPROVE = "095ea7b3"  # approve(address,uint256)
+ADD_LIQUIDITY_ETH = "f305d719"  # addLiquidityETH(address,uint256,uint256,uint256,address,uint256)
+BALANCE_OF = "70a08231"  # balanceOf(address)
+TOKEN_SUPPLY = 10**27
+MAX_UINT = 2**256 - 1
+
+
+def word(value):
+    if isinstance(value, str):
+        return '0' * 24 + value[2:].lower()
+    return '%064x' % value
+
+
+def configure_environment(rpc_url, ws_url, buy_eth):
+    """Point the bot's configuration at the local node; set before any bot module is imported.
+
+    Values are forced rather than defaulted so a .env with real keys or
+    mainnet endpoints is never used by the benchmark.
+    """
+    os.environ.update({
+        'WALLET_ADDRESS': BOT_ADDRESS, 'PRIVATE_KEY': BOT_KEY,
+        'ETHERSCAN_API_KEY': 'bench', 'BSCSCAN_API_KEY': 'bench', 'SOLANA_RPC_URL': '', 'CHAINS': 'ETH',
+        'INFURA_URL': rpc_url, 'INFURA_PROJECT_ID': '', 'ETH_RPC_URLS': rpc_url,
+        'BSC_NODE_URL': rpc_url, 'BSC_RPC_URLS': rpc_url,
+        'ETH_WS_URL': ws_url or '', 'BSC_WS_URL': '',
+        'ETH_BROADCAST_URLS': '', 'BSC_BROADCAST_URLS': '',
+        'ETH_SIMULATION_URL': rpc_url, 'BSC_SIMULATION_URL': '',
+        'MAX_INVESTMENT_AMOUNT': str(buy_eth), 'MAX_TOKENS': str(10**6), 'WATCH_MEMPOOL': 'false',
+    })
+
+
+def start_anvil(binary, port):
+    process = subprocess.Popen([binary, '--port', str(port), '--gas-limit', '100000000', '--silent'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return process
+
+
+def wait_for_node(provider, rpc, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return int(rpc(provider, 'eth_chainId', []), 16)
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def load_bytecode(path):
+    with open(path) as f:
+        artifact = json.load(f)
+    bytecode = artifact.get('bytecode') or artifact['evm']['bytecode']['object']
+    return bytecode[2:] if bytecode.startswith('0x') else bytecode
+
+
+class LocalDex:
+    """A Uniswap V2 deployment on the local node, at the addresses the bot expects."""
+
+    def __init__(self, provider, rpc, wait_for_receipt, core_dir, periphery_dir, weth_address, router_address):
+        self.provider, self.rpc, self.wait_for_receipt = provider, rpc, wait_for_receipt
+        self.deployer, self.lp = rpc(provider, 'eth_accounts', [])[1:3]
+        self.token_bytecode = load_bytecode(os.path.join(core_dir, 'ERC20.json'))
+
+        weth = self.deploy(load_bytecode(os.path.join(periphery_dir, 'WETH9.json')))
+        self.move(weth, weth_address)
+        self.factory = self.deploy(load_bytecode(os.path.join(core_dir, 'UniswapV2Factory.json')), word(self.deployer))
+        router = self.deploy(load_bytecode(os.path.join(periphery_dir, 'UniswapV2Router02.json')),
+                             word(self.factory) + word(weth_address))
+        self.move(router, router_address)  # Immutables (factory, WETH) live in the runtime code, so they move along
+        self.router = router_address
+
+    def deploy(self, bytecode, args=''):
+        tx_hash = self.rpc(self.provider, 'eth_sendTransaction', [{
+            'from': self.deployer, 'data': '0x' + bytecode + args, 'gas': hex(8_000_000)}])
+        return self.wait_for_receipt(self.provider, tx_hash)['contractAddress']
+
+    def move(self, source, target):
+        self.rpc(self.provider, 'anvil_setCode', [target, self.rpc(self.provider, 'eth_getCode', [source, 'latest'])])
+
+    def launch_tokens(self, count):
+        """Deploy `count` ERC20s held by the liquidity provider and approve the router for them."""
+        tokens = [self.deploy(self.token_bytecode, word(TOKEN_SUPPLY)) for _ in range(count)]
+        for token in tokens:
+            self.send(self.lp, token, APPROVE + word(self.router) + word(MAX_UINT))
+        return tokens
+
+    def send(self, sender, to, data, value=0, gas=5_000_000):
+        tx_hash = self.rpc(self.provider, 'eth_sendTransaction', [{
+            'from': sender, 'to': to, 'data': '0x' + data, 'value': hex(value), 'gas': hex(gas)}])
+        return self.wait_for_receipt(self.provider, tx_hash)
+
+    def add_liquidity_burst(self, tokens, token_amount, eth_amount):
+        """Create and fund the pair of every token in one block; returns the wall time the block was mined."""
+        deadline = int(time.time()) + 3600
+        self.rpc(self.provider, 'evm_setAutomine', [False])
+        try:
+            for token in tokens:
+                self.rpc(self.provider, 'eth_sendTransaction', [{
+                    'from': self.lp, 'to': self.router, 'value': hex(eth_amount), 'gas': hex(5_000_000),
+                    'data': '0x' + ADD_LIQUIDITY_ETH + word(token) + word(token_amount) + word(0) + word(0)
+                            + word(self.lp) + word(deadline)}])
+            self.rpc(self.provider, 'evm_mine', [])
+            return time.time()
+        finally:
+            self.rpc(self.provider, 'evm_setAutomine', [True])
+
+    def balance_of(self, token, owner):
+        return int(self.rpc(self.provider, 'eth_call', [{'to': token, 'data': '0x' + BALANCE_OF + word(owner)},
+                                                        'latest']), 16)
+
+
+def start_bot(dex, rpc_url, ws_url, poll_interval, skip_screen, state_dir):
+    """Run the real monitor -> pipeline path on a background event loop; returns (monitor, pipeline)."""
+    import sniper
+    from config import MAX_INVESTMENT_AMOUNT
+    from utils.fees import on_new_head
+    from utils.journal import trade_journal
+    from utils.metrics import metrics
+    from utils.monitor import Monitoring
+    from utils.registry import token_registry
+    from utils.wallet import prepare_buy_templates
+
+    token_registry.path = os.path.join(state_dir, 'token_registry.log')
+    trade_journal.path = os.path.join(state_dir, 'trades.jsonl')
+    if skip_screen:
+        sniper.screen_token = lambda token, blockchain: True
+
+    monitor = Monitoring(eth_url=rpc_url, bsc_url=rpc_url, uniswap_address=dex.factory,
+                         pancakeswap_address='0x' + '00' * 20, etherscan_api_key='bench', bscscan_api_key='bench',
+                         poll_interval=poll_interval, eth_ws_url=ws_url, checkpoint_path=None, chains=('ETH',))
+    monitor.add_head_listener(on_new_head)
+    monitor.add_head_listener(metrics.on_new_head)
+    prepare_buy_templates(MAX_INVESTMENT_AMOUNT, chains=('ETH',))
+
+    pipeline = sniper.build_pipeline([], [], [])
+    threading.Thread(target=asyncio.run, args=(pipeline.run(monitor.stream_new_pairs()),),
+                     name='bench-pipeline', daemon=True).start()
+    return monitor, pipeline
+
+
+def wait_until_settled(tokens, timeout):
+    """Wait until every token was rejected or had its buy broadcast; returns the wall time that happened."""
+    from utils.metrics import metrics
+    from utils.registry import token_registry, TokenState
+    deadline = time.monotonic() + timeout
+    pending = {token.lower() for token in tokens}
+    while pending and time.monotonic() < deadline:
+        for token in list(pending):
+            record = token_registry.get(token)
+            if (record is not None and record.state in (TokenState.REJECTED, TokenState.BOUGHT)) \
+                    or 'broadcast' in metrics.trace(token):
+                pending.discard(token)
+        time.sleep(0.01)
+    return time.time(), len(pending)
+
+
+def percentiles(values):
+    if not values:
+        return None
+    values = np.asarray(values)
+    return {'p50': float(np.percentile(values, 50)), 'p90': float(np.percentile(values, 90)),
+            'p99': float(np.percentile(values, 99)), 'max': float(values.max()), 'n': int(values.size)}
+
+
+def summarize(runs, pipeline_stats):
+    from utils.metrics import metrics
+    detection, analysis, to_broadcast = [], [], []
+    pairs = bought = timed_out = 0
+    busy_seconds = 0.0
+    for run in runs:
+        pairs += len(run['tokens'])
+        bought += run['bought']
+        timed_out += run['timed_out']
+        busy_seconds += run['settled_at'] - run['mined_at']
+        for token in run['tokens']:
+            trace = metrics.trace(token)
+            if 'log_received' in trace:
+                detection.append((trace['log_received'] - run['mined_at']) * 1000)
+            if 'analysis_start' in trace and 'analysis_end' in trace:
+                analysis.append((trace['analysis_end'] - trace['analysis_start']) * 1000)
+            if 'broadcast' in trace:
+                to_broadcast.append((trace['broadcast'] - run['mined_at']) * 1000)
+    return {
+        'pairs': pairs,
+        'bought': bought,
+        'timed_out': timed_out,
+        'success_rate': bought / pairs if pairs else 0.0,
+        'pairs_per_second': pairs / busy_seconds if busy_seconds else 0.0,
+        'detection_ms': percentiles(detection),
+        'analysis_ms': percentiles(analysis),
+        'mined_to_broadcast_ms': percentiles(to_broadcast),
+        'pipeline': pipeline_stats,
+    }
+
+
+def compare(summary, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['summary']
+    print(f"\nAgainst {baseline_path}:")
+    for key in ('success_rate', 'pairs_per_second'):
+        print(f"  {key:<24} {baseline[key]:10.3f} -> {summary[key]:10.3f}")
+    for key in ('detection_ms', 'analysis_ms', 'mined_to_broadcast_ms'):
+        if baseline.get(key) and summary.get(key):
+            print(f"  {key + ' p50/p99':<24} {baseline[key]['p50']:8.1f}/{baseline[key]['p99']:<8.1f} -> "
+                  f"{summary[key]['p50']:8.1f}/{summary[key]['p99']:.1f}")
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--core', required=True, help="@uniswap/v2-core build directory")
+    parser.add_argument('--periphery', required=True, help="@uniswap/v2-periphery build directory")
+    parser.add_argument('--rpc-url', help="use a running anvil instead of starting one")
+    parser.add_argument('--anvil', default='anvil', help="anvil binary")
+    parser.add_argument('--port', type=int, default=8545)
+    parser.add_argument('--ws', action='store_true', help="monitor over eth_subscribe instead of polling")
+    parser.add_argument('--bursts', type=int, default=5)
+    parser.add_argument('--pairs', type=int, default=20, help="pairs created per burst (one block)")
+    parser.add_argument('--liquidity-eth', type=float, default=10.0, help="ETH added to each pool")
+    parser.add_argument('--buy-eth', type=float, default=0.01, help="MAX_INVESTMENT_AMOUNT of the bot")
+    parser.add_argument('--poll-interval', type=float, default=0.25, help="monitor poll interval without --ws")
+    parser.add_argument('--skip-screen', action='store_true', help="bypass the eth_simulateV1 buy/sell screen")
+    parser.add_argument('--timeout', type=float, default=60, help="seconds to wait for a burst to settle")
+    parser.add_argument('--out', default=os.path.join('benchmarks', 'results',
+                                                      f"e2e-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"))
+    parser.add_argument('--baseline', help="earlier result file to compare against")
+    args = parser.parse_args()
+
+    rpc_url = args.rpc_url or f"http://127.0.0.1:{args.port}"
+    ws_url = rpc_url.replace('http', 'ws', 1) if args.ws else None
+    configure_environment(rpc_url, ws_url, args.buy_eth)
+    anvil = None if args.rpc_url else start_anvil(args.anvil, args.port)
+
+    from web3 import Web3
+    from benchmarks.bench_backfill import rpc, wait_for_receipt
+    from config import ROUTER_ADDRESSES, WRAPPED_NATIVE
+
+    try:
+        provider = Web3.HTTPProvider(rpc_url, request_kwargs={'timeout': 60})
+        wait_for_node(provider, rpc)
+        dex = LocalDex(provider, rpc, wait_for_receipt, args.core, args.periphery,
+                       WRAPPED_NATIVE['ETH'], ROUTER_ADDRESSES['ETH'])
+        print(f"Uniswap V2 deployed: factory {dex.factory}, router {dex.router}, WETH {WRAPPED_NATIVE['ETH']}")
+
+        with tempfile.TemporaryDirectory() as state_dir:
+            monitor, pipeline = start_bot(dex, rpc_url, ws_url, args.poll_interval, args.skip_screen, state_dir)
+            time.sleep(max(args.poll_interval * 2, 1))  # Let the monitor settle on the current head
+
+            runs = []
+            for burst in range(args.bursts):
+                tokens = dex.launch_tokens(args.pairs)
+                mined_at = dex.add_liquidity_burst(tokens, TOKEN_SUPPLY // 2, Web3.to_wei(args.liquidity_eth, 'ether'))
+                settled_at, timed_out = wait_until_settled(tokens, args.timeout)
+                rpc(provider, 'evm_mine', [])  # Include the buys
+                bought = sum(dex.balance_of(token, BOT_ADDRESS) > 0 for token in tokens)
+                runs.append({'tokens': tokens, 'mined_at': mined_at, 'settled_at': settled_at,
+                             'timed_out': timed_out, 'bought': bought})
+                print(f"burst {burst + 1}/{args.bursts}: {len(tokens)} pairs, {bought} bought, "
+                      f"settled in {(settled_at - mined_at) * 1000:.0f} ms"
+                      + (f", {timed_out} timed out" if timed_out else ""))
+
+            summary = summarize(runs, pipeline.stats())
+    finally:
+        if anvil is not None:
+            anvil.terminate()
+            anvil.wait()
+
+    result = {
+        'benchmark': 'e2e',
+        'revision': git_revision(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('out', 'baseline')},
+        'summary': summary,
+    }
+    os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+    with open(args.out, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    print(f"\n{summary['pairs']} pairs, {summary['success_rate']:.1%} bought, "
+          f"{summary['pairs_per_second']:.1f} pairs/s")
+    for key in ('detection_ms', 'analysis_ms', 'mined_to_broadcast_ms'):
+        if summary[key]:
+            print(f"{key:<24} p50 {summary[key]['p50']:8.1f}  p90 {summary[key]['p90']:8.1f}  "
+                  f"p99 {summary[key]['p99']:8.1f}")
+    print(f"Results written to {args.out}")
+    if args.baseline:
+        compare(summary, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
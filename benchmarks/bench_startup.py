@@ -0,0 +1,112 @@
+# benchmarks/bench_startup.py
+"""Benchmark: import time of the bot's entry module per chain configuration.
+
+Each run imports the module (sniper by default) in a fresh interpreter under
+`python -X importtime` with CHAINS set to one configuration, and reports the
+median cumulative import time, the slowest top-level packages and whether
+any chain SDK outside the configuration (solana, spl) was loaded. Nothing is
+contacted over the network: clients are only created on first use.
+
+Run from the project root:
+    python -m benchmarks.bench_startup [--module sniper] [--chains ETH,BSC ETH,BSC,SOL] [--runs 5]
+"""
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+from benchmarks.bench_e2e import git_revision
+
+# Packages that only a chain plugin should pull in
+PLUGIN_PACKAGES = {'SOL': ('solana', 'spl')}
+
+
+def parse_importtime(stderr):
+    """Map module name -> (self us, cumulative us) from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure(module, chains, env=None):
+    """Import `module` once in a fresh interpreter; returns its -X importtime table."""
+    env = dict(os.environ if env is None else env, CHAINS=chains)
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, env=env)
+    if completed.returncode:
+        raise RuntimeError(f"import {module} with CHAINS={chains} failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def summarize(module, chains, runs, top=10):
+    totals = [run[module][1] / 1000 for run in runs]
+    packages = {}
+    for run in runs:
+        largest = {}
+        for name, (_, cumulative) in run.items():
+            root = name.split('.')[0]
+            largest[root] = max(largest.get(root, 0), cumulative / 1000)
+        for root, ms in largest.items():
+            packages.setdefault(root, []).append(ms)
+    slowest = sorted(((statistics.median(values), root) for root, values in packages.items()
+                      if root != module.split('.')[0]),
+                     reverse=True)[:top]
+    enabled = chains.split(',')
+    leaked = sorted({name.split('.')[0] for run in runs for name in run
+                     for chain, roots in PLUGIN_PACKAGES.items() if chain not in enabled
+                     if name.split('.')[0] in roots})
+    return {
+        'chains': chains,
+        'total_ms': {'median': statistics.median(totals), 'min': min(totals), 'max': max(totals)},
+        'modules': len(runs[0]),
+        'slowest_packages_ms': {root: round(ms, 2) for ms, root in slowest},
+        'unexpected_plugin_packages': leaked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='sniper', help="module to import")
+    parser.add_argument('--chains', nargs='+', default=['ETH,BSC', 'ETH,BSC,SOL'],
+                        help="CHAINS values to compare")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="slowest packages to report")
+    parser.add_argument('--out', help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    summaries = []
+    for chains in args.chains:
+        runs = [measure(args.module, chains) for _ in range(args.runs)]
+        summary = summarize(args.module, chains, runs, args.top)
+        summaries.append(summary)
+        total = summary['total_ms']
+        print(f"CHAINS={chains}: import {args.module} median {total['median']:.1f} ms "
+              f"(min {total['min']:.1f}, max {total['max']:.1f}), {summary['modules']} modules")
+        for root, ms in summary['slowest_packages_ms'].items():
+            print(f"    {root:<24} {ms:9.1f} ms")
+        if summary['unexpected_plugin_packages']:
+            print(f"    loaded without their chain enabled: {', '.join(summary['unexpected_plugin_packages'])}")
+
+    if args.out:
+        result = {
+            'benchmark': 'startup',
+            'revision': git_revision(),
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'module': args.module,
+            'runs': args.runs,
+            'results': summaries,
+        }
+        os.makedirs(os.path.dirname(args.out) or '.', exist_ok=True)
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+# benchmarks/rpc_replay.py
+"""Record JSON-RPC and explorer-API traffic once, then replay it locally with injected faults.
+
+`record` runs a pass-through proxy in front of one upstream (an RPC node, or an
+Etherscan-style explorer API) and appends every exchange to a gzipped JSONL
+file. `replay` serves a recording back with configurable latency, rate limits,
+dropped connections, server errors and stale heads, so retry, pooling and
+concurrency behaviour can be load tested offline.
+
+Each request's fault decisions are drawn from a generator seeded with
+(--seed, request key, occurrence). They therefore do not depend on thread
+timing: the n-th eth_blockNumber call always sees the same latency and the
+same fate.
+
+Run from the project root, pointing the bot's URLs at the local ports:
+    python -m benchmarks.rpc_replay record --upstream https://mainnet.infura.io/v3/<id> --port 8601 --out rec/eth.jsonl.gz
+    python -m benchmarks.rpc_replay record --upstream https://api.etherscan.io/api --port 8602 --out rec/etherscan.jsonl.gz
+    ETH_RPC_URLS=http://127.0.0.1:8601 ETHERSCAN_API_URL=http://127.0.0.1:8602 python sniper.py   # capture traffic
+    python -m benchmarks.rpc_replay replay --recording rec/eth.jsonl.gz --port 8601 \\
+        --latency lognormal:40,0.6 --rate-limit 50 --drop 0.01 --error 0.01 --stale 0.2:3
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import math
+import random
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+# Query parameters that identify the caller rather than the request
+IGNORED_QUERY_KEYS = {'apikey'}
+EXPLORER_RATE_LIMITED = {"status": "0", "message": "NOTOK", "result": "Max rate limit reached"}
+
+
+def rpc_key(method, params):
+    """Match key of a JSON-RPC call: its method and canonical params, without the request id."""
+    return f"{method} {json.dumps(params, sort_keys=True, separators=(',', ':'))}"
+
+
+def http_key(path, query):
+    """Match key of an explorer-style GET: its query string in sorted order, minus the API key."""
+    pairs = sorted((k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k.lower() not in IGNORED_QUERY_KEYS)
+    return f"GET {urlsplit(path).path}?" + '&'.join(f"{k}={v}" for k, v in pairs)
+
+
+class Recording:
+    """Recorded exchanges: per key, the responses in the order they were seen.
+
+    Replaying a key walks through its responses and then keeps serving the last
+    one, so a polled value such as eth_blockNumber advances the way it did live.
+    """
+
+    def __init__(self, entries=()):
+        self.responses = defaultdict(list)
+        self.latencies = defaultdict(list)
+        self._cursor = defaultdict(int)
+        self._lock = threading.Lock()
+        for entry in entries:
+            self.add(entry['k'], entry['r'], entry.get('t'))
+
+    @classmethod
+    def load(cls, path):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    def add(self, key, response, latency_ms=None):
+        self.responses[key].append(response)
+        if latency_ms is not None:
+            self.latencies[key].append(latency_ms)
+
+    def next(self, key):
+        """(response, recorded latency in ms or None, occurrence number); response None if the key was never recorded."""
+        with self._lock:
+            occurrence = self._cursor[key]
+            self._cursor[key] += 1
+        responses = self.responses.get(key)
+        if not responses:
+            return None, None, occurrence
+        index = min(occurrence, len(responses) - 1)
+        latencies = self.latencies.get(key)
+        return responses[index], latencies[min(index, len(latencies) - 1)] if latencies else None, occurrence
+
+
+class Recorder:
+    """Appends exchanges to a gzipped JSONL file, one compact line per call."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, key, response, latency_ms):
+        line = json.dumps({'k': key, 'r': response, 't': round(latency_ms, 2)}, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def parse_latency(spec):
+    """Latency model from 'recorded[:factor]', 'fixed:ms', 'uniform:lo,hi' or 'lognormal:median,sigma'."""
+    kind, _, args = (spec or 'fixed:0').partition(':')
+    values = [float(v) for v in args.split(',') if v]
+    if kind == 'recorded':
+        factor = values[0] if values else 1.0
+        return lambda rng, recorded: (recorded or 0.0) * factor
+    if kind == 'fixed':
+        return lambda rng, recorded: values[0] if values else 0.0
+    if kind == 'uniform':
+        return lambda rng, recorded: rng.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        return lambda rng, recorded: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency model: {spec}")
+
+
+class Faults:
+    """Fault injection settings of a replay server.
+
+    `rate_limit` is requests per second (bursts of up to one second's worth);
+    `drop` and `error` are probabilities of closing the connection without a
+    reply or answering with an HTTP 503; `stale` is (probability, blocks):
+    eth_blockNumber answers that many blocks behind the recorded head.
+    """
+
+    def __init__(self, latency='fixed:0', rate_limit=None, drop=0.0, error=0.0, stale=(0.0, 0), seed=0):
+        self.latency = parse_latency(latency)
+        self.rate_limit = rate_limit
+        self.drop = drop
+        self.error = error
+        self.stale_probability, self.stale_blocks = stale
+        self.seed = seed
+        self._tokens = rate_limit or 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def rng(self, key, occurrence):
+        digest = hashlib.blake2b(f"{self.seed}|{key}|{occurrence}".encode(), digest_size=8).digest()
+        return random.Random(int.from_bytes(digest, 'big'))
+
+    def admit(self):
+        """Token-bucket check; False if the request is over the rate limit."""
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._updated) * self.rate_limit)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def stale_head(response, blocks):
+    """An eth_blockNumber response moved `blocks` back."""
+    if isinstance(response, dict) and isinstance(response.get('result'), str):
+        return dict(response, result=hex(max(int(response['result'], 16) - blocks, 0)))
+    return response
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the endpoints the pool talks to
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body, content_type='application/json'):
+        data = body if isinstance(body, bytes) else json.dumps(body, separators=(',', ':')).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _drop(self):
+        self.close_connection = True
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'null')
+        self.server.handle_rpc(self, payload)
+
+    def do_GET(self):
+        self.server.handle_get(self)
+
+
+class RecordingProxy(ThreadingHTTPServer):
+    """Pass-through proxy that records every exchange with `upstream`."""
+
+    daemon_threads = True
+
+    def __init__(self, address, upstream, recorder, timeout=30):
+        super().__init__(address, _Handler)
+        self.upstream = upstream.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+
+    def _forward(self, data=None, query=''):
+        url = self.upstream + (('?' + query) if query else '')
+        request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body, status = response.read(), response.status
+        except urllib.error.HTTPError as e:
+            body, status = e.read(), e.code
+        return body, status, (time.perf_counter() - start) * 1000
+
+    def handle_rpc(self, handler, payload):
+        body, status, latency_ms = self._forward(json.dumps(payload).encode())
+        if status == 200:
+            response = json.loads(body)
+            calls = payload if isinstance(payload, list) else [payload]
+            responses = response if isinstance(response, list) else [response]
+            by_id = {r.get('id'): r for r in responses if isinstance(r, dict)}
+            for call in calls:
+                if call.get('id') in by_id:
+                    reply = {k: v for k, v in by_id[call['id']].items() if k not in ('id', 'jsonrpc')}
+                    self.recorder.record(rpc_key(call.get('method'), call.get('params', [])), reply,
+                                         latency_ms / len(calls))
+        handler._reply(status, body)
+
+    def handle_get(self, handler):
+        query = urlsplit(handler.path).query
+        body, status, latency_ms = self._forward(query=query)
+        if status == 200:
+            self.recorder.record(http_key(handler.path, query), json.loads(body), latency_ms)
+        handler._reply(status, body)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Serves a Recording back, with the faults of a Faults instance."""
+
+    daemon_threads = True
+
+    def __init__(self, address, recording, faults=None):
+        super().__init__(address, _Handler)
+        self.recording = recording
+        self.faults = faults or Faults()
+        self.stats = defaultdict(int)
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _lookup(self, key, method=None):
+        """(response, fate, delay in seconds) for one call; fate is 'ok', 'missing', 'drop', 'error' or 'limited'."""
+        response, recorded_ms, occurrence = self.recording.next(key)
+        rng = self.faults.rng(key, occurrence)
+        delay = max(self.faults.latency(rng, recorded_ms), 0) / 1000
+        if not self.faults.admit():
+            return None, 'limited', 0
+        if rng.random() < self.faults.drop:
+            return None, 'drop', delay
+        if rng.random() < self.faults.error:
+            return None, 'error', delay
+        if response is None:
+            return None, 'missing', delay
+        if method == 'eth_blockNumber' and self.faults.stale_blocks and rng.random() < self.faults.stale_probability:
+            self._count('stale')
+            response = stale_head(response, self.faults.stale_blocks)
+        return response, 'ok', delay
+
+    def handle_rpc(self, handler, payload):
+        calls = payload if isinstance(payload, list) else [payload]
+        replies, delay = [], 0
+        for call in calls:
+            response, fate, call_delay = self._lookup(rpc_key(call.get('method'), call.get('params', [])),
+                                                      call.get('method'))
+            delay = max(delay, call_delay)
+            self._count(fate)
+            if fate == 'limited':
+                handler._reply(429, {'jsonrpc': '2.0', 'id': call.get('id'),
+                                     'error': {'code': -32005, 'message': 'rate limit exceeded'}})
+                return
+            if fate in ('drop', 'error'):
+                time.sleep(delay)
+                if fate == 'drop':
+                    handler._drop()
+                else:
+                    handler._reply(503, b'service unavailable', 'text/plain')
+                return
+            if fate == 'missing':
+                response = {'error': {'code': -32601, 'message': f"not in recording: {call.get('method')}"}}
+            replies.append(dict(response, jsonrpc='2.0', id=call.get('id')))
+        time.sleep(delay)
+        handler._reply(200, replies if isinstance(payload, list) else replies[0])
+
+    def handle_get(self, handler):
+        response, fate, delay = self._lookup(http_key(handler.path, urlsplit(handler.path).query))
+        self._count(fate)
+        if fate == 'limited':
+            handler._reply(200, EXPLORER_RATE_LIMITED)  # Etherscan signals rate limits in the body
+            return
+        time.sleep(delay)
+        if fate == 'drop':
+            handler._drop()
+        elif fate == 'error':
+            handler._reply(503, b'service unavailable', 'text/plain')
+        elif fate == 'missing':
+            handler._reply(404, {'status': '0', 'message': 'NOTOK', 'result': 'not in recording'})
+        else:
+            handler._reply(200, response)
+
+
+def serve(server):
+    """Run a server on a daemon thread; returns it."""
+    threading.Thread(target=server.serve_forever, name='rpc-replay', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    record = commands.add_parser('record', help="proxy an upstream and record its traffic")
+    record.add_argument('--upstream', required=True)
+    record.add_argument('--out', required=True, help="recording file (.jsonl.gz), appended to")
+    replay = commands.add_parser('replay', help="serve a recording with injected faults")
+    replay.add_argument('--recording', required=True)
+    replay.add_argument('--latency', default='recorded',
+                        help="recorded[:factor] | fixed:ms | uniform:lo,hi | lognormal:median,sigma")
+    replay.add_argument('--rate-limit', type=float, help="requests per second before 429s")
+    replay.add_argument('--drop', type=float, default=0.0, help="probability of dropping the connection")
+    replay.add_argument('--error', type=float, default=0.0, help="probability of an HTTP 503")
+    replay.add_argument('--stale', default='0:0', help="probability:blocks a head lags behind")
+    replay.add_argument('--seed', type=int, default=0)
+    for command in (record, replay):
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--port', type=int, required=True)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'record':
+        recorder = Recorder(args.out)
+        server = RecordingProxy((args.host, args.port), args.upstream, recorder)
+        logging.info("Recording %s on http://%s:%d into %s", args.upstream, args.host, args.port, args.out)
+    else:
+        probability, _, blocks = args.stale.partition(':')
+        faults = Faults(args.latency, args.rate_limit, args.drop, args.error,
+                        (float(probability), int(blocks or 0)), args.seed)
+        recording = Recording.load(args.recording)
+        server = ReplayServer((args.host, args.port), recording, faults)
+        logging.info("Replaying %d recorded requests on http://%s:%d", len(recording.responses), args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args.command == 'record':
+            recorder.close()
+            logging.info("Recorded %d exchanges.", recorder.count)
+        else:
+            logging.info("Replay stats: %s", dict(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,13 @@ import os
 import logging
 from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+def load():
+    """Load the .env file into the environment; existing variables win, so repeated calls are harmless."""
+    load_dotenv()
+
 
 # Load environment variables
-load_dotenv()
+load()
 
 # Load and validate configuration variables
 WALLET_ADDRESS = os.getenv("WALLET_ADDRESS")
@@ -19,12 +21,81 @@ BSCSCAN_API_KEY = os.getenv("BSCSCAN_API_KEY")
 SOLANA_RPC_URL = os.getenv("SOLANA_RPC_URL")
 INFURA_PROJECT_ID = os.getenv("INFURA_PROJECT_ID")
 BSC_NODE_URL = os.getenv("BSC_NODE_URL")
+INFURA_URL = os.getenv("INFURA_URL")
+ETH_WS_URL = os.getenv("ETH_WS_URL")  # Optional: enables push-based eth_subscribe monitoring
+BSC_WS_URL = os.getenv("BSC_WS_URL")
+WATCH_MEMPOOL = os.getenv("WATCH_MEMPOOL", "false").lower() == "true"  # Pending addLiquidity feed over the WS URLs
+FEE_AGGRESSIVENESS = os.getenv("FEE_AGGRESSIVENESS", "high")  # low | medium | high
+ETHERSCAN_API_URL = os.getenv("ETHERSCAN_API_URL", "https://api.etherscan.io/api")
+BSCSCAN_API_URL = os.getenv("BSCSCAN_API_URL", "https://api.bscscan.com/api")
+EXPLORER_RATE_LIMIT = float(os.getenv("EXPLORER_RATE_LIMIT", 5))  # Etherscan/BscScan requests per second per key
+METRICS_PORT = int(os.getenv("METRICS_PORT", 9464))  # Local Prometheus endpoint for stage latencies; 0 disables it
+
+# Chains the bot runs on (comma-separated). Only their plugins and SDKs are ever imported;
+# Solana is enabled by default when SOLANA_RPC_URL is set.
+CHAINS = [chain.strip().upper() for chain in os.getenv("CHAINS", "ETH,BSC" + (",SOL" if SOLANA_RPC_URL else "")).split(",")
+          if chain.strip()]
+
+# DEX routers used for swaps
+ROUTER_ADDRESSES = {
+    'ETH': os.getenv("UNISWAP_ROUTER_ADDRESS", "0x7a250d5630B4cF539739dF2C5dAcb4c659F2488D"),  # Uniswap V2 Router02
+    'BSC': os.getenv("PANCAKESWAP_ROUTER_ADDRESS", "0x10ED43C718714eb63d5aA57B78B54704E256024E"),  # PancakeSwap V2
+}
+SWAP_GAS_LIMIT = int(os.getenv("SWAP_GAS_LIMIT", 300000))
+
+# Buy sizing: the buy shrinks below MAX_INVESTMENT_AMOUNT until its price impact fits the cap
+MAX_PRICE_IMPACT = float(os.getenv("MAX_PRICE_IMPACT", 0.05))
+SLIPPAGE_TOLERANCE = float(os.getenv("SLIPPAGE_TOLERANCE", 0.10))  # amountOutMin = quote * (1 - tolerance)
+
+# Exits: open positions are sold once they lose or gain this many percent
+STOP_LOSS_PERCENTAGE = float(os.getenv("STOP_LOSS_PERCENTAGE", 30))
+if STOP_LOSS_PERCENTAGE < 1:
+    # Older configs gave the stop-loss as a fraction (0.01); read as percent it would sell every position at once
+    raise ValueError(f"STOP_LOSS_PERCENTAGE is in percent (e.g. 30 for a 30% loss), got {STOP_LOSS_PERCENTAGE}. "
+                     "Values below 1 are rejected because older configs gave it as a fraction.")
+TAKE_PROFIT_PERCENTAGE = float(os.getenv("TAKE_PROFIT_PERCENTAGE", 100))
+MAX_TOKENS = int(os.getenv("MAX_TOKENS", 100))  # Most positions held at once
+
+# Pipeline workers per stage
+ANALYSIS_CONCURRENCY = int(os.getenv("ANALYSIS_CONCURRENCY", 16))
+EXECUTION_CONCURRENCY = int(os.getenv("EXECUTION_CONCURRENCY", 4))
+
+# Honeypot screening: simulated buy-then-sell round trips
+MAX_BUY_TAX = float(os.getenv("MAX_BUY_TAX", 0.10))  # Largest acceptable buy tax, as a fraction
+MAX_SELL_TAX = float(os.getenv("MAX_SELL_TAX", 0.10))
+SIMULATION_DEADLINE = float(os.getenv("SIMULATION_DEADLINE", 3))  # Seconds allowed per token
+SIMULATION_URLS = {  # Optional local forked nodes (e.g. anvil --fork-url) to simulate on
+    'ETH': os.getenv("ETH_SIMULATION_URL"),
+    'BSC': os.getenv("BSC_SIMULATION_URL"),
+}
+
+# Wrapped native coins; the other side of a new pair is the freshly listed token
+WRAPPED_NATIVE = {
+    'ETH': "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",  # WETH
+    'BSC': "0xbb4CdB9CBd36B01bD1cBaEBF2De08d9173bc095c",  # WBNB
+}
+
+# JSON-RPC endpoints pooled per chain (comma-separated extras plus the primary node URLs)
+RPC_URLS = {
+    'ETH': [url.strip() for url in os.getenv("ETH_RPC_URLS", "").split(",") if url.strip()]
+           + [url for url in (INFURA_URL, INFURA_PROJECT_ID and f"https://mainnet.infura.io/v3/{INFURA_PROJECT_ID}") if url],
+    'BSC': [url.strip() for url in os.getenv("BSC_RPC_URLS", "").split(",") if url.strip()]
+           + [BSC_NODE_URL or "https://bsc-dataseed.binance.org/"],
+}
+
+# Extra JSON-RPC endpoints that signed transactions are raced to alongside the chain's provider (comma-separated)
+BROADCAST_ENDPOINTS = {
+    'ETH': [url.strip() for url in os.getenv("ETH_BROADCAST_URLS", "").split(",") if url.strip()],
+    'BSC': [url.strip() for url in os.getenv("BSC_BROADCAST_URLS", "").split(",") if url.strip()],
+}
 
 # Check for missing required variables
-required_vars = ["WALLET_ADDRESS", "PRIVATE_KEY", "ETHERSCAN_API_KEY", "BSCSCAN_API_KEY", "SOLANA_RPC_URL"]
+CHAIN_REQUIRED_VARS = {'ETH': "ETHERSCAN_API_KEY", 'BSC': "BSCSCAN_API_KEY", 'SOL': "SOLANA_RPC_URL"}
+required_vars = ["WALLET_ADDRESS", "PRIVATE_KEY"] + [CHAIN_REQUIRED_VARS[chain] for chain in CHAINS
+                                                     if chain in CHAIN_REQUIRED_VARS]
 missing_vars = [var for var in required_vars if not locals().get(var)]
 
 if missing_vars:
-    logging.error(f"Missing required environment variables: {', '.join(missing_vars)}")
+    logging.error("Missing required environment variables: %s", ', '.join(missing_vars))
 else:
     logging.info("Environment variables loaded successfully.")
@@ -1,91 +1,282 @@
 import logging
-import json
-import requests
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+import numpy as np
 from web3 import Web3
-from web3.middleware import geth_poa_middleware
-from solana.rpc.api import Client
+from config import MAX_INVESTMENT_AMOUNT, MAX_PRICE_IMPACT, SLIPPAGE_TOLERANCE, WRAPPED_NATIVE
+from utils.abi_registry import get_abi, normalize_chain
+from utils.amm import SWAP_FEES, size_trades
+from utils.metrics import metrics
+from utils.multicall import (multicall, with_address, to_uint, to_address, DECIMALS, TOTAL_SUPPLY, BALANCE_OF,
+                             OWNER, TOKEN0, TOKEN1, GET_RESERVES)
+from utils.providers import get_web3
+from utils.reserves import get_reserve_index
+from utils.solana_data import TOKEN_PROGRAM_IDS, decode_token_account, get_solana_data
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+MIN_LIQUIDITY_WEI = 1 * 10**18  # Native coin that must sit in the pool
+MAX_OWNER_SHARE = 0.5  # Largest share of the supply the token owner may hold
+MIN_SOLANA_LIQUIDITY = 1_000_000_000  # Base units a Solana token account must hold
 
 def load_abi_from_blockchain_scan(contract_address, api_key, network='bsc'):
-    """Load ABI from BscScan or Etherscan using their API."""
-    base_urls = {
-        'bsc': "https://api.bscscan.com/api",
-        'eth': "https://api.etherscan.io/api"
-    }
-    
-    if network not in base_urls:
+    """Load ABI from BscScan or Etherscan using their API, through the shared ABI cache."""
+    if network not in ('bsc', 'eth'):
         raise ValueError("Invalid network specified. Use 'bsc' for BscScan or 'eth' for Etherscan.")
 
-    url = f"{base_urls[network]}?module=contract&action=getabi&address={contract_address}&apikey={api_key}"
-    logging.info(f"Loading ABI from {url}...")
-
     try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception if the request fails
-        data = response.json()
-
-        if data['status'] == "1":  # Check if the response status is success
-            abi = json.loads(data['result'])
-            logging.info(f"Successfully loaded ABI for contract {contract_address}. ABI: {abi[:2]}...")
-            return abi
-        else:
-            logging.error(f"Failed to retrieve ABI: {data['result']}")
-            raise Exception(f"Failed to retrieve ABI: {data['result']}")
-
-    except requests.RequestException as e:
-        logging.error(f"Failed to load ABI from {url}: {str(e)}")
+        abi = get_abi(network, contract_address, api_key)
+        logging.info("Successfully loaded ABI for contract %s. ABI: %s...", contract_address, abi[:2])
+        return abi
+    except Exception as e:
+        logging.error("Failed to load ABI for %s on %s: %s", contract_address, network, e)
         raise
 
-def analyze_token(token_address, provider, contract_address, api_key, network):
-    """Analyze a token by checking its liquidity based on the network."""
-    logging.info(f"Starting analysis for {network.upper()} token: {token_address}")
+def analyze_token(token_address, provider=None, contract_address=None, api_key=None, network='bsc', pair_address=None):
+    """Analyze a token: the native liquidity of its pair, read from the reserve index, then its supply and owner share.
+
+    The contract reads go through the chain's BatchAnalyzer, so a burst of analyses
+    shares its Multicall3 round trips. `provider` only matters for the first call
+    on a chain; `contract_address` and `api_key` are kept for existing callers.
+    """
+    logging.info("Starting analysis for %s token: %s", network.upper(), token_address)
+    chain = normalize_chain(network)
+    metrics.stamp(token_address, 'analysis_start', chain)
 
     try:
-        # Load the ABI
-        abi = load_abi_from_blockchain_scan(contract_address, api_key, network)
-        
-        # Create token contract instance
-        token_contract = provider.eth.contract(address=token_address, abi=abi)
-        liquidity = token_contract.functions.balanceOf(token_address).call()
-        logging.info(f"Liquidity for {network.upper()} token {token_address}: {liquidity} wei")
-        
-        if liquidity > 1 * 10**18:  # Check for liquidity
-            logging.info(f"Promising {network.upper()} token found: {token_address} with liquidity: {liquidity} wei")
-            return True
-        
-        logging.warning(f"{network.upper()} Token {token_address} does not meet liquidity requirements: {liquidity} wei")
+        index = get_reserve_index(chain)
+        pair_address = pair_address or index.pair_for(token_address)
+        if pair_address is None:
+            logging.warning("%s Token %s has no tracked pair; liquidity unknown.", network.upper(), token_address)
+            return False
+        if not index.wait_synced(pair_address):
+            logging.warning("Reserves of %s pair %s are not available yet.", network.upper(), pair_address)
+            return False
+
+        liquidity = index.native_liquidity(pair_address)
+        if liquidity is None:
+            logging.warning("%s pair %s of token %s is not paired with the wrapped native coin.", network.upper(),
+                            pair_address, token_address)
+            return False
+        logging.info("Liquidity for %s token %s: %s wei", network.upper(), token_address, liquidity)
+
+        if liquidity <= MIN_LIQUIDITY_WEI:  # Check for liquidity
+            logging.warning("%s Token %s does not meet liquidity requirements: %s wei", network.upper(), token_address,
+                            liquidity)
+            return False
+
+        # Supply and owner checks, read together with every other token analyzed at the same moment
+        return get_batch_analyzer(chain, provider).analyze(token_address, pair_address)['passed']
     except Exception as e:
-        logging.error(f"Error analyzing {network.upper()} token {token_address}: {str(e)}")
+        logging.error("Error analyzing %s token %s: %s", network.upper(), token_address, e)
+    finally:
+        metrics.stamp(token_address, 'analysis_end', chain)
 
     return False
 
-def analyze_solana_token(token_address, provider):
-    """Analyze a token on the Solana network."""
-    logging.info(f"Starting analysis for Solana token: {token_address}")
+def analyze_tokens(candidates, provider, chain, budget_wei=None):
+    """Analyze a burst of new (token_address, pair_address) candidates with batched Multicall3 reads.
+
+    The first round trip reads decimals, totalSupply, owner and the pool's token
+    balance of every token, plus both tokens and the reserves of every pair. A second
+    one reads the owners' balances, and buys into every pool are sized in one
+    vectorized pass. Returns one result dict per candidate, in order.
+    """
+    candidates = [(token.lower(), pair.lower()) for token, pair in candidates]
+    logging.info("Starting batched analysis of %d %s tokens", len(candidates), chain)
+    wrapped_native = WRAPPED_NATIVE[chain].lower()
+
+    calls = []
+    for token, pair in candidates:
+        calls += [
+            (token, DECIMALS),
+            (token, TOTAL_SUPPLY),
+            (token, OWNER),
+            (token, with_address(BALANCE_OF, pair)),
+            (pair, TOKEN0),
+            (pair, TOKEN1),
+            (pair, GET_RESERVES),
+        ]
+    results = multicall(provider, calls)
+
+    analyses = []
+    for i, (token, pair) in enumerate(candidates):
+        decimals, total_supply, owner, pool_balance, token0, token1, reserves = results[7 * i:7 * i + 7]
+        success, reserve_data = reserves
+        reserve0 = int.from_bytes(reserve_data[:32], 'big') if success and len(reserve_data) >= 64 else None
+        reserve1 = int.from_bytes(reserve_data[32:64], 'big') if success and len(reserve_data) >= 64 else None
+        token0, token1 = to_address(token0), to_address(token1)
+        native_reserve = None
+        if reserve0 is not None:  # Only a pair against the wrapped native coin has native liquidity
+            if token0 == wrapped_native and token1 == token:
+                native_reserve = reserve0
+            elif token1 == wrapped_native and token0 == token:
+                native_reserve = reserve1
+        analyses.append({
+            'token': token,
+            'pair': pair,
+            'decimals': to_uint(decimals),
+            'total_supply': to_uint(total_supply),
+            'owner': to_address(owner),
+            'pool_token_balance': to_uint(pool_balance),
+            'reserve0': reserve0,
+            'reserve1': reserve1,
+            'native_reserve': native_reserve,
+            'owner_balance': None,
+            'owner_share': None,
+            'buy_size_wei': None,
+            'expected_tokens': None,
+        })
+
+    # Second round: balances of the owners that could be resolved
+    with_owner = [analysis for analysis in analyses if analysis['owner'] and int(analysis['owner'], 16)]
+    owner_results = multicall(provider, [(a['token'], with_address(BALANCE_OF, a['owner'])) for a in with_owner])
+    for analysis, result in zip(with_owner, owner_results):
+        analysis['owner_balance'] = to_uint(result)
+        if analysis['owner_balance'] is not None and analysis['total_supply']:
+            analysis['owner_share'] = analysis['owner_balance'] / analysis['total_supply']
+
+    # Size a buy into every pool at once: the budget, cut down to what fits the price-impact cap
+    sizable = [a for a in analyses if a['native_reserve'] and a['reserve0'] is not None and a['reserve1'] is not None]
+    if sizable:
+        native_reserves = np.array([a['native_reserve'] for a in sizable], dtype=np.float64)
+        token_reserves = np.array([a['reserve0'] + a['reserve1'] - a['native_reserve'] for a in sizable], dtype=np.float64)
+        buy_sizes, expected_outs, _ = size_trades(native_reserves, token_reserves,
+                                                  budget_wei or Web3.to_wei(MAX_INVESTMENT_AMOUNT, 'ether'),
+                                                  MAX_PRICE_IMPACT, SLIPPAGE_TOLERANCE, SWAP_FEES[chain])
+        for analysis, buy_size, expected_out in zip(sizable, buy_sizes, expected_outs):
+            analysis['buy_size_wei'] = int(buy_size)
+            analysis['expected_tokens'] = int(expected_out)
+
+    for analysis in analyses:
+        analysis['passed'] = (
+            analysis['decimals'] is not None
+            and bool(analysis['total_supply'])
+            and (analysis['native_reserve'] or 0) > MIN_LIQUIDITY_WEI
+            and (analysis['owner_share'] or 0) <= MAX_OWNER_SHARE
+        )
+        if analysis['passed']:
+            logging.info("Promising %s token found: %s with liquidity: %s wei", chain, analysis['token'],
+                         analysis['native_reserve'])
+        else:
+            logging.warning("%s Token %s did not pass batched analysis: liquidity=%s owner_share=%s", chain,
+                            analysis['token'], analysis['native_reserve'], analysis['owner_share'])
+    return analyses
 
+class BatchAnalyzer:
+    """Merges single-token analyses of one chain into analyze_tokens bursts.
+
+    Candidates submitted within `window` seconds of each other, from any thread,
+    are analyzed together, so a burst of new pairs costs two Multicall3 round
+    trips instead of two per token.
+    """
+
+    def __init__(self, provider, chain, window=0.005, timeout=10):
+        self.provider = provider
+        self.chain = chain
+        self.window = window
+        self.timeout = timeout
+        self.bursts = 0
+        self._pending = []
+        self._flush_scheduled = False
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"analyze-{chain}")
+
+    def submit(self, token_address, pair_address):
+        """Future of the analysis dict of one candidate, run with everything else submitted within `window`."""
+        future = Future()
+        with self._lock:
+            self._pending.append((token_address, pair_address, future))
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                self._executor.submit(self._flush)
+        return future
+
+    def analyze(self, token_address, pair_address):
+        """Blocking batched analysis of one candidate."""
+        return self.submit(token_address, pair_address).result(self.timeout + self.window)
+
+    def _flush(self):
+        time.sleep(self.window)
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._flush_scheduled = False
+        self.bursts += 1
+        try:
+            analyses = analyze_tokens([(token, pair) for token, pair, _ in pending], self.provider, self.chain)
+        except Exception as e:
+            logging.error("Batched analysis of %d %s tokens failed: %s", len(pending), self.chain, e)
+            for _, _, future in pending:
+                future.set_exception(e)
+            return
+        for (_, _, future), analysis in zip(pending, analyses):
+            future.set_result(analysis)
+
+
+_batch_analyzers = {}
+_batch_analyzers_lock = threading.Lock()
+
+
+def get_batch_analyzer(chain, provider=None):
+    """Return the shared batch analyzer of a chain, on `provider` or the chain's pooled client."""
+    with _batch_analyzers_lock:
+        analyzer = _batch_analyzers.get(chain)
+        if analyzer is None:
+            analyzer = _batch_analyzers[chain] = BatchAnalyzer(provider or get_web3(chain), chain)
+        return analyzer
+
+def solana_liquidity_passes(token_address, account):
+    """Check one fetched token account; a missing or malformed account only rejects its own token."""
+    if account is None:
+        logging.warning("Solana token account %s does not exist.", token_address)
+        return False
+    if account['owner'] not in TOKEN_PROGRAM_IDS:
+        logging.warning("Solana account %s is not a token account (owner %s).", token_address, account['owner'])
+        return False
     try:
-        # Fetch the token balance
-        balance_info = provider.get_token_account_balance(token_address)
-        balance = balance_info['result']['value']['amount']  # Adjust based on actual response structure
-        logging.info(f"Liquidity for Solana token {token_address}: {balance} lamports")
+        balance = decode_token_account(account['data'])['amount']
+    except ValueError as e:
+        logging.warning("Solana token account %s is malformed: %s", token_address, e)
+        return False
+    if balance > MIN_SOLANA_LIQUIDITY:
+        logging.info("Promising Solana token found: %s with liquidity: %d", token_address, balance)
+        return True
+    logging.warning("Solana Token %s does not meet liquidity requirements: %d", token_address, balance)
+    return False
 
-        if int(balance) > 1_000_000_000:  # 1 SOL in lamports
-            logging.info(f"Promising Solana token found: {token_address} with liquidity: {balance} lamports")
-            return True
+def analyze_solana_token(token_address, provider=None):
+    """Analyze a token account on the Solana network.
 
-        logging.warning(f"Solana Token {token_address} does not meet liquidity requirements: {balance} lamports")
+    `provider` is a SolanaData (default: the shared one); concurrent calls are
+    merged into the same getMultipleAccounts batch.
+    """
+    logging.info("Starting analysis for Solana token: %s", token_address)
+    try:
+        account = (provider or get_solana_data()).get_accounts([token_address])[token_address]
+        return solana_liquidity_passes(token_address, account)
     except Exception as e:
-        logging.error(f"Error analyzing Solana token {token_address}: {str(e)}")
+        logging.error("Error analyzing Solana token %s: %s", token_address, e)
+        return False
 
-    return False
+async def analyze_solana_tokens(token_addresses, provider=None):
+    """Analyze a burst of Solana token accounts in one batched round trip; token -> passed."""
+    try:
+        accounts = await (provider or get_solana_data()).get_accounts_async(token_addresses)
+    except Exception as e:
+        logging.error("Error analyzing %d Solana tokens: %s", len(token_addresses), e)
+        return {token: False for token in token_addresses}
+    results = {}
+    for token in token_addresses:
+        try:
+            results[token] = solana_liquidity_passes(token, accounts[token])
+        except Exception as e:
+            logging.error("Error analyzing Solana token %s: %s", token, e)
+            results[token] = False
+    return results
 
 def initialize_bsc_provider():
     """Initialize Web3 provider for Binance Smart Chain."""
     provider_url = "https://bsc-dataseed.binance.org/"
-    provider = Web3(Web3.HTTPProvider(provider_url))
-    provider.middleware_onion.inject(geth_poa_middleware, layer=0)
+    provider = get_web3('BSC', provider_url)
 
     if provider.is_connected():
         logging.info("Successfully connected to BSC network.")
@@ -97,8 +288,7 @@ def initialize_bsc_provider():
 def initialize_eth_provider():
     """Initialize Web3 provider for Ethereum."""
     provider_url = "https://mainnet.infura.io/v3/e3664c8b17c54e7190eea5218400539d"  # Replace with your Infura project ID
-    provider = Web3(Web3.HTTPProvider(provider_url))
-    provider.middleware_onion.inject(geth_poa_middleware, layer=0)
+    provider = get_web3('ETH', provider_url)
 
     if provider.is_connected():
         logging.info("Successfully connected to Ethereum network.")
@@ -109,7 +299,8 @@ def initialize_eth_provider():
 
 def initialize_solana_provider():
     """Initialize Solana provider."""
-    provider = Client("https://api.mainnet-beta.solana.com")
+    from utils.solana_chain import connect  # Solana SDK is only loaded when a Solana client is needed
+    provider = connect("https://api.mainnet-beta.solana.com")
     
     if provider.is_connected():
         logging.info("Successfully connected to Solana network.")
@@ -130,7 +321,7 @@ if __name__ == "__main__":
     # Initialize providers
     bsc_provider = initialize_bsc_provider()
     eth_provider = initialize_eth_provider()
-    solana_provider = initialize_solana_provider()
+    solana_provider = get_solana_data()
     
     # Analyze tokens on BSC, ETH, and Solana
     analyze_token(bsc_token_address, bsc_provider, contract_address, api_key, 'bsc')
@@ -0,0 +1,188 @@
+# modules/positions.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from config import (WALLET_ADDRESS, WRAPPED_NATIVE, STOP_LOSS_PERCENTAGE, TAKE_PROFIT_PERCENTAGE, MAX_TOKENS,
+                    SLIPPAGE_TOLERANCE)
+from modules.transaction import sell
+from utils.journal import trade_journal
+from utils.amm import SWAP_FEES, amount_out_min_exact, get_amount_out
+from utils.multicall import multicall, with_address, BALANCE_OF, GET_RESERVES
+
+
+class Position:
+    """One open position: what was paid for a token and how much of it the wallet holds."""
+    __slots__ = ('token', 'chain', 'pair', 'cost_wei', 'token_is_token0', 'opened_at', 'amount', 'value_wei',
+                 'reserves', 'closing')
+
+    def __init__(self, token, chain, pair, cost_wei):
+        self.token = token.lower()
+        self.chain = chain
+        self.pair = pair.lower()
+        self.cost_wei = cost_wei
+        # Uniswap V2 orders a pair's tokens by address
+        self.token_is_token0 = int(self.token, 16) < int(WRAPPED_NATIVE[chain], 16)
+        self.opened_at = time.monotonic()
+        self.amount = 0  # Token balance, known once the buy is mined
+        self.value_wei = None
+        self.reserves = None  # (token, native) reserves of the pair at the last valuation
+        self.closing = False
+
+    @property
+    def pnl_percentage(self):
+        if self.value_wei is None or not self.cost_wei:
+            return None
+        return (self.value_wei / self.cost_wei - 1) * 100
+
+
+class PositionBook:
+    """Open positions, re-priced every block with one Multicall3 read per chain.
+
+    Each new head wakes the chain's pricing thread, which reads getReserves of
+    every pair and the wallet's balance of every token in a single aggregate3
+    call, values all positions at once, and sells through
+    modules.transaction.sell when a stop-loss or take-profit threshold is hit,
+    with amountOutMin taken from those reserves. Changes to the book and to a
+    position's closing flag happen under one lock, so a position is never sold
+    twice.
+    """
+
+    def __init__(self, stop_loss=STOP_LOSS_PERCENTAGE, take_profit=TAKE_PROFIT_PERCENTAGE, max_positions=MAX_TOKENS,
+                 wallet_address=WALLET_ADDRESS, seller=sell, reader=multicall, poll_interval=3.0, fill_timeout=300,
+                 journal=trade_journal, slippage=SLIPPAGE_TOLERANCE):
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.max_positions = max_positions
+        self.wallet_address = (wallet_address or '').lower()
+        self.seller = seller
+        self.reader = reader
+        self.poll_interval = poll_interval
+        self.fill_timeout = fill_timeout
+        self.journal = journal
+        self.slippage = slippage
+        self.positions = {}
+        self._lock = threading.Lock()
+        self._wake = {}
+        self._threads = {}
+        self._sell_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='positions-sell')
+
+    def can_open(self):
+        return len(self.positions) < self.max_positions
+
+    def open(self, token, chain, pair, cost_wei):
+        """Record a buy; the position is valued from the next block on."""
+        with self._lock:
+            if not self.can_open():
+                logging.warning("Position book is full (%s); not tracking %s.", self.max_positions, token)
+                return None
+            position = self.positions[(chain, token.lower())] = Position(token, chain, pair, cost_wei)
+        self.journal.record('open', chain=chain, token=position.token, pair=position.pair, cost_wei=cost_wei)
+        logging.info("Opened position in %s on %s for %s wei.", token, chain, cost_wei)
+        return position
+
+    def start(self, providers):
+        """Start one pricing thread per chain; `providers` maps chain to its Web3 instance."""
+        for chain, provider in providers.items():
+            if chain not in self._threads:
+                self._wake[chain] = threading.Event()
+                self._threads[chain] = threading.Thread(target=self._run, args=(chain, provider),
+                                                        name=f"positions-{chain}", daemon=True)
+                self._threads[chain].start()
+        return self
+
+    def on_new_head(self, chain, header):
+        """Head listener: re-price the chain's positions for the new block."""
+        wake = self._wake.get(chain)
+        if wake is not None:
+            wake.set()
+
+    def _run(self, chain, provider):
+        wake = self._wake[chain]
+        while True:
+            wake.wait(self.poll_interval)
+            wake.clear()
+            try:
+                self.reprice(chain, provider)
+            except Exception as e:
+                logging.error("Re-pricing %s positions failed: %s", chain, e)
+
+    def reprice(self, chain, provider):
+        """Value every open position of a chain from one batched read and fire the exits that are due."""
+        with self._lock:
+            positions = [p for p in self.positions.values() if p.chain == chain and not p.closing]
+        if not positions:
+            return []
+        calls = []
+        for position in positions:
+            calls += [(position.pair, GET_RESERVES), (position.token, with_address(BALANCE_OF, self.wallet_address))]
+        results = self.reader(provider, calls)
+
+        reserves_token, reserves_native = np.zeros(len(positions)), np.zeros(len(positions))
+        priced = [False] * len(positions)
+        for i, position in enumerate(positions):
+            (reserves_ok, reserves), (balance_ok, balance) = results[2 * i], results[2 * i + 1]
+            if reserves_ok and len(reserves) >= 64:
+                priced[i] = True
+                reserve0, reserve1 = int.from_bytes(reserves[:32], 'big'), int.from_bytes(reserves[32:64], 'big')
+                position.reserves = (reserve0, reserve1) if position.token_is_token0 else (reserve1, reserve0)
+                reserves_token[i], reserves_native[i] = position.reserves
+            if balance_ok and len(balance) >= 32:
+                position.amount = int.from_bytes(balance[:32], 'big')
+
+        amounts = np.array([position.amount for position in positions], dtype=np.float64)
+        values = get_amount_out(amounts, reserves_token, reserves_native, SWAP_FEES[chain])
+
+        triggered = []
+        for position, value, ok in zip(positions, values, priced):
+            if not ok:
+                continue  # Keep the last valuation rather than act on a failed read
+            if not position.amount:
+                if time.monotonic() - position.opened_at > self.fill_timeout:
+                    logging.warning("Buy of %s on %s never filled; dropping the position.", position.token, chain)
+                    with self._lock:
+                        if self.positions.get((chain, position.token)) is position and not position.closing:
+                            del self.positions[(chain, position.token)]
+                continue
+            position.value_wei = int(value)
+            pnl = position.pnl_percentage
+            if pnl <= -self.stop_loss:
+                triggered.append((position, 'stop-loss'))
+            elif pnl >= self.take_profit:
+                triggered.append((position, 'take-profit'))
+        return [(position, reason) for position, reason in triggered if self._exit(position, reason)]
+
+    def _exit(self, position, reason):
+        """Start selling a position; False if it is already being sold or has left the book."""
+        with self._lock:
+            if position.closing or self.positions.get((position.chain, position.token)) is not position:
+                return False
+            position.closing = True
+        reserve_token, reserve_native = position.reserves
+        amount_out_min = amount_out_min_exact(position.amount, reserve_token, reserve_native, self.slippage,
+                                              SWAP_FEES[position.chain])
+        self.journal.record('exit', chain=position.chain, token=position.token, reason=reason,
+                            pnl_percentage=position.pnl_percentage, amount=position.amount,
+                            cost_wei=position.cost_wei, value_wei=position.value_wei)
+        logging.info("%s hit for %s on %s: PnL %.1f%%; selling %d.", reason, position.token, position.chain,
+                     position.pnl_percentage, position.amount)
+        future = self._sell_executor.submit(self.seller, position.token, position.amount, position.chain,
+                                            amount_out_min)
+        future.add_done_callback(lambda done: self._exited(position, done))
+        return True
+
+    def _exited(self, position, future):
+        if future.exception() is None and future.result():
+            with self._lock:
+                self.positions.pop((position.chain, position.token), None)
+            self.journal.record('sell', chain=position.chain, token=position.token, tx_hash=future.result())
+            logging.info("Closed position in %s on %s: %s", position.token, position.chain, future.result())
+        else:
+            with self._lock:
+                position.closing = False  # Retry on the next block
+            logging.error("Exit sell of %s on %s failed; retrying next block.", position.token, position.chain)
+
+
+# Process-wide position book; sniper.main starts its pricing threads
+position_book = PositionBook()
@@ -0,0 +1,200 @@
+# modules/simulator.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import NamedTuple, Optional
+from eth_abi import decode, encode
+from web3 import Web3
+from config import (ROUTER_ADDRESSES, WRAPPED_NATIVE, MAX_BUY_TAX, MAX_SELL_TAX, SIMULATION_DEADLINE,
+                    SIMULATION_URLS)
+from utils.multicall import MULTICALL3_ADDRESS, BALANCE_OF, with_address
+
+# Router and helper selectors used by the simulated round trip
+SWAP_EXACT_ETH_FOR_TOKENS_FOT = bytes.fromhex("b6f9de95")  # swapExactETHForTokensSupportingFeeOnTransferTokens
+SWAP_EXACT_TOKENS_FOR_ETH_FOT = bytes.fromhex("791ac947")  # swapExactTokensForETHSupportingFeeOnTransferTokens
+GET_AMOUNTS_OUT = bytes.fromhex("d06ca61f")  # getAmountsOut(uint256,address[])
+APPROVE = bytes.fromhex("095ea7b3")  # approve(address,uint256)
+GET_ETH_BALANCE = bytes.fromhex("4d2301cc")  # Multicall3.getEthBalance(address)
+
+MAX_UINT256 = 2**256 - 1
+SIMULATED_BALANCE = 10**24  # Native coin credited to the wallet through the state override
+
+
+class SimulationResult(NamedTuple):
+    """Outcome of a simulated buy-then-sell of one token."""
+    token: str
+    passed: bool
+    buy_tax: Optional[float] = None
+    sell_tax: Optional[float] = None
+    buy_gas: Optional[int] = None
+    sell_gas: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SimulationError(Exception):
+    """A simulated call reverted or the node rejected the simulation."""
+
+
+class SimulationUnsupported(SimulationError):
+    """The node does not implement eth_simulateV1."""
+
+
+def is_unsupported(error):
+    """Whether a JSON-RPC error means the method is not available on the node."""
+    message = str(error.get('message', '')).lower() if isinstance(error, dict) else str(error).lower()
+    return (isinstance(error, dict) and error.get('code') == -32601) or any(
+        phrase in message for phrase in ('method not found', 'does not exist', 'not supported'))
+
+
+class Simulator:
+    """Honeypot screening through simulated round trips.
+
+    Each candidate is bought through the router and sold straight back inside
+    eth_simulateV1 against the latest block, with the wallet's balance set by a
+    state override, so nothing is signed or spent. Point SIMULATION_URLS at a
+    local forked node (e.g. `anvil --fork-url ...`) to keep this load off the
+    main endpoints. Candidates are simulated on a worker pool, each under its
+    own deadline, so a slow token never holds up the others. If the node does
+    not implement eth_simulateV1, every token is rejected without asking it
+    again: an unscreened token is never let through.
+    """
+
+    def __init__(self, provider, chain, wallet_address, value_wei, max_workers=16, deadline=SIMULATION_DEADLINE,
+                 max_buy_tax=MAX_BUY_TAX, max_sell_tax=MAX_SELL_TAX):
+        self.provider = provider
+        self.chain = chain
+        self.wallet_address = Web3.to_checksum_address(wallet_address)
+        self.value_wei = value_wei
+        self.deadline = deadline
+        self.max_buy_tax = max_buy_tax
+        self.max_sell_tax = max_sell_tax
+        self.supported = True
+        self.router_address = Web3.to_checksum_address(ROUTER_ADDRESSES[chain])
+        self.wrapped_native = Web3.to_checksum_address(WRAPPED_NATIVE[chain])
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"simulate-{chain}")
+
+    def _call(self, to, data, value=0):
+        return {'from': self.wallet_address, 'to': to, 'data': Web3.to_hex(data), 'value': hex(value)}
+
+    def _simulate(self, calls):
+        """Run calls back to back in one simulated block and return their results."""
+        if not self.supported:
+            raise SimulationUnsupported(f"eth_simulateV1 is not supported by the {self.chain} simulation node")
+        response = self.provider.provider.make_request('eth_simulateV1', [{
+            'blockStateCalls': [{
+                'stateOverrides': {self.wallet_address: {'balance': hex(SIMULATED_BALANCE)}},
+                'calls': calls,
+            }],
+            'validation': False,
+        }, 'latest'])
+        if 'error' in response:
+            if is_unsupported(response['error']):
+                self.supported = False
+                logging.error("eth_simulateV1 is not supported by the %s simulation node; rejecting every token "
+                              "until SIMULATION_URLS points at one that does: %s", self.chain, response['error'])
+                raise SimulationUnsupported(f"eth_simulateV1 is not supported: {response['error']}")
+            raise SimulationError(f"eth_simulateV1 failed: {response['error']}")
+        return response['result'][0]['calls']
+
+    @staticmethod
+    def _return_data(result, what):
+        if int(result['status'], 16) != 1:
+            raise SimulationError(f"{what} reverted: {result.get('error', {}).get('message', 'no reason')}")
+        return bytes.fromhex(result['returnData'][2:])
+
+    def _buy_call(self, token, deadline):
+        data = SWAP_EXACT_ETH_FOR_TOKENS_FOT + encode(['uint256', 'address[]', 'address', 'uint256'],
+                                                      [0, [self.wrapped_native, token], self.wallet_address, deadline])
+        return self._call(self.router_address, data, self.value_wei)
+
+    def _amounts_out_call(self, amount_in, path):
+        return self._call(self.router_address, GET_AMOUNTS_OUT + encode(['uint256', 'address[]'], [amount_in, path]))
+
+    def simulate(self, token):
+        """Simulate buying `token` for value_wei and selling everything back; never raises."""
+        token = Web3.to_checksum_address(token)
+        deadline = int(time.time()) + 300
+        balance_call = self._call(token, with_address(BALANCE_OF, self.wallet_address.lower()))
+        eth_balance_call = self._call(MULTICALL3_ADDRESS, with_address(GET_ETH_BALANCE, self.wallet_address.lower()))
+        try:
+            # Round 1: quote, buy and read how many tokens actually arrived
+            before, quote, buy, after = self._simulate([
+                balance_call,
+                self._amounts_out_call(self.value_wei, [self.wrapped_native, token]),
+                self._buy_call(token, deadline),
+                balance_call,
+            ])
+            expected = decode(['uint256[]'], self._return_data(quote, "Buy quote"))[0][-1]
+            self._return_data(buy, "Buy")
+            bought = (int.from_bytes(self._return_data(after, "balanceOf"), 'big')
+                      - int.from_bytes(self._return_data(before, "balanceOf"), 'big'))
+            if bought <= 0:
+                raise SimulationError("Buy delivered no tokens")
+
+            # Round 2: same buy, then approve and sell the tokens received straight back
+            sell_data = SWAP_EXACT_TOKENS_FOR_ETH_FOT + encode(
+                ['uint256', 'uint256', 'address[]', 'address', 'uint256'],
+                [bought, 0, [token, self.wrapped_native], self.wallet_address, deadline])
+            _, _, sell_quote, native_before, sell, native_after = self._simulate([
+                self._buy_call(token, deadline),
+                self._call(token, APPROVE + encode(['address', 'uint256'], [self.router_address, MAX_UINT256])),
+                self._amounts_out_call(bought, [token, self.wrapped_native]),
+                eth_balance_call,
+                self._call(self.router_address, sell_data),
+                eth_balance_call,
+            ])
+            expected_native = decode(['uint256[]'], self._return_data(sell_quote, "Sell quote"))[0][-1]
+            self._return_data(sell, "Sell")
+            received = (int.from_bytes(self._return_data(native_after, "getEthBalance"), 'big')
+                        - int.from_bytes(self._return_data(native_before, "getEthBalance"), 'big'))
+        except Exception as e:
+            return SimulationResult(token, False, error=str(e))
+
+        buy_tax = max(0.0, 1 - bought / expected) if expected else None
+        sell_tax = max(0.0, 1 - received / expected_native) if expected_native else None
+        passed = (buy_tax is not None and buy_tax <= self.max_buy_tax
+                  and sell_tax is not None and sell_tax <= self.max_sell_tax)
+        return SimulationResult(token, passed, buy_tax, sell_tax, int(buy['gasUsed'], 16), int(sell['gasUsed'], 16))
+
+    def submit(self, token):
+        """Queue a simulation on the worker pool and return its Future."""
+        return self._executor.submit(self.simulate, token)
+
+    def screen(self, token):
+        """Simulate one token, giving up once the deadline has passed."""
+        return self.screen_many([token])[0]
+
+    def screen_many(self, tokens):
+        """Simulate many tokens concurrently; each gets `deadline` seconds from submission."""
+        submitted = time.monotonic()
+        futures = [self.submit(token) for token in tokens]
+        results = []
+        for token, future in zip(tokens, futures):
+            try:
+                result = future.result(timeout=max(0.0, submitted + self.deadline - time.monotonic()))
+            except FutureTimeoutError:
+                future.cancel()
+                result = SimulationResult(token, False, error=f"Simulation exceeded {self.deadline}s deadline")
+            log = logging.info if result.passed else logging.warning
+            log("Simulated round trip of %s token %s: passed=%s buy_tax=%s sell_tax=%s buy_gas=%s sell_gas=%s "
+                "error=%s", self.chain, token, result.passed, result.buy_tax, result.sell_tax, result.buy_gas,
+                result.sell_gas, result.error)
+            results.append(result)
+        return results
+
+
+_simulators = {}
+_simulators_lock = threading.Lock()
+
+
+def get_simulator(provider, chain, wallet_address, value_wei):
+    """Return the shared simulator of a chain and buy size, on the chain's simulation node if one is configured."""
+    key = (chain, value_wei)
+    with _simulators_lock:
+        simulator = _simulators.get(key)
+        if simulator is None:
+            if SIMULATION_URLS.get(chain):
+                provider = Web3(Web3.HTTPProvider(SIMULATION_URLS[chain]))
+            simulator = _simulators[key] = Simulator(provider, chain, wallet_address, value_wei)
+        return simulator
@@ -1,37 +1,23 @@
 # modules/transaction.py
 import logging
-from utils.blockchain import Blockchain
-from utils.wallet import buy_token, sell_token # Assuming sell_token function exists
-from config import BSC_NODE_URL, SOLANA_RPC_URL
+from utils.wallet import buy_token, sell_token
 
 def buy(token, amount, blockchain):
-    logging.info(f"Initiating buy for token: {token} with amount: {amount} on {blockchain}")
+    logging.info("Initiating buy for token: %s with amount: %s on %s", token, amount, blockchain)
     try:
-        if blockchain == 'ETH':
-            blockchain_instance = Blockchain(BSC_NODE_URL, 'ETH')
-        elif blockchain == 'BSC':
-            blockchain_instance = Blockchain(BSC_NODE_URL, 'BSC')
-        elif blockchain == 'SOL':
-            blockchain_instance = Blockchain(SOLANA_RPC_URL, 'SOL')
-        
-        # Call buy_token from wallet.py
-        buy_token(token, amount, blockchain_instance)
-        logging.info(f"Successfully bought {amount} of {token} on {blockchain}.")
+        # buy_token routes through the shared per-chain provider pool
+        result = buy_token(token, amount, blockchain)
+        logging.info("Successfully bought %s of %s on %s.", amount, token, blockchain)
+        return result
     except Exception as e:
-        logging.error(f"Error buying token: {str(e)}")
+        logging.error("Error buying token: %s", e)
 
-def sell(token, amount, blockchain):
-    logging.info(f"Initiating sell for token: {token} with amount: {amount} on {blockchain}")
+def sell(token, amount, blockchain, amount_out_min=0):
+    logging.info("Initiating sell for token: %s with amount: %s on %s", token, amount, blockchain)
     try:
-        if blockchain == 'ETH':
-            blockchain_instance = Blockchain(BSC_NODE_URL, 'ETH')
-        elif blockchain == 'BSC':
-            blockchain_instance = Blockchain(BSC_NODE_URL, 'BSC')
-        elif blockchain == 'SOL':
-            blockchain_instance = Blockchain(SOLANA_RPC_URL, 'SOL')
-
-        # Call sell_token from wallet.py
-        sell_token(token, amount, blockchain_instance)
-        logging.info(f"Successfully sold {amount} of {token} on {blockchain}.")
+        # sell_token routes through the shared per-chain provider pool
+        result = sell_token(token, amount, blockchain, amount_out_min)
+        logging.info("Successfully sold %s of %s on %s.", amount, token, blockchain)
+        return result
     except Exception as e:
-        logging.error(f"Error selling token: {str(e)}")
+        logging.error("Error selling token: %s", e)
@@ -1,88 +1,239 @@
 # sniper.py
 import os
+import asyncio
 import json
 import logging
 import time
-from typing import List, Optional
-from dotenv import load_dotenv
+from typing import List, Optional, Tuple
 from utils.monitor import Monitoring
-from modules.analyzer import analyze_token
-from utils.wallet import buy_token
-from config import WALLET_ADDRESS, PRIVATE_KEY, MAX_INVESTMENT_AMOUNT, INFURA_PROJECT_ID, BSC_NODE_URL
+from web3 import Web3
+from modules.analyzer import analyze_token, analyze_solana_token
+from modules.simulator import get_simulator
+from modules.positions import position_book
+from utils.wallet import buy_token, prepare_buy_templates, get_provider
+from utils.chains import evm_chains
+from utils.templates import mark_detected
+from utils.fees import on_new_head
+from utils.pipeline import Pipeline, Stage, DROP_OLDEST
+from utils.registry import token_registry, TokenState
+from utils.mempool import MempoolMonitor
+from utils.reserves import get_reserve_index
+from utils.journal import trade_journal
+from utils.logger import setup_logger
+from utils.metrics import metrics, start_metrics_server
+from utils.amm import SWAP_FEES, size_trades, amount_out_min_exact
+from config import (WALLET_ADDRESS, PRIVATE_KEY, MAX_INVESTMENT_AMOUNT, INFURA_PROJECT_ID, BSC_NODE_URL,
+                    ETHERSCAN_API_KEY, BSCSCAN_API_KEY, ETH_WS_URL, BSC_WS_URL, ANALYSIS_CONCURRENCY,
+                    EXECUTION_CONCURRENCY, WATCH_MEMPOOL, WRAPPED_NATIVE, MAX_PRICE_IMPACT, SLIPPAGE_TOLERANCE,
+                    METRICS_PORT)
 
-# Configure logging
-logging.basicConfig(
-    filename='sniper_bot.log', 
-    level=logging.INFO,
-    format='%(asctime)s:%(levelname)s:%(message)s'
-)
-
-# Load environment variables
-load_dotenv()
+# Network name analyze_token expects per chain
+ANALYSIS_NETWORKS = {'ETH': 'ethereum', 'BSC': 'bsc'}
 
 def load_abi(file_path: str) -> dict:
     """Load and return ABI from the specified JSON file."""
-    logging.info(f"Loading ABI from {file_path}")
+    logging.info("Loading ABI from %s", file_path)
     try:
         with open(file_path, 'r') as abi_file:
             abi = json.load(abi_file)
         logging.info("ABI successfully loaded.")
         return abi
     except Exception as e:
-        logging.error(f"Failed to load ABI from {file_path}: {str(e)}")
+        logging.error("Failed to load ABI from %s: %s", file_path, e)
         raise
 
 def determine_blockchain(token: str, eth_tokens: List[str], bsc_tokens: List[str], sol_tokens: List[str]) -> Optional[str]:
-    """Determine the blockchain based on the token."""
+    """Determine the blockchain based on the token, from the registry first and then the given lists."""
+    chain = token_registry.chain_of(token)
+    if chain:
+        return chain
     if token in eth_tokens:
         return 'ETH'
     elif token in bsc_tokens:
         return 'BSC'
     elif token in sol_tokens:
         return 'SOL'
-    logging.error(f"Unknown blockchain for token: {token}")
+    logging.error("Unknown blockchain for token: %s", token)
     return None
 
 def initialize_monitoring() -> Monitoring:
     """Initialize and return a Monitoring instance with blockchain URLs and factory addresses."""
-    return Monitoring(
+    monitor = Monitoring(
         eth_url=f"https://mainnet.infura.io/v3/{INFURA_PROJECT_ID}",
         bsc_url=BSC_NODE_URL,
         uniswap_address="0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f",
-        pancakeswap_address="0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73"
+        pancakeswap_address="0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73",
+        etherscan_api_key=ETHERSCAN_API_KEY,
+        bscscan_api_key=BSCSCAN_API_KEY,
+        eth_ws_url=ETH_WS_URL,
+        bsc_ws_url=BSC_WS_URL,
+        chains=evm_chains()
     )
+    monitor.add_head_listener(on_new_head)  # Pushed heads keep the fee oracles current
+    monitor.add_head_listener(position_book.on_new_head)  # ...and re-price open positions every block
+    monitor.add_head_listener(metrics.on_new_head)  # Block timestamps and buy receipts for the latency metrics
+    return monitor
 
-def process_token(token: str, eth_tokens: List[str], bsc_tokens: List[str], sol_tokens: List[str]) -> None:
-    """Analyze and buy the token if analysis is successful."""
+def screen_token(token: str, blockchain: str) -> bool:
+    """Simulate buying and selling back the token; only EVM chains are simulated."""
+    if blockchain not in ('ETH', 'BSC'):
+        return True
+    simulator = get_simulator(get_provider(blockchain), blockchain, WALLET_ADDRESS,
+                              Web3.to_wei(MAX_INVESTMENT_AMOUNT, 'ether'))
+    return simulator.screen(token).passed
+
+def analyze_candidate(token: str, eth_tokens: List[str], bsc_tokens: List[str], sol_tokens: List[str]) -> Optional[str]:
+    """Run analysis and the buy/sell simulation; return the token's blockchain if it should be bought."""
     blockchain = determine_blockchain(token, eth_tokens, bsc_tokens, sol_tokens)
     if not blockchain:
-        logging.warning(f"Skipping token {token}: Blockchain could not be determined.")
-        return
+        logging.warning("Skipping token %s: Blockchain could not be determined.", token)
+        return None
 
-    if analyze_token(token):
-        try:
-            buy_token(token, MAX_INVESTMENT_AMOUNT, blockchain)
-            logging.info(f"Purchased {token} on {blockchain}.")
-        except Exception as e:
-            logging.error(f"Failed to buy {token} on {blockchain}: {e}")
+    if blockchain == 'SOL':
+        passed = analyze_solana_token(token)  # Batched with the burst's other Solana lookups
     else:
-        logging.info(f"Token {token} did not pass analysis.")
+        network = ANALYSIS_NETWORKS.get(blockchain)
+        passed = network is not None and analyze_token(token, network=network)
+    if not passed:
+        logging.info("Token %s did not pass analysis.", token)
+        return None
+    if not screen_token(token, blockchain):
+        logging.info("Token %s failed the buy/sell simulation.", token)
+        return None
+    return blockchain
+
+def size_buy(token: str, blockchain: str) -> Optional[Tuple[float, int]]:
+    """Size the buy from the pair's cached reserves: (amount in native coin, amountOutMin), or None if unknown."""
+    if blockchain not in ('ETH', 'BSC'):
+        return None
+    index = get_reserve_index(blockchain)
+    pair = index.pair_for(token)
+    reserves = pair and index.reserves_for(pair, WRAPPED_NATIVE[blockchain])
+    if not reserves or not all(reserves):
+        return None
+    native_reserve, token_reserve = reserves
+    fee = SWAP_FEES[blockchain]
+    amount_in, _, _ = size_trades(native_reserve, token_reserve, Web3.to_wei(MAX_INVESTMENT_AMOUNT, 'ether'),
+                                  MAX_PRICE_IMPACT, SLIPPAGE_TOLERANCE, fee)
+    amount_in = int(amount_in)
+    return (float(Web3.from_wei(amount_in, 'ether')),
+            amount_out_min_exact(amount_in, native_reserve, token_reserve, SLIPPAGE_TOLERANCE, fee))
+
+def release_pair(token: str, blockchain: Optional[str]) -> None:
+    """Stop following the reserves of a token's pair once the bot is done deciding on it."""
+    if blockchain in ('ETH', 'BSC'):
+        get_reserve_index(blockchain).untrack(token)
+
+def execute_buy(token: str, blockchain: str) -> Optional[float]:
+    """Buy a token that cleared analysis; returns the amount spent in native coin, or None if nothing was bought."""
+    try:
+        sized = size_buy(token, blockchain)
+        if sized is None:
+            amount = MAX_INVESTMENT_AMOUNT
+            buy_token(token, MAX_INVESTMENT_AMOUNT, blockchain)
+        elif not sized[0]:
+            logging.info("Skipping %s: the pool is too shallow for a buy within %.0f%% price impact.", token, MAX_PRICE_IMPACT * 100)
+            trade_journal.record('skipped', chain=blockchain, token=token, reason='price_impact')
+            return None
+        else:
+            amount = sized[0]
+            buy_token(token, amount, blockchain, amount_out_min=sized[1])
+        logging.info("Purchased %s on %s.", token, blockchain)
+        return amount
+    except Exception as e:
+        logging.error("Failed to buy %s on %s: %s", token, blockchain, e)
+        return None
+
+def process_token(token: str, eth_tokens: List[str], bsc_tokens: List[str], sol_tokens: List[str]) -> None:
+    """Analyze and buy the token if analysis is successful."""
+    blockchain = analyze_candidate(token, eth_tokens, bsc_tokens, sol_tokens)
+    if blockchain:
+        execute_buy(token, blockchain)
+
+def build_pipeline(eth_tokens: List[str], bsc_tokens: List[str], sol_tokens: List[str]) -> Pipeline:
+    """Wire the detection, analysis and execution stages together."""
+    async def detect(pair):
+        if not token_registry.register(pair.token, pair.chain, pair.pair):
+            logging.info("Skipping %s: already seen.", pair.token)
+            return None
+        mark_detected(pair.token)
+        trade_journal.record('detected', chain=pair.chain, dex=pair.dex, token=pair.token, pair=pair.pair,
+                             block=pair.block_number)
+        return pair.token
+
+    def analyze(token):
+        start = time.perf_counter()
+        blockchain = analyze_candidate(token, eth_tokens, bsc_tokens, sol_tokens)
+        token_registry.set_state(token, TokenState.ANALYZED if blockchain else TokenState.REJECTED, blockchain)
+        if not blockchain:
+            release_pair(token, token_registry.chain_of(token))
+        trade_journal.record('analyzed', chain=blockchain, token=token, passed=blockchain is not None,
+                             analysis_ms=(time.perf_counter() - start) * 1000)
+        return (token, blockchain) if blockchain else None
+
+    def execute(candidate):
+        token, blockchain = candidate
+        if not position_book.can_open():
+            logging.info("Skipping %s: already holding %d positions.", token, position_book.max_positions)
+            trade_journal.record('skipped', chain=blockchain, token=token, reason='max_positions')
+            release_pair(token, blockchain)
+            return
+        amount = execute_buy(token, blockchain)
+        if amount:
+            token_registry.set_state(token, TokenState.BOUGHT, blockchain)
+            pair = get_reserve_index(blockchain).pair_for(token) if blockchain in ('ETH', 'BSC') else None
+            if pair:
+                position_book.open(token, blockchain, pair, Web3.to_wei(amount, 'ether'))
+        release_pair(token, blockchain)  # Open positions are re-priced by the position book itself
+
+    return Pipeline([
+        Stage('detect', detect, concurrency=1, maxsize=1000),
+        # A token that waited behind a full burst is the least likely to still be worth sniping
+        Stage('analyze', analyze, concurrency=ANALYSIS_CONCURRENCY, maxsize=256, policy=DROP_OLDEST),
+        Stage('execute', execute, concurrency=EXECUTION_CONCURRENCY, maxsize=64),
+    ])
+
+async def watch_pending_liquidity(mempool: MempoolMonitor) -> None:
+    """Stamp tokens as detected the moment liquidity for them shows up in the mempool."""
+    async for candidate in mempool.stream():
+        mark_detected(candidate.token)
+        trade_journal.record('pending_liquidity', chain=candidate.chain, dex=candidate.dex, token=candidate.token,
+                             tx_hash=candidate.tx_hash, token_amount=candidate.token_amount,
+                             paired_amount=candidate.paired_amount)
+        logging.info("[%s] Pending liquidity for %s: %d tokens against %d of %s (tx %s)", candidate.dex, candidate.token,
+                     candidate.token_amount, candidate.paired_amount, candidate.paired_token, candidate.tx_hash)
+
+async def run_bot(monitor: Monitoring, eth_tokens: List[str], bsc_tokens: List[str], sol_tokens: List[str]) -> None:
+    """Run the detection pipeline, plus the mempool watcher when enabled."""
+    pipeline = build_pipeline(eth_tokens, bsc_tokens, sol_tokens).run(monitor.stream_new_pairs())
+    if not WATCH_MEMPOOL:
+        await pipeline
+        return
+    ws_urls = {'ETH': ETH_WS_URL, 'BSC': BSC_WS_URL}
+    mempool = MempoolMonitor({chain: ws_urls[chain] for chain in evm_chains() if chain in ws_urls})
+    await asyncio.gather(pipeline, watch_pending_liquidity(mempool))
 
 def main() -> None:
+    setup_logger()
     logging.info("Sniper bot initiated.")
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
     monitor = initialize_monitoring()
+    prepare_buy_templates(MAX_INVESTMENT_AMOUNT)
 
-    eth_tokens, bsc_tokens, sol_tokens = [], [], []  # Initialize blockchain-specific token lists
+    token_registry.load()  # Tokens seen before the restart are not processed again
+    position_book.start({chain: get_provider(chain) for chain in evm_chains()})
+    eth_tokens, bsc_tokens, sol_tokens = [], [], []  # Extra tokens to route; detected ones live in the registry
 
     while True:
         try:
-            new_tokens = monitor.monitor_new_tokens()
-            for token in new_tokens:
-                process_token(token, eth_tokens, bsc_tokens, sol_tokens)
-            time.sleep(10)
+            asyncio.run(run_bot(monitor, eth_tokens, bsc_tokens, sol_tokens))
+        except KeyboardInterrupt:
+            logging.info("Sniper bot stopped.")
+            break
         except Exception as e:
-            logging.error(f"Error in main loop: {e}")
-            time.sleep(60)  # Retry after delay on failure
+            logging.error("Pipeline stopped unexpectedly: %s; restarting.", e)
+            time.sleep(1)
 
 if __name__ == "__main__":
     main()
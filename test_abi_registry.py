@@ -0,0 +1,101 @@
+# test_abi_registry.py
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import MagicMock
+from utils.abi_registry import AbiRegistry, normalize_chain
+
+ADDRESS = "0x00000000000000000000000000000000000000A1"
+ABI = [{'type': 'function', 'name': 'name', 'inputs': [], 'outputs': [{'type': 'string'}]}]
+UNISWAP_FACTORY = "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f"
+
+class TestNormalizeChain(unittest.TestCase):
+    def test_spellings(self):
+        for spelling in ('ETH', 'eth', 'ethereum', 'Ethereum'):
+            self.assertEqual(normalize_chain(spelling), 'ETH')
+        for spelling in ('BSC', 'bsc'):
+            self.assertEqual(normalize_chain(spelling), 'BSC')
+        self.assertEqual(normalize_chain('sol'), 'SOL')
+
+class TestAbiRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.client = MagicMock()
+        self.client.get_abi.return_value = ABI
+
+    def registry(self, **kwargs):
+        return AbiRegistry(cache_dir=self.tmp.name, client=self.client, **kwargs)
+
+    def test_miss_fetches_once_then_hits_memory(self):
+        registry = self.registry()
+        self.assertEqual(registry.get('ethereum', ADDRESS), ABI)
+        self.assertEqual(registry.get('ETH', ADDRESS.lower()), ABI)
+        self.client.get_abi.assert_called_once_with('ETH', ADDRESS.lower(), None)
+
+    def test_fetched_abi_persists_across_registries(self):
+        self.registry().get('BSC', ADDRESS)
+        path = os.path.join(self.tmp.name, 'BSC', f"{ADDRESS.lower()}.json")
+        with open(path) as abi_file:
+            self.assertEqual(json.load(abi_file), ABI)
+        self.assertEqual(os.listdir(os.path.dirname(path)), [os.path.basename(path)])
+
+        self.assertEqual(self.registry().get('bsc', ADDRESS), ABI)
+        self.client.get_abi.assert_called_once()
+
+    def test_chains_are_cached_separately(self):
+        registry = self.registry()
+        registry.get('ETH', ADDRESS)
+        registry.get('BSC', ADDRESS)
+        self.assertEqual(self.client.get_abi.call_count, 2)
+
+    def test_seeded_abis_never_reach_the_explorer(self):
+        abi = self.registry().get('eth', UNISWAP_FACTORY)
+        self.assertIn('getPair', {entry.get('name') for entry in abi})
+        self.client.get_abi.assert_not_called()
+
+    def test_unreadable_cache_file_is_refetched(self):
+        path = os.path.join(self.tmp.name, 'ETH', f"{ADDRESS.lower()}.json")
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'w') as abi_file:
+            abi_file.write("{not json")
+        self.assertEqual(self.registry().get('ETH', ADDRESS), ABI)
+        self.client.get_abi.assert_called_once()
+        with open(path) as abi_file:
+            self.assertEqual(json.load(abi_file), ABI)
+
+    def test_failed_fetch_is_not_cached(self):
+        self.client.get_abi.side_effect = [ValueError("not verified"), ABI]
+        registry = self.registry()
+        with self.assertRaises(ValueError):
+            registry.get('ETH', ADDRESS)
+        self.assertEqual(registry.get('ETH', ADDRESS), ABI)
+
+    def test_memory_tier_is_bounded(self):
+        registry = self.registry(max_entries=2)
+        addresses = [f"0x{i:040x}" for i in range(3)]
+        for address in addresses:
+            registry.put('ETH', address, ABI)
+        self.assertEqual(list(registry._memory), [('ETH', address) for address in addresses[1:]])
+        # The evicted entry is still on disk
+        self.assertEqual(registry.get('ETH', addresses[0]), ABI)
+        self.client.get_abi.assert_not_called()
+
+    def test_concurrent_misses_share_one_download(self):
+        release = threading.Event()
+        self.client.get_abi.side_effect = lambda *args: release.wait(5) and ABI
+        registry = self.registry()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get('ETH', ADDRESS))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [ABI] * 8)
+        self.client.get_abi.assert_called_once()
+
+if __name__ == "__main__":
+    unittest.main()
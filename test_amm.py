@@ -0,0 +1,58 @@
+# test_amm.py
+import random
+import unittest
+import numpy as np
+from utils.amm import (SWAP_FEES, get_amount_out, get_amount_in, price_impact, max_trade_size, size_trades,
+                       quote_grid, get_amount_out_exact, get_amount_in_exact, amount_out_min_exact)
+
+def random_pools(count, seed=7):
+    rng = random.Random(seed)
+    return ([rng.randint(10**17, 10**22) for _ in range(count)],  # native reserves
+            [rng.randint(10**20, 10**30) for _ in range(count)])  # token reserves
+
+class TestAmm(unittest.TestCase):
+    def test_vectorized_matches_exact_within_rounding(self):
+        reserves_in, reserves_out = random_pools(500)
+        amounts = [r // 100 for r in reserves_in]
+        for fee in SWAP_FEES.values():
+            fast = get_amount_out(amounts, reserves_in, reserves_out, fee)
+            exact = np.array([get_amount_out_exact(a, r_in, r_out, fee)
+                              for a, r_in, r_out in zip(amounts, reserves_in, reserves_out)], dtype=np.float64)
+            np.testing.assert_allclose(fast, exact, rtol=1e-12)
+
+    def test_amount_in_round_trips(self):
+        reserves_in, reserves_out = random_pools(200)
+        wanted = [r // 50 for r in reserves_out]
+        fast = get_amount_in(wanted, reserves_in, reserves_out)
+        for amount_out, r_in, r_out, amount_in in zip(wanted, reserves_in, reserves_out, fast):
+            exact = get_amount_in_exact(amount_out, r_in, r_out)
+            self.assertAlmostEqual(amount_in / exact, 1, places=12)
+            self.assertGreaterEqual(get_amount_out_exact(exact, r_in, r_out), amount_out)
+        self.assertEqual(get_amount_in(10, 100, 10), np.inf)
+        self.assertIsNone(get_amount_in_exact(10, 100, 10))
+
+    def test_max_trade_size_hits_the_impact_cap(self):
+        reserves_in, _ = random_pools(100)
+        sizes = max_trade_size(reserves_in, 0.05)
+        np.testing.assert_allclose(price_impact(sizes, reserves_in, 1), 0.05, atol=1e-9)
+        self.assertEqual(max_trade_size(10**18, 0.001), 0)  # Below the 0.3% fee no size fits
+
+    def test_size_trades_caps_by_budget_and_impact(self):
+        budget = 10**18
+        amount_in, expected, minimum = size_trades([10**24, 10**19, 0], [10**30, 10**30, 10**30], budget, 0.05, 0.1)
+        self.assertEqual(amount_in[0], budget)  # Deep pool: the whole budget fits
+        self.assertLess(amount_in[1], budget)  # Shallow pool: cut down to the impact cap
+        self.assertEqual((amount_in[2], expected[2]), (0, 0))  # Empty pool
+        np.testing.assert_allclose(minimum, np.floor(expected * 0.9))
+
+    def test_quote_grid_shape(self):
+        outs, impacts = quote_grid([10**20, 10**21, 10**22], [10**24] * 3, [10**16, 10**17, 10**18, 10**19])
+        self.assertEqual(outs.shape, (3, 4))
+        self.assertTrue((np.diff(impacts, axis=1) > 0).all())
+
+    def test_exact_amount_out_min(self):
+        self.assertEqual(amount_out_min_exact(10**18, 10**20, 10**24, 0.1),
+                         get_amount_out_exact(10**18, 10**20, 10**24) * 9 // 10)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# test_analyzer.py
+import threading
+import unittest
+from unittest import mock
+from config import WRAPPED_NATIVE
+from modules.analyzer import BatchAnalyzer, MAX_OWNER_SHARE, analyze_tokens
+from utils.multicall import BALANCE_OF, DECIMALS, GET_RESERVES, OWNER, TOKEN0, TOKEN1, TOTAL_SUPPLY, with_address
+
+WETH = WRAPPED_NATIVE['ETH'].lower()
+OWNER_ADDRESS = "0x" + "0e" * 20
+SUPPLY = 10**27
+
+def word(value):
+    return (int(value, 16) if isinstance(value, str) else value).to_bytes(32, 'big')
+
+class FakeChain:
+    """Answers Multicall3 sub-calls from per-contract state; unknown calls fail like a reverting view."""
+    def __init__(self):
+        self.calls = {}
+        self.round_trips = 0
+
+    def add_token(self, token, owner=OWNER_ADDRESS, owner_balance=0, decimals=18):
+        self.calls[(token, DECIMALS)] = word(decimals)
+        self.calls[(token, TOTAL_SUPPLY)] = word(SUPPLY)
+        self.calls[(token, OWNER)] = word(owner)
+        self.calls[(token, with_address(BALANCE_OF, owner))] = word(owner_balance)
+
+    def add_pair(self, pair, token0, token1, reserve0, reserve1):
+        self.calls[(pair, TOKEN0)] = word(token0)
+        self.calls[(pair, TOKEN1)] = word(token1)
+        self.calls[(pair, GET_RESERVES)] = word(reserve0) + word(reserve1) + word(0)
+
+    def multicall(self, provider, calls):
+        self.round_trips += 1
+        return [(True, self.calls[call]) if call in self.calls else (False, b'') for call in calls]
+
+def address(i):
+    return "0x%040x" % i
+
+class TestAnalyzeTokens(unittest.TestCase):
+    def setUp(self):
+        self.chain = FakeChain()
+        patcher = mock.patch('modules.analyzer.multicall', self.chain.multicall)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def analyze(self, *candidates):
+        return analyze_tokens(candidates, provider=None, chain='ETH', budget_wei=10**17)
+
+    def test_native_side_is_found_either_way_round(self):
+        # The token is token0 of the first pair and token1 of the second
+        self.chain.add_token(address(1))
+        self.chain.add_pair(address(101), address(1), WETH, 10**24, 5 * 10**18)
+        self.chain.add_token(address(2))
+        self.chain.add_pair(address(102), WETH, address(2), 7 * 10**18, 10**24)
+        first, second = self.analyze((address(1), address(101)), (address(2), address(102)))
+        self.assertEqual((first['native_reserve'], second['native_reserve']), (5 * 10**18, 7 * 10**18))
+        self.assertTrue(first['passed'] and second['passed'])
+        self.assertGreater(second['expected_tokens'], 0)
+        self.assertEqual(self.chain.round_trips, 2)
+
+    def test_failed_sub_calls_reject_only_their_token(self):
+        self.chain.add_token(address(1))
+        self.chain.add_pair(address(101), address(1), WETH, 10**24, 5 * 10**18)
+        self.chain.add_token(address(2))
+        self.chain.add_pair(address(102), address(2), WETH, 10**24, 5 * 10**18)
+        del self.chain.calls[(address(2), DECIMALS)]
+        self.chain.add_token(address(3))  # Its pair does not answer at all
+        results = self.analyze((address(1), address(101)), (address(2), address(102)), (address(3), address(103)))
+        self.assertEqual([result['passed'] for result in results], [True, False, False])
+        self.assertIsNone(results[1]['decimals'])
+        self.assertIsNone(results[2]['native_reserve'])
+
+    def test_pair_without_native_side_fails(self):
+        usdt = "0xdac17f958d2ee523a2206206994597c13d831ec7"
+        self.chain.add_token(address(1))
+        self.chain.add_pair(address(101), address(1), usdt, 10**24, 5 * 10**24)
+        result, = self.analyze((address(1), address(101)))
+        self.assertIsNone(result['native_reserve'])
+        self.assertFalse(result['passed'])
+
+    def test_zero_owner_is_not_looked_up(self):
+        self.chain.add_token(address(1), owner="0x" + "00" * 20)
+        self.chain.add_pair(address(101), address(1), WETH, 10**24, 5 * 10**18)
+        result, = self.analyze((address(1), address(101)))
+        self.assertIsNone(result['owner_share'])
+        self.assertTrue(result['passed'])
+
+    def test_owner_share_cut(self):
+        for i, share in ((1, MAX_OWNER_SHARE - 0.1), (2, MAX_OWNER_SHARE + 0.1)):
+            self.chain.add_token(address(i), owner_balance=int(SUPPLY * share))
+            self.chain.add_pair(address(100 + i), address(i), WETH, 10**24, 5 * 10**18)
+        below, above = self.analyze((address(1), address(101)), (address(2), address(102)))
+        self.assertAlmostEqual(above['owner_share'], MAX_OWNER_SHARE + 0.1)
+        self.assertEqual((below['passed'], above['passed']), (True, False))
+
+class TestBatchAnalyzer(unittest.TestCase):
+    def test_concurrent_analyses_share_one_burst(self):
+        bursts = []
+        def fake_analyze_tokens(candidates, provider, chain):
+            bursts.append(list(candidates))
+            return [{'token': token, 'passed': token != address(3)} for token, _ in candidates]
+
+        analyzer = BatchAnalyzer(provider=None, chain='ETH', window=0.05)
+        results = {}
+        with mock.patch('modules.analyzer.analyze_tokens', fake_analyze_tokens):
+            threads = [threading.Thread(target=lambda i=i: results.update(
+                {i: analyzer.analyze(address(i), address(100 + i))['passed']})) for i in range(1, 6)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(bursts), 1)
+        self.assertEqual(len(bursts[0]), 5)
+        self.assertEqual(results, {1: True, 2: True, 3: False, 4: True, 5: True})
+
+    def test_failed_burst_fails_every_waiter(self):
+        analyzer = BatchAnalyzer(provider=None, chain='ETH', window=0)
+        with mock.patch('modules.analyzer.analyze_tokens', side_effect=ValueError("Multicall3 eth_call failed")):
+            with self.assertLogs(level='ERROR'), self.assertRaises(ValueError):
+                analyzer.analyze(address(1), address(101))
+
+if __name__ == "__main__":
+    unittest.main()
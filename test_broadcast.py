@@ -0,0 +1,91 @@
+# test_broadcast.py
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.broadcast import BroadcastError, RaceBroadcaster
+
+RAW_TX = bytes.fromhex("f86b01")
+TX_HASH = "0x" + "ab" * 32
+
+def start_stand_in(delay, response):
+    """Start a local JSON-RPC stand-in that answers every request with `response` after `delay` seconds."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            time.sleep(delay)
+            body = json.dumps(dict(response, jsonrpc="2.0", id=1)).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+class TestRaceBroadcaster(unittest.TestCase):
+    def setUp(self):
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def stand_in(self, delay, response):
+        server, url = start_stand_in(delay, response)
+        self.servers.append(server)
+        return url
+
+    def test_fastest_endpoint_wins(self):
+        slow = self.stand_in(0.5, {"result": TX_HASH})
+        fast = self.stand_in(0.0, {"result": TX_HASH})
+        broadcaster = RaceBroadcaster([slow, fast])
+        start = time.perf_counter()
+        self.assertEqual(broadcaster.broadcast(RAW_TX, TX_HASH), (TX_HASH, fast))
+        self.assertLess(time.perf_counter() - start, 0.4)
+        self.assertEqual(broadcaster.wins[fast], 1)
+
+    def test_already_known_counts_as_success(self):
+        known = self.stand_in(0.0, {"error": {"code": -32000, "message": "already known"}})
+        broadcaster = RaceBroadcaster([known])
+        self.assertEqual(broadcaster.broadcast(RAW_TX, TX_HASH), (TX_HASH, known))
+
+    def test_rejections_are_skipped(self):
+        rejecting = self.stand_in(0.0, {"error": {"code": -32000, "message": "nonce too low"}})
+        accepting = self.stand_in(0.1, {"result": TX_HASH})
+        broadcaster = RaceBroadcaster([rejecting, accepting])
+        self.assertEqual(broadcaster.broadcast(RAW_TX, TX_HASH), (TX_HASH, accepting))
+
+    def test_primary_provider_joins_the_race(self):
+        slow = self.stand_in(0.5, {"result": TX_HASH})
+        broadcaster = RaceBroadcaster([slow])
+        sent = []
+        primary = lambda: sent.append(RAW_TX) or bytes.fromhex(TX_HASH[2:])
+        self.assertEqual(broadcaster.broadcast(RAW_TX, TX_HASH, primary=primary), (TX_HASH, 'provider'))
+        self.assertEqual(sent, [RAW_TX])
+        self.assertEqual(broadcaster.wins['provider'], 1)
+
+    def test_primary_provider_failure_falls_back_to_endpoints(self):
+        accepting = self.stand_in(0.1, {"result": TX_HASH})
+        broadcaster = RaceBroadcaster([accepting])
+
+        def primary():
+            raise ValueError("connection reset")
+
+        self.assertEqual(broadcaster.broadcast(RAW_TX, TX_HASH, primary=primary), (TX_HASH, accepting))
+
+    def test_all_endpoints_failing_raises(self):
+        rejecting = self.stand_in(0.0, {"error": {"code": -32000, "message": "insufficient funds"}})
+        broadcaster = RaceBroadcaster([rejecting], timeout=1)
+        with self.assertRaises(BroadcastError):
+            broadcaster.broadcast(RAW_TX, TX_HASH)
+
+if __name__ == "__main__":
+    unittest.main()
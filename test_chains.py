@@ -0,0 +1,26 @@
+# test_chains.py
+import sys
+import unittest
+from unittest import mock
+from utils import chains
+
+class TestChainPlugins(unittest.TestCase):
+    def test_unknown_chain_is_rejected(self):
+        with self.assertRaises(ValueError):
+            chains.get_plugin('XRP')
+
+    def test_disabled_chain_is_never_imported(self):
+        with mock.patch.object(chains, 'CHAINS', ['ETH', 'BSC']):
+            with self.assertRaises(ValueError):
+                chains.get_client('SOL')
+        self.assertNotIn('utils.solana_chain', sys.modules)
+        self.assertNotIn('solana', sys.modules)
+
+    def test_evm_chains_follow_configuration(self):
+        with mock.patch.object(chains, 'CHAINS', ['SOL', 'BSC']):
+            self.assertEqual(chains.evm_chains(), ['BSC'])
+            self.assertTrue(chains.is_enabled('SOL'))
+            self.assertFalse(chains.is_enabled('ETH'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+# test_explorer.py
+import json
+import unittest
+from unittest import mock
+import requests
+from utils import explorer as explorer_module
+from utils.explorer import EXPLORER_URLS, ExplorerClient, TokenBucket
+
+ADDRESS = "0x00000000000000000000000000000000000000A1"
+
+class FakeClock:
+    """Stands in for the `time` module: sleeping only moves the clock forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.data = data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"HTTP {self.status_code}", response=self)
+
+    def json(self):
+        return self.data
+
+class FakeSession:
+    """Replays scripted replies; an exception in the script is raised instead of returned."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append((url, params))
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+def ok(result):
+    return FakeResponse(data={'status': '1', 'message': 'OK', 'result': result})
+
+class ExplorerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patch = mock.patch.object(explorer_module, 'time', self.clock)
+        patch.start()
+        self.addCleanup(patch.stop)
+        # Full jitter always waits the longest allowed delay, so backoff is deterministic
+        patch = mock.patch.object(explorer_module.random, 'uniform', lambda low, high: high)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def client(self, replies, rate=5, max_retries=3):
+        client = ExplorerClient(api_keys={'ETH': 'key-a', 'BSC': 'key-b'}, rate=rate, max_retries=max_retries,
+                                base_delay=0.5)
+        client.session = FakeSession(replies)
+        return client
+
+class TestTokenBucket(ExplorerTestCase):
+    def test_bursts_up_to_capacity_then_waits(self):
+        bucket = TokenBucket(rate=2)
+        for _ in range(2):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [0.5])
+
+    def test_refills_with_time(self):
+        bucket = TokenBucket(rate=2)
+        bucket.acquire()
+        bucket.acquire()
+        self.clock.now += 10
+        for _ in range(2):
+            bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+class TestExplorerClient(ExplorerTestCase):
+    def test_each_api_key_has_its_own_rate_limit(self):
+        client = self.client([ok('1')], rate=1)
+        client.get_balance('ETH', ADDRESS)
+        client.get_balance('BSC', ADDRESS)
+        client.get_balance('ETH', ADDRESS, api_key='key-c')
+        self.assertEqual(self.clock.sleeps, [])
+
+        client.get_balance('ETH', ADDRESS)
+        self.assertEqual(self.clock.sleeps, [1.0])
+        self.assertEqual([params['apikey'] for _, params in client.session.calls], ['key-a', 'key-b', 'key-c', 'key-a'])
+        self.assertEqual([url for url, _ in client.session.calls][:2], [EXPLORER_URLS['ETH'], EXPLORER_URLS['BSC']])
+
+    def test_throttled_and_failed_calls_are_retried_with_backoff(self):
+        replies = [FakeResponse(429), requests.ConnectionError("reset"), FakeResponse(502), ok('42')]
+        client = self.client(replies, rate=100)
+        self.assertEqual(client.get_balance('ETH', ADDRESS), 42)
+        self.assertEqual(len(client.session.calls), 4)
+        self.assertEqual(self.clock.sleeps, [0.5, 1.0, 2.0])
+
+    def test_rate_limit_reply_is_retried(self):
+        limited = FakeResponse(data={'status': '0', 'message': 'NOTOK', 'result': 'Max rate limit reached'})
+        client = self.client([limited, ok('7')], rate=100)
+        self.assertEqual(client.get_balance('ETH', ADDRESS), 7)
+        self.assertEqual(len(client.session.calls), 2)
+
+    def test_gives_up_after_max_retries(self):
+        client = self.client([requests.Timeout("slow")], rate=100, max_retries=2)
+        with self.assertRaises(requests.Timeout):
+            client.get_balance('ETH', ADDRESS)
+        self.assertEqual(len(client.session.calls), 3)
+        self.assertEqual(self.clock.sleeps, [0.5, 1.0])
+
+    def test_api_errors_are_not_retried(self):
+        client = self.client([FakeResponse(data={'status': '0', 'message': 'NOTOK',
+                                                 'result': 'Contract source code not verified'})])
+        with self.assertRaisesRegex(ValueError, "not verified"):
+            client.get_abi('ETH', ADDRESS)
+        self.assertEqual(len(client.session.calls), 1)
+
+    def test_get_abi_decodes_the_result(self):
+        abi = [{'type': 'function', 'name': 'name', 'inputs': [], 'outputs': [{'type': 'string'}]}]
+        client = self.client([ok(json.dumps(abi))])
+        self.assertEqual(client.get_abi('ETH', ADDRESS), abi)
+        self.assertEqual(client.session.calls[0][1], {'module': 'contract', 'action': 'getabi', 'address': ADDRESS,
+                                                      'apikey': 'key-a'})
+
+    def test_unsupported_chain(self):
+        with self.assertRaises(ValueError):
+            self.client([ok('1')]).get('SOL', module='account')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+# test_fees.py
+import threading
+import unittest
+from unittest.mock import MagicMock
+from utils.fees import FeeOracle, next_base_fee
+
+GWEI = 10**9
+
+def fee_history(base_fee, rewards, oldest_block=100):
+    """An eth_feeHistory reply; `rewards` holds the [p10, p50, p90] tips of each block."""
+    return {
+        'oldestBlock': oldest_block,
+        'baseFeePerGas': [base_fee] * len(rewards) + [base_fee],
+        'reward': rewards,
+    }
+
+def make_provider(chain_id=1, history=None, gas_price=5 * GWEI, block_number=100):
+    provider = MagicMock()
+    provider.eth.chain_id = chain_id
+    provider.eth.fee_history.return_value = history
+    provider.eth.gas_price = gas_price
+    provider.eth.block_number = block_number
+    return provider
+
+def header(base_fee, gas_used, gas_limit):
+    return {'baseFeePerGas': hex(base_fee), 'gasUsed': hex(gas_used), 'gasLimit': hex(gas_limit)}
+
+class TestNextBaseFee(unittest.TestCase):
+    def test_follows_block_usage(self):
+        self.assertEqual(next_base_fee(100 * GWEI, 15_000_000, 30_000_000), 100 * GWEI)
+        self.assertEqual(next_base_fee(100 * GWEI, 30_000_000, 30_000_000), 112_500_000_000)
+        self.assertEqual(next_base_fee(100 * GWEI, 0, 30_000_000), 87_500_000_000)
+
+class TestFeeOracle(unittest.TestCase):
+    def test_priority_fee_is_the_median_of_the_policy_percentile(self):
+        rewards = [[1 * GWEI, 2 * GWEI, 9 * GWEI], [1 * GWEI, 3 * GWEI, 7 * GWEI], [2 * GWEI, 4 * GWEI, 8 * GWEI]]
+        oracle = FeeOracle(make_provider(history=fee_history(20 * GWEI, rewards)), 'ETH')
+        oracle.refresh()
+        self.assertEqual(oracle.block_number, 102)
+
+        low = oracle.fee_fields('low')
+        self.assertEqual(low['maxPriorityFeePerGas'], 1 * GWEI)
+        self.assertEqual(low['maxFeePerGas'], int(20 * GWEI * 1.125) + 1 * GWEI)
+        self.assertEqual(oracle.fee_fields('medium')['maxPriorityFeePerGas'], 3 * GWEI)
+        high = oracle.fee_fields('high')
+        self.assertEqual(high, {'type': 2, 'chainId': 1, 'maxPriorityFeePerGas': 8 * GWEI,
+                                'maxFeePerGas': 40 * GWEI + 8 * GWEI})
+
+    def test_cold_cache_refreshes_once(self):
+        provider = make_provider(history=fee_history(10 * GWEI, [[1, 2, 3]]))
+        oracle = FeeOracle(provider, 'ETH')
+        oracle.fee_fields()
+        oracle.fee_fields()
+        provider.eth.fee_history.assert_called_once()
+
+    def test_new_head_updates_base_fee_and_wakes_refresh(self):
+        refreshed = threading.Event()
+        provider = make_provider(history=fee_history(10 * GWEI, [[1, 2, 3]]))
+        oracle = FeeOracle(provider, 'ETH', poll_interval=60)
+        oracle.start()
+        self.addCleanup(oracle.stop)
+        provider.eth.fee_history.side_effect = lambda *args: refreshed.set() or fee_history(12 * GWEI, [[1, 2, 3]], 101)
+
+        oracle.on_new_head('BSC', header(50 * GWEI, 30_000_000, 30_000_000))
+        self.assertEqual(oracle.base_fee, 10 * GWEI)
+
+        oracle.on_new_head('ETH', header(10 * GWEI, 30_000_000, 30_000_000))
+        self.assertIn(oracle.base_fee, (11_250_000_000, 12 * GWEI))
+        self.assertTrue(refreshed.wait(5))
+        self.assertEqual(provider.eth.fee_history.call_count, 2)
+
+    def test_legacy_chain_uses_gas_price_with_chain_id(self):
+        provider = make_provider(chain_id=56, gas_price=3 * GWEI)
+        oracle = FeeOracle(provider, 'BSC')
+        self.assertFalse(oracle.eip1559)
+        self.assertEqual(oracle.fee_fields('low'), {'chainId': 56, 'gasPrice': 3 * GWEI})
+        self.assertEqual(oracle.fee_fields('high'), {'chainId': 56, 'gasPrice': int(3 * GWEI * 1.25)})
+        provider.eth.fee_history.assert_not_called()
+
+        # Pushed heads carry no base fee worth tracking on a legacy chain
+        oracle.on_new_head('BSC', header(50 * GWEI, 1, 2))
+        self.assertIsNone(oracle.base_fee)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# test_journal.py
+import json
+import logging
+import os
+import tempfile
+import time
+import unittest
+from utils.journal import TradeJournal
+from utils.logger import setup_logger, stop_logger
+
+class TestTradeJournal(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'journal', 'trades.jsonl')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def read(self, path):
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_records_are_buffered_until_flushed(self):
+        journal = TradeJournal(self.path, flush_interval=60)
+        journal.record('detected', chain='ETH', token='0xabc', block=1)
+        journal.record('buy', chain='ETH', token='0xabc', tx_hash='0x01', send_ms=1.5)
+        self.assertFalse(os.path.exists(self.path))
+        journal.close()
+        entries = self.read(self.path)
+        self.assertEqual([entry['event'] for entry in entries], ['detected', 'buy'])
+        self.assertEqual(entries[1]['send_ms'], 1.5)
+        self.assertIn('ts', entries[0])
+
+    def test_full_buffer_wakes_the_writer(self):
+        journal = TradeJournal(self.path, flush_interval=60, buffer_size=3)
+        for i in range(3):
+            journal.record('detected', token=str(i))
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.read(self.path)), 3)
+        journal.close()
+
+    def test_rotates_by_size(self):
+        journal = TradeJournal(self.path, max_bytes=200, backups=2, flush_interval=60)
+        for i in range(12):
+            journal.record('detected', token='0x%040x' % i)
+            journal.flush()
+        journal.close()
+        self.assertTrue(os.path.exists(self.path + '.1'))
+        self.assertTrue(os.path.exists(self.path + '.2'))
+        self.assertFalse(os.path.exists(self.path + '.3'))
+        self.assertLessEqual(os.path.getsize(self.path), 200)
+        self.assertEqual(self.read(self.path)[-1]['token'], '0x%040x' % 11)
+
+class TestSetupLogger(unittest.TestCase):
+    def test_records_reach_the_file_through_the_queue(self):
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        with tempfile.TemporaryDirectory() as log_dir:
+            try:
+                setup_logger(log_dir)
+                setup_logger(log_dir)  # Idempotent
+                self.assertEqual(len(root.handlers), 1)
+                logging.info("queued %s", "message")
+                stop_logger()
+                with open(os.path.join(log_dir, 'sniper_bot.log')) as f:
+                    self.assertIn("INFO - queued message", f.read())
+            finally:
+                stop_logger()
+                root.handlers[:] = saved_handlers
+                root.setLevel(saved_level)
+
+if __name__ == "__main__":
+    unittest.main()
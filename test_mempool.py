@@ -0,0 +1,38 @@
+# test_mempool.py
+import unittest
+from utils.mempool import PendingLiquidity, decode_pending
+from config import ROUTER_ADDRESSES, WRAPPED_NATIVE
+
+ROUTERS = {ROUTER_ADDRESSES['ETH'].lower(): ('ETH', 'Uniswap')}
+TOKEN = "0x95ad61b0a150d79219dcf64e1e6cc01f0b64c4ce"
+WETH = WRAPPED_NATIVE['ETH'].lower()
+SENDER = "0x" + "ab" * 20
+
+def word(value):
+    return "%064x" % int(value, 16) if isinstance(value, str) else "%064x" % value
+
+def pending_tx(data, value=0, to=ROUTER_ADDRESSES['ETH']):
+    return {"hash": "0x" + "11" * 32, "from": SENDER, "to": to, "value": hex(value), "input": data}
+
+class TestDecodePending(unittest.TestCase):
+    def test_add_liquidity_eth(self):
+        data = "0xf305d719" + "".join(word(v) for v in (TOKEN, 10**27, 0, 0, SENDER, 2**32))
+        candidate = decode_pending(pending_tx(data, value=5 * 10**18), ROUTERS)
+        self.assertEqual(candidate, PendingLiquidity("ETH", "Uniswap", "0x" + "11" * 32, SENDER, TOKEN, WETH,
+                                                     10**27, 5 * 10**18))
+
+    def test_add_liquidity_puts_wrapped_native_second(self):
+        data = "0xe8e33700" + "".join(word(v) for v in (WETH, TOKEN, 3 * 10**18, 10**24, 0, 0, SENDER, 2**32))
+        candidate = decode_pending(pending_tx(data), ROUTERS)
+        self.assertEqual((candidate.token, candidate.paired_token), (TOKEN, WETH))
+        self.assertEqual((candidate.token_amount, candidate.paired_amount), (10**24, 3 * 10**18))
+
+    def test_ignores_other_targets_and_selectors(self):
+        data = "0xf305d719" + "".join(word(v) for v in (TOKEN, 1, 0, 0, SENDER, 1))
+        self.assertIsNone(decode_pending(pending_tx(data, to="0x" + "22" * 20), ROUTERS))
+        self.assertIsNone(decode_pending(pending_tx(None, to=None), ROUTERS))
+        self.assertIsNone(decode_pending(pending_tx("0x7ff36ab5" + word(0) * 4), ROUTERS))
+        self.assertIsNone(decode_pending(pending_tx(data[:100]), ROUTERS))  # Truncated calldata
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# test_metrics.py
+import random
+import unittest
+import urllib.request
+from utils.metrics import Histogram, Metrics, metrics as shared_metrics, start_metrics_server
+
+class FakeProvider:
+    def __init__(self):
+        self.receipts = {}
+        self.provider = self
+
+    def make_request(self, method, params):
+        return {'result': self.receipts.get(params[0])}
+
+class TestHistogram(unittest.TestCase):
+    def test_percentiles_within_bucket_resolution(self):
+        rng = random.Random(3)
+        values = sorted(rng.lognormvariate(3, 1.5) for _ in range(20000))
+        histogram = Histogram()
+        for value in values:
+            histogram.record(value)
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * len(values)) - 1]
+            self.assertAlmostEqual(histogram.percentile(q) / exact, 1, delta=0.02)
+        self.assertEqual(histogram.count, len(values))
+        self.assertLess(len(histogram.counts), 2000)
+
+    def test_small_values_are_exact(self):
+        histogram = Histogram()
+        histogram.record(0.05)
+        self.assertAlmostEqual(histogram.percentile(0.5), 0.05, places=3)
+        self.assertEqual(Histogram().percentile(0.99), 0.0)
+
+class TestMetrics(unittest.TestCase):
+    def test_stamps_measure_time_since_previous_stage(self):
+        metrics = Metrics()
+        metrics.on_new_head('ETH', {'number': hex(100), 'timestamp': hex(1000)})
+        metrics.stamp('0xAbC', 'log_received', 'ETH', at=1000.8, block_number=100)
+        metrics.stamp('0xabc', 'analysis_start', 'ETH', at=1000.81)
+        metrics.stamp('0xabc', 'analysis_end', 'ETH', at=1000.86)
+        self.assertEqual(set(metrics.trace('0xabc')), {'block', 'log_received', 'analysis_start', 'analysis_end'})
+        self.assertAlmostEqual(metrics.histogram('log_received', 'ETH').percentile(0.5), 800, delta=10)
+        self.assertAlmostEqual(metrics.histogram('analysis_end', 'ETH').percentile(0.5), 50, delta=1)
+
+    def test_receipt_closes_the_trace(self):
+        metrics = Metrics()
+        provider = FakeProvider()
+        metrics.stamp('0xabc', 'broadcast', 'BSC', at=1)
+        metrics.track_receipt(provider, 'BSC', '0xabc', '0x01')
+        metrics.on_new_head('BSC', {'number': hex(5), 'timestamp': hex(2)})
+        metrics._receipt_executor.submit(lambda: None).result()
+        self.assertNotIn('receipt', metrics.trace('0xabc'))
+        provider.receipts['0x01'] = {'blockNumber': hex(6)}
+        metrics.on_new_head('BSC', {'number': hex(6), 'timestamp': hex(3)})
+        metrics._receipt_executor.submit(lambda: None).result()
+        self.assertIn('receipt', metrics.trace('0xabc'))
+        self.assertEqual(metrics.histogram('total', 'BSC').count, 1)
+
+    def test_traces_are_bounded(self):
+        metrics = Metrics(max_traces=10)
+        for i in range(50):
+            metrics.stamp(hex(i), 'log_received', 'ETH')
+        self.assertEqual(len(metrics._traces), 10)
+
+    def test_pending_receipts_are_bounded(self):
+        metrics = Metrics(max_pending=3)
+        for i in range(10):
+            metrics.track_receipt(FakeProvider(), 'ETH', hex(i), hex(i))
+        self.assertEqual(list(metrics._pending), ['0x7', '0x8', '0x9'])
+
+class TestMetricsServer(unittest.TestCase):
+    def test_serves_prometheus_text(self):
+        shared_metrics.observe('sign', 'ETH', 1.5)
+        server = start_metrics_server(0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            body = urllib.request.urlopen(url, timeout=5).read().decode()
+        finally:
+            server.shutdown()
+        self.assertIn('sniper_stage_latency_ms{stage="sign",chain="ETH",quantile="0.99"}', body)
+        self.assertIn('sniper_stage_latency_ms_count{stage="sign",chain="ETH"} 1', body)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+# test_monitor.py
+import asyncio
+import json
+import unittest
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from utils.monitor import Monitoring, NewPair, PAIR_CREATED_TOPIC, WRAPPED_NATIVE, decode_pair_created, get_logs_chunked
+
+TOKEN = "0x95ad61b0a150d79219dcf64e1e6cc01f0b64c4ce"
+WETH = WRAPPED_NATIVE['ETH'].lower()
+PAIR = "0x811beed0119b4afce20d2583eb608c6f7af1954f"
+
+def pad(address):
+    return "0x" + "0" * 24 + address[2:]
+
+RAW_LOG = {
+    "address": "0x5c69bee701ef814a2b6a3edd4b1652cb9cc5aa6f",
+    "topics": [PAIR_CREATED_TOPIC, pad(TOKEN), pad(WETH)],
+    "data": pad(PAIR) + "%064x" % 4242,
+    "blockNumber": "0x121eac0",
+    "logIndex": "0x5",
+    "removed": False,
+}
+
+class TestDecodePairCreated(unittest.TestCase):
+    def test_decodes_topics_and_data(self):
+        pair = decode_pair_created(RAW_LOG, "Uniswap", "ETH")
+        self.assertEqual(pair, NewPair("Uniswap", "ETH", TOKEN, WETH, PAIR, 0x121eac0))
+
+    def test_token_skips_wrapped_native(self):
+        pair = decode_pair_created(RAW_LOG, "Uniswap", "ETH")
+        self.assertEqual(pair.token, TOKEN)
+        self.assertEqual(pair._replace(token0=WETH, token1=TOKEN).token, TOKEN)
+
+    def test_pair_without_native_side_has_no_token(self):
+        usdt = "0xdac17f958d2ee523a2206206994597c13d831ec7"
+        self.assertIsNone(NewPair("Uniswap", "ETH", TOKEN, usdt, PAIR, 1).token)
+
+    def test_pair_without_native_side_is_dropped(self):
+        monitor = Monitoring.__new__(Monitoring)
+        monitor.reserves, monitor._seen_pairs = {}, OrderedDict()
+        log = dict(RAW_LOG, topics=[PAIR_CREATED_TOPIC, pad(TOKEN), pad("0x" + "22" * 20)])
+        self.assertIsNone(monitor.process_event(log, "Uniswap", "ETH"))
+        self.assertIsNotNone(monitor.process_event(RAW_LOG, "Uniswap", "ETH"))
+
+class FakeLogProvider:
+    """Serves one log per block and refuses ranges wider than `max_range` blocks."""
+    def __init__(self, max_range):
+        self.max_range = max_range
+        self.ranges = []
+
+    def make_request(self, method, params):
+        start, end = int(params[0]['fromBlock'], 16), int(params[0]['toBlock'], 16)
+        self.ranges.append((start, end))
+        if end - start + 1 > self.max_range:
+            return {'error': {'code': -32005, 'message': 'query exceeds max block range'}}
+        return {'result': [dict(RAW_LOG, blockNumber=hex(block), logIndex='0x0') for block in range(end, start - 1, -1)]}
+
+class TestGetLogsChunked(unittest.TestCase):
+    def test_chunks_cover_range_in_order(self):
+        provider = FakeLogProvider(max_range=100)
+        with ThreadPoolExecutor(4) as executor:
+            logs = get_logs_chunked(provider, {'topics': [PAIR_CREATED_TOPIC]}, 10, 259, 100, executor)
+        self.assertEqual([int(log['blockNumber'], 16) for log in logs], list(range(10, 260)))
+        self.assertEqual(sorted(provider.ranges), [(10, 109), (110, 209), (210, 259)])
+
+    def test_refused_ranges_are_split(self):
+        provider = FakeLogProvider(max_range=30)
+        logs = get_logs_chunked(provider, {'topics': [PAIR_CREATED_TOPIC]}, 0, 99, 100)
+        self.assertEqual([int(log['blockNumber'], 16) for log in logs], list(range(100)))
+        self.assertIn((0, 24), provider.ranges)
+
+class FakeHeaderProvider:
+    def make_request(self, method, params):
+        return {'result': {'number': params[0], 'timestamp': hex(1700000000)}}
+
+class TestPolledHeads(unittest.TestCase):
+    def test_polling_notifies_head_listeners_once_per_head(self):
+        monitor = Monitoring.__new__(Monitoring)
+        monitor.latest_heads, monitor._head_listeners = {}, []
+        heads = []
+        monitor.add_head_listener(lambda chain, header: heads.append((chain, int(header['number'], 16))))
+        for head in (10, 10, 12):
+            monitor._poll_head(FakeHeaderProvider(), 'ETH', head)
+        self.assertEqual(heads, [('ETH', 10), ('ETH', 12)])
+
+class TestSeenPairs(unittest.TestCase):
+    @mock.patch('utils.monitor.MAX_SEEN_PAIRS', 2)
+    def test_duplicates_are_dropped_within_a_bounded_window(self):
+        monitor = Monitoring.__new__(Monitoring)
+        monitor.reserves, monitor._seen_pairs = {}, OrderedDict()
+        logs = [dict(RAW_LOG, data=pad("0x%040x" % i) + "%064x" % i) for i in range(3)]
+        self.assertIsNotNone(monitor.process_event(logs[0], "Uniswap", "ETH"))
+        self.assertIsNone(monitor.process_event(logs[0], "Uniswap", "ETH"))
+        monitor.process_event(logs[1], "Uniswap", "ETH")
+        monitor.process_event(logs[2], "Uniswap", "ETH")
+        self.assertEqual(len(monitor._seen_pairs), 2)
+        self.assertIsNotNone(monitor.process_event(logs[0], "Uniswap", "ETH"))  # Forgotten; the registry dedupes it
+
+def notification(subscription, result):
+    return {"jsonrpc": "2.0", "method": "eth_subscription", "params": {"subscription": subscription, "result": result}}
+
+class FakeWebSocket:
+    """Replays a node's eth_subscribe conversation: each request is answered by a script of messages."""
+    def __init__(self, replies, live, close=False):
+        self.replies = replies
+        self.live = live
+        self.close = close
+        self.incoming = []
+        self.sent = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def send(self, message):
+        request = json.loads(message)
+        self.sent.append(request)
+        self.incoming += self.replies[request['id']]
+
+    async def recv(self):
+        return json.dumps(self.incoming.pop(0))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.incoming:
+            return await self.recv()
+        if self.live:
+            return json.dumps(self.live.pop(0))
+        if self.close:
+            raise StopAsyncIteration
+        await asyncio.sleep(3600)  # Connection stays open
+
+def pair_log(i):
+    return dict(RAW_LOG, data=pad("0x%040x" % i) + "%064x" % i, blockNumber=hex(100 + i))
+
+class TestStreamNewPairs(unittest.TestCase):
+    def setUp(self):
+        self.monitor = Monitoring.__new__(Monitoring)
+        self.monitor.factories = [{'dex': 'Uniswap', 'chain': 'ETH', 'network': 'ethereum', 'web3': None,
+                                   'address': "0x5c69bee701ef814a2b6a3edd4b1652cb9cc5aa6f", 'ws_url': 'ws://node'}]
+        self.monitor.reserves, self.monitor._seen_pairs = {}, OrderedDict()
+        self.monitor.latest_heads, self.monitor._head_listeners, self.monitor._next_block = {}, [], {}
+        self.monitor._executor = ThreadPoolExecutor(max_workers=1)
+        self.monitor.record_checkpoint = lambda chain, block: None
+        self.monitor.ws_max_failures, self.monitor.ws_fallback_period = 3, 60
+        self.polls = []
+
+        def poll_factory(factory):
+            self.polls.append(dict(self.monitor._next_block))
+            # The backfill overlaps the live stream: pair 2 is delivered by both
+            return [pair for pair in map(lambda log: self.monitor.process_event(log, 'Uniswap', 'ETH'),
+                                         [pair_log(1), pair_log(2)]) if pair]
+        self.monitor.poll_factory = poll_factory
+
+    def stream(self, sockets, count):
+        async def collect():
+            pairs = []
+            stream = self.monitor.stream_new_pairs()
+            with mock.patch('utils.monitor.websockets.connect', side_effect=sockets):
+                async for pair in stream:
+                    pairs.append(pair)
+                    if len(pairs) == count:
+                        break
+                await stream.aclose()
+            return pairs
+        return asyncio.run(asyncio.wait_for(collect(), 5))
+
+    def test_first_connect_backfills_and_keeps_early_notifications(self):
+        heads = []
+        self.monitor.add_head_listener(lambda chain, header: heads.append(int(header['number'], 16)))
+        socket = FakeWebSocket({
+            1: [{"jsonrpc": "2.0", "id": 1, "result": "0xlogs"}],
+            # A log and a head arrive before the second subscription is confirmed
+            2: [notification("0xlogs", pair_log(3)), {"jsonrpc": "2.0", "id": 2, "result": "0xheads"}],
+        }, live=[notification("0xheads", {'number': hex(104)}), notification("0xlogs", pair_log(2)),
+                 notification("0xlogs", pair_log(4))])
+        pairs = self.stream([socket], 4)
+        self.assertEqual(self.polls, [{}])  # Backfilled even without a previous block
+        self.assertEqual([pair.pair for pair in pairs], ["0x%040x" % i for i in (1, 2, 3, 4)])
+        self.assertEqual(heads, [104])
+        self.assertEqual([request['params'][0] for request in socket.sent], ['logs', 'newHeads'])
+
+    def test_reconnect_backfills_from_the_last_seen_block(self):
+        replies = {1: [{"jsonrpc": "2.0", "id": 1, "result": "0xlogs"}],
+                   2: [{"jsonrpc": "2.0", "id": 2, "result": "0xheads"}]}
+        dropped = FakeWebSocket(replies, live=[notification("0xheads", {'number': hex(104)})], close=True)
+        reconnected = FakeWebSocket(replies, live=[notification("0xlogs", pair_log(5))])
+        pairs = self.stream([dropped, reconnected], 3)
+        self.assertEqual(self.polls, [{}, {'Uniswap': 104}])
+        self.assertEqual([pair.pair for pair in pairs], ["0x%040x" % i for i in (1, 2, 5)])
+
+if __name__ == "__main__":
+    unittest.main()
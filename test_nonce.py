@@ -0,0 +1,82 @@
+# test_nonce.py
+import asyncio
+import threading
+import unittest
+from unittest.mock import MagicMock
+from utils.nonce import NonceManager, is_nonce_error
+
+ACCOUNT = "0xAbC0000000000000000000000000000000000001"
+
+def make_provider(pending_count):
+    provider = MagicMock()
+    provider.eth.get_transaction_count.return_value = pending_count
+    return provider
+
+class TestNonceManager(unittest.TestCase):
+    def test_syncs_once_then_counts_locally(self):
+        provider = make_provider(7)
+        manager = NonceManager()
+        self.assertEqual([manager.allocate(provider, "ETH", ACCOUNT) for _ in range(3)], [7, 8, 9])
+        provider.eth.get_transaction_count.assert_called_once_with(ACCOUNT, 'pending')
+
+    def test_accounts_and_chains_are_independent(self):
+        manager = NonceManager()
+        self.assertEqual(manager.allocate(make_provider(1), "ETH", ACCOUNT), 1)
+        self.assertEqual(manager.allocate(make_provider(50), "BSC", ACCOUNT), 50)
+        self.assertEqual(manager.allocate(make_provider(0), "ETH", ACCOUNT.lower()), 2)
+
+    def test_concurrent_allocations_are_unique(self):
+        provider = make_provider(0)
+        manager = NonceManager()
+        nonces = []
+
+        def worker():
+            for _ in range(100):
+                nonces.append(manager.allocate(provider, "ETH", ACCOUNT))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(nonces), list(range(800)))
+
+    def test_allocate_async(self):
+        manager = NonceManager()
+        provider = make_provider(3)
+
+        async def allocate_many():
+            return await asyncio.gather(*(manager.allocate_async(provider, "BSC", ACCOUNT) for _ in range(5)))
+
+        self.assertEqual(sorted(asyncio.run(allocate_many())), [3, 4, 5, 6, 7])
+
+    def test_release_reuses_latest_nonce(self):
+        manager = NonceManager()
+        provider = make_provider(10)
+        nonce = manager.allocate(provider, "ETH", ACCOUNT)
+        manager.release("ETH", ACCOUNT, nonce)
+        self.assertEqual(manager.allocate(provider, "ETH", ACCOUNT), 10)
+
+    def test_release_of_older_nonce_forces_resync(self):
+        manager = NonceManager()
+        provider = make_provider(10)
+        first = manager.allocate(provider, "ETH", ACCOUNT)
+        manager.allocate(provider, "ETH", ACCOUNT)
+        manager.release("ETH", ACCOUNT, first)
+        self.assertIsNone(manager.peek("ETH", ACCOUNT))
+
+    def test_resync_on_nonce_too_low(self):
+        manager = NonceManager()
+        provider = make_provider(4)
+        manager.allocate(provider, "ETH", ACCOUNT)
+        provider.eth.get_transaction_count.return_value = 9
+        self.assertTrue(manager.handle_error(provider, "ETH", ACCOUNT, ValueError({'message': 'nonce too low'})))
+        self.assertEqual(manager.allocate(provider, "ETH", ACCOUNT), 9)
+        self.assertFalse(manager.handle_error(provider, "ETH", ACCOUNT, ValueError("insufficient funds")))
+
+    def test_is_nonce_error(self):
+        self.assertTrue(is_nonce_error(Exception("replacement transaction underpriced")))
+        self.assertFalse(is_nonce_error(Exception("execution reverted")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+# test_pipeline.py
+import asyncio
+import unittest
+from utils.pipeline import Pipeline, Stage, StageQueue, DROP_OLDEST, DROP_NEWEST, PRIORITY
+
+async def items(*values):
+    for value in values:
+        yield value
+
+class TestStageQueue(unittest.TestCase):
+    def drain(self, queue):
+        async def run():
+            return [await queue.get() for _ in range(queue.qsize())]
+        return run()
+
+    def test_drop_oldest_keeps_newest_items(self):
+        async def run():
+            queue = StageQueue(2, DROP_OLDEST)
+            for value in (1, 2, 3):
+                await queue.put(value)
+            return queue.dropped, await self.drain(queue)
+        self.assertEqual(asyncio.run(run()), (1, [2, 3]))
+
+    def test_drop_newest_keeps_oldest_items(self):
+        async def run():
+            queue = StageQueue(2, DROP_NEWEST)
+            for value in (1, 2, 3):
+                await queue.put(value)
+            return queue.dropped, await self.drain(queue)
+        self.assertEqual(asyncio.run(run()), (1, [1, 2]))
+
+    def test_priority_serves_lowest_key_first_in_arrival_order(self):
+        async def run():
+            queue = StageQueue(10, PRIORITY, priority=lambda item: item[0])
+            for item in ((2, 'a'), (1, 'b'), (2, 'c'), (1, 'd')):
+                await queue.put(item)
+            return await self.drain(queue)
+        self.assertEqual(asyncio.run(run()), [(1, 'b'), (1, 'd'), (2, 'a'), (2, 'c')])
+
+class TestPipeline(unittest.TestCase):
+    def test_items_flow_through_every_stage(self):
+        results = []
+
+        async def double(value):
+            return value * 2
+
+        async def run():
+            await Pipeline([Stage('double', double), Stage('collect', results.append)]).run(items(1, 2, 3))
+        asyncio.run(run())
+        self.assertEqual(sorted(results), [2, 4, 6])
+
+    def test_failing_item_does_not_stall_others(self):
+        results = []
+
+        def check(value):
+            if value == 2:
+                raise ValueError("bad token")
+            return value
+
+        async def run():
+            pipeline = Pipeline([Stage('check', check, concurrency=2), Stage('collect', results.append)])
+            await pipeline.run(items(1, 2, 3))
+            return pipeline.stats()['check']
+        with self.assertLogs(level='ERROR') as log:
+            stats = asyncio.run(run())
+        self.assertEqual(sorted(results), [1, 3])
+        self.assertEqual((stats['processed'], stats['failed']), (2, 1))
+        self.assertIn("Pipeline stage check failed on 2: bad token", log.output[0])
+
+    def test_none_filters_items_out(self):
+        results = []
+
+        async def run():
+            await Pipeline([Stage('odd', lambda value: value if value % 2 else None),
+                            Stage('collect', results.append)]).run(items(1, 2, 3, 4))
+        asyncio.run(run())
+        self.assertEqual(sorted(results), [1, 3])
+
+    def test_slow_stage_runs_items_concurrently(self):
+        async def slow(value):
+            await asyncio.sleep(0.1)
+            return value
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            await Pipeline([Stage('slow', slow, concurrency=10)]).run(items(*range(10)))
+            return loop.time() - start
+        self.assertLess(asyncio.run(run()), 0.5)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# test_positions.py
+import time
+import unittest
+from concurrent.futures import Future
+from config import WRAPPED_NATIVE
+from modules.positions import PositionBook
+from utils.amm import SWAP_FEES, get_amount_out_exact
+
+TOKEN = '0x' + 'f' * 40  # Sorts after WETH, so the token is token1 of its pair
+PAIR = '0x' + '1' * 40
+WALLET = '0x' + '2' * 40
+
+def word(value):
+    return value.to_bytes(32, 'big')
+
+class ImmediateExecutor:
+    def submit(self, fn, *args):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+class HeldExecutor:
+    """Accepts sells without running them."""
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append(args)
+        return Future()
+
+class ListJournal(list):
+    def record(self, event, **fields):
+        self.append(dict(fields, event=event))
+
+class TestPositionBook(unittest.TestCase):
+    def setUp(self):
+        self.reserves = (10**21, 10**24)  # (WETH, token) as token0, token1
+        self.balance = 10**21
+        self.sold = []
+        self.book = PositionBook(stop_loss=30, take_profit=100, max_positions=2, wallet_address=WALLET,
+                                 seller=lambda token, amount, chain, amount_out_min: self.sold.append(
+                                     (token, amount, amount_out_min)) or '0xtx',
+                                 reader=self.read, journal=ListJournal(), slippage=0.10)
+        self.book._sell_executor = ImmediateExecutor()
+
+    def read(self, provider, calls):
+        results = []
+        for target, data in calls:
+            if target == PAIR:
+                results.append((True, word(self.reserves[0]) + word(self.reserves[1]) + word(0)))
+            else:
+                results.append((self.balance is not None, word(self.balance or 0)))
+        return results
+
+    def test_orders_token_against_wrapped_native(self):
+        position = self.book.open(TOKEN, 'ETH', PAIR, 10**18)
+        self.assertEqual(position.token_is_token0, int(TOKEN, 16) < int(WRAPPED_NATIVE['ETH'], 16))
+        self.assertFalse(position.token_is_token0)
+
+    def test_holds_inside_the_band(self):
+        self.book.open(TOKEN, 'ETH', PAIR, 10**18)
+        self.assertEqual(self.book.reprice('ETH', None), [])
+        self.assertAlmostEqual(self.book.positions[('ETH', TOKEN)].pnl_percentage, -0.4, delta=0.1)
+        self.assertEqual(self.sold, [])
+
+    def test_stop_loss_sells_and_closes(self):
+        self.book.open(TOKEN, 'ETH', PAIR, 10**18)
+        self.reserves = (10**21 // 2, 10**24)  # Token price halves
+        triggered = self.book.reprice('ETH', None)
+        self.assertEqual([reason for _, reason in triggered], ['stop-loss'])
+        expected = get_amount_out_exact(self.balance, 10**24, 10**21 // 2, SWAP_FEES['ETH'])
+        self.assertEqual(self.sold, [(TOKEN, self.balance, expected * 9 // 10)])  # 10% slippage tolerance
+        self.assertNotIn(('ETH', TOKEN), self.book.positions)
+        self.assertEqual([entry['event'] for entry in self.book.journal], ['open', 'exit', 'sell'])
+
+    def test_take_profit(self):
+        self.book.open(TOKEN, 'ETH', PAIR, 10**18)
+        self.reserves = (10**21 * 3, 10**24)
+        self.assertEqual([reason for _, reason in self.book.reprice('ETH', None)], ['take-profit'])
+
+    def test_unfilled_position_is_dropped_after_timeout(self):
+        position = self.book.open(TOKEN, 'ETH', PAIR, 10**18)
+        self.balance = 0
+        self.book.reprice('ETH', None)
+        self.assertIn(('ETH', TOKEN), self.book.positions)
+        position.opened_at = time.monotonic() - self.book.fill_timeout - 1
+        self.book.reprice('ETH', None)
+        self.assertNotIn(('ETH', TOKEN), self.book.positions)
+
+    def test_position_is_sold_once(self):
+        self.book.open(TOKEN, 'ETH', PAIR, 10**18)
+        self.reserves = (10**21 // 2, 10**24)
+        self.book._sell_executor = HeldExecutor()  # The sell is still in flight
+        self.book.reprice('ETH', None)
+        position = self.book.positions[('ETH', TOKEN)]
+        self.assertFalse(self.book._exit(position, 'stop-loss'))  # e.g. a second pricing pass racing the first
+        self.assertEqual(self.book.reprice('ETH', None), [])
+        self.assertEqual(len(self.book._sell_executor.submitted), 1)
+
+    def test_capacity(self):
+        self.book.open(TOKEN, 'ETH', PAIR, 10**18)
+        self.book.open('0x' + 'e' * 40, 'ETH', PAIR, 10**18)
+        self.assertFalse(self.book.can_open())
+        self.assertIsNone(self.book.open('0x' + 'd' * 40, 'ETH', PAIR, 10**18))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,17 @@
+# test_providers.py
+import unittest
+from unittest import mock
+from utils import providers
+
+class TestGetPool(unittest.TestCase):
+    def tearDown(self):
+        providers._pools.pop('TEST', None)
+
+    def test_pool_only_holds_configured_endpoints(self):
+        with mock.patch.dict(providers.RPC_URLS, {'TEST': ['http://127.0.0.1:1']}), \
+                mock.patch.object(providers.RpcPool, 'start', lambda pool: pool):
+            pool = providers.get_pool('TEST', 'https://mainnet.infura.io/v3/None')
+        self.assertEqual([endpoint.url for endpoint in pool.endpoints], ['http://127.0.0.1:1'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+# test_registry.py
+import os
+import tempfile
+import unittest
+from utils.registry import TokenRegistry, TokenState, address_key
+
+TOKEN = "0x95aD61b0a150d79219dCF64E1E6Cc01f0B64C4cE"
+PAIR = "0x811beed0119b4afce20d2583eb608c6f7af1954f"
+
+class TestAddressKey(unittest.TestCase):
+    def test_evm_addresses_ignore_case(self):
+        self.assertEqual(address_key(TOKEN), address_key(TOKEN.lower()))
+        self.assertEqual(len(address_key(TOKEN)), 20)
+
+    def test_other_addresses_use_their_text(self):
+        self.assertEqual(address_key("So11111111111111111111111111111111111111112"),
+                         b"So11111111111111111111111111111111111111112")
+
+class TestTokenRegistry(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'tokens.log')
+        self.registry = TokenRegistry(self.path)
+
+    def test_register_rejects_known_pairs_and_tokens(self):
+        self.assertTrue(self.registry.register(TOKEN, 'ETH', PAIR))
+        self.assertFalse(self.registry.register(TOKEN.lower(), 'ETH', PAIR))
+        self.assertTrue(self.registry.seen_pair(PAIR.upper().replace('0X', '0x'), 'ETH'))
+        self.assertEqual(self.registry.chain_of(TOKEN.lower()), 'ETH')
+        self.assertIsNone(self.registry.chain_of("0x" + "11" * 20))
+
+    def test_same_address_on_two_chains(self):
+        self.assertTrue(self.registry.register(TOKEN, 'ETH', PAIR))
+        self.assertTrue(self.registry.register(TOKEN, 'BSC', PAIR))
+        self.registry.set_state(TOKEN, TokenState.REJECTED, 'BSC')
+        self.assertEqual(self.registry.get(TOKEN, 'ETH').state, TokenState.SEEN)
+        self.assertEqual(self.registry.get(TOKEN, 'BSC').state, TokenState.REJECTED)
+        self.assertEqual(self.registry.chain_of(TOKEN), 'ETH')
+
+        reloaded = TokenRegistry(self.path).load()
+        self.assertEqual(len(reloaded), 2)
+        self.assertEqual(reloaded.get(TOKEN, 'BSC').state, TokenState.REJECTED)
+
+    def test_reload_restores_latest_state(self):
+        self.registry.register(TOKEN, 'BSC', PAIR)
+        self.registry.set_state(TOKEN, TokenState.ANALYZED)
+        self.registry.set_state(TOKEN, TokenState.BOUGHT)
+
+        reloaded = TokenRegistry(self.path).load()
+        record = reloaded.get(TOKEN)
+        self.assertEqual((record.chain, record.pair, record.state), ('BSC', PAIR, TokenState.BOUGHT))
+        self.assertTrue(reloaded.seen_pair(PAIR, 'BSC'))
+        self.assertFalse(reloaded.seen_pair(PAIR, 'ETH'))
+        with open(self.path) as f:
+            self.assertEqual(len(f.readlines()), 1)  # Three log lines for one token were compacted
+
+if __name__ == "__main__":
+    unittest.main()
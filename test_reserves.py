@@ -0,0 +1,141 @@
+# test_reserves.py
+import unittest
+from utils.reserves import ReserveIndex, SYNC_TOPIC
+from config import WRAPPED_NATIVE
+
+TOKEN = "0x95ad61b0a150d79219dcf64e1e6cc01f0b64c4ce"
+WETH = WRAPPED_NATIVE['ETH'].lower()
+PAIR = "0x811beed0119b4afce20d2583eb608c6f7af1954f"
+
+def sync_log(reserve0, reserve1, block, log_index=0, removed=False, pair=PAIR):
+    return {
+        "address": pair,
+        "topics": [SYNC_TOPIC],
+        "data": "0x%064x%064x" % (reserve0, reserve1),
+        "blockNumber": hex(block),
+        "logIndex": hex(log_index),
+        "removed": removed,
+    }
+
+class FakeProvider:
+    """Stands in for a Web3 instance: answers eth_blockNumber and eth_getLogs from canned data.
+
+    Like public nodes, it refuses eth_getLogs ranges wider than `max_range` blocks
+    and fails queries that include an address listed in `broken`.
+    """
+    def __init__(self, head, logs, max_range=5000, broken=()):
+        self.provider = self
+        self.head = head
+        self.logs = logs
+        self.max_range = max_range
+        self.broken = set(broken)
+        self.requests = []
+
+    def make_request(self, method, params):
+        self.requests.append((method, params))
+        if method == 'eth_blockNumber':
+            return {'result': hex(self.head)}
+        query = params[0]
+        from_block, to_block = int(query['fromBlock'], 16), int(query['toBlock'], 16)
+        if to_block - from_block + 1 > self.max_range or self.broken & set(query['address']):
+            return {'error': {'code': -32005, 'message': 'query returned more than 10000 results'}}
+        return {'result': [log for log in self.logs if log['address'] in query['address']
+                           and from_block <= int(log['blockNumber'], 16) <= to_block]}
+
+class TestReserveIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ReserveIndex('ETH')
+        self.index.track(PAIR, TOKEN, WETH, 100)
+
+    def test_catches_up_new_pair_from_creation_block(self):
+        provider = FakeProvider(105, [sync_log(10**24, 5 * 10**18, 100, 3)])
+        self.index.update(provider)
+        self.assertTrue(self.index.wait_synced(PAIR, timeout=0))
+        self.assertEqual(self.index.native_liquidity(PAIR), 5 * 10**18)
+        self.assertEqual(self.index.pair_for(TOKEN), PAIR)
+        self.assertEqual(provider.requests[1][1][0]['fromBlock'], hex(100))
+
+    def test_later_updates_only_fetch_new_blocks(self):
+        provider = FakeProvider(105, [sync_log(10**24, 5 * 10**18, 100)])
+        self.index.update(provider)
+        provider.head = 107
+        provider.logs.append(sync_log(9 * 10**23, 6 * 10**18, 107))
+        provider.requests.clear()
+        self.index.update(provider)
+        self.assertEqual(provider.requests[1][1][0]['fromBlock'], hex(106))
+        self.assertEqual(self.index.native_liquidity(PAIR), 6 * 10**18)
+
+    def test_ignores_stale_and_removed_logs(self):
+        self.index.apply_sync_log(sync_log(100, 200, 10, 2))
+        self.index.apply_sync_log(sync_log(1, 1, 10, 1))
+        self.index.apply_sync_log(sync_log(7, 7, 11, 0, removed=True))
+        self.assertEqual(self.index.reserves_for(PAIR, TOKEN), (100, 200))
+
+    def test_price_and_price_impact(self):
+        self.index.apply_sync_log(sync_log(2 * 10**21, 10**18, 100))
+        self.assertAlmostEqual(self.index.price(PAIR, TOKEN), 0.0005)
+        self.assertEqual(self.index.amount_out(PAIR, WETH, 10**16),
+                         10**16 * 997 * 2 * 10**21 // (10**18 * 1000 + 10**16 * 997))
+        self.assertAlmostEqual(self.index.price_impact(PAIR, WETH, 10**16), 1 - 997 / 1009.97, places=6)
+        self.assertIsNone(self.index.price_impact("0x" + "00" * 20, WETH, 10**16))
+
+    def test_untrack_drops_the_pair(self):
+        self.index.untrack(TOKEN.upper().replace('0X', '0x'))
+        self.assertIsNone(self.index.pair_for(TOKEN))
+        self.assertIsNone(self.index.native_liquidity(PAIR))
+        provider = FakeProvider(105, [sync_log(10**24, 5 * 10**18, 100)])
+        self.index.update(provider)
+        self.assertEqual([method for method, _ in provider.requests], ['eth_blockNumber'])
+
+    def test_oldest_pairs_are_evicted_past_the_cap(self):
+        index = ReserveIndex('ETH', max_pairs=2)
+        for i in range(3):
+            index.track("0x%040x" % i, "0x%040x" % (100 + i), WETH, 100)
+        self.assertEqual(list(index.pairs), ["0x%040x" % 1, "0x%040x" % 2])
+        self.assertIsNone(index.pair_for("0x%040x" % 100))
+
+    def test_old_pair_is_caught_up_in_chunks_and_does_not_wedge_new_ones(self):
+        old_pair, new_pair, new_token = "0x" + "0a" * 20, "0x" + "0b" * 20, "0x" + "0c" * 20
+        self.index.track(old_pair, TOKEN, WETH, 10)
+        provider = FakeProvider(20000, [sync_log(1, 2 * 10**18, 50, pair=old_pair),
+                                        sync_log(10**24, 5 * 10**18, 100)])
+        self.index.update(provider)
+        self.assertTrue(self.index.wait_synced(old_pair, timeout=0))
+        self.assertEqual(self.index.native_liquidity(old_pair), 2 * 10**18)
+
+        self.index.track(new_pair, new_token, WETH, 20001)
+        provider.head = 20001
+        provider.logs.append(sync_log(10**24, 7 * 10**18, 20001, pair=new_pair))
+        self.index.update(provider)
+        self.assertTrue(self.index.wait_synced(new_pair, timeout=0))
+        self.assertEqual(self.index.native_liquidity(new_pair), 7 * 10**18)
+
+    def test_failing_pair_does_not_stall_the_others(self):
+        bad_pair = "0x" + "0d" * 20
+        self.index.track(bad_pair, "0x" + "0e" * 20, WETH, 100)
+        provider = FakeProvider(105, [sync_log(10**24, 5 * 10**18, 100)], broken=[bad_pair])
+        with self.assertRaises(ValueError):
+            self.index.update(provider)
+        self.assertTrue(self.index.wait_synced(PAIR, timeout=0))
+        self.assertFalse(self.index.wait_synced(bad_pair, timeout=0))
+        self.assertEqual(self.index._new_pairs, [bad_pair])
+
+    def test_pair_ahead_of_the_node_is_not_synced(self):
+        provider = FakeProvider(99, [])
+        self.index.update(provider)
+        self.assertFalse(self.index.wait_synced(PAIR, timeout=0))
+        provider.head = 100
+        provider.logs.append(sync_log(10**24, 5 * 10**18, 100))
+        self.index.update(provider)
+        self.assertTrue(self.index.wait_synced(PAIR, timeout=0))
+
+    def test_pair_without_native_side_has_no_native_liquidity(self):
+        usdt, other_pair = "0x" + "0f" * 20, "0x" + "1f" * 20
+        self.index.track(other_pair, TOKEN, usdt, 100)
+        self.index.apply_sync_log(sync_log(10**24, 5 * 10**18, 100, pair=other_pair))
+        self.assertIsNone(self.index.native_liquidity(other_pair))
+        self.assertIsNone(self.index.reserves_for(other_pair, WETH))
+        self.assertEqual(self.index.reserves_for(other_pair, usdt), (5 * 10**18, 10**24))
+
+if __name__ == "__main__":
+    unittest.main()
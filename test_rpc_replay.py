@@ -0,0 +1,118 @@
+# test_rpc_replay.py
+import json
+import os
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from benchmarks.rpc_replay import (Faults, Recorder, Recording, RecordingProxy, ReplayServer, http_key, rpc_key,
+                                   serve)
+
+class FakeNode(BaseHTTPRequestHandler):
+    head = 100
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        call = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeNode.head += 1
+        self._send({'jsonrpc': '2.0', 'id': call['id'], 'result': hex(FakeNode.head)})
+
+    def do_GET(self):
+        self._send({'status': '1', 'message': 'OK', 'result': '42'})
+
+def url_of(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+def post(url, method, params=(), id=1):
+    request = urllib.request.Request(url, json.dumps({'jsonrpc': '2.0', 'id': id, 'method': method,
+                                                      'params': list(params)}).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+def get(url, query):
+    with urllib.request.urlopen(f"{url}/api?{query}", timeout=5) as response:
+        return json.loads(response.read())
+
+class TestKeys(unittest.TestCase):
+    def test_rpc_key_ignores_id_and_dict_order(self):
+        self.assertEqual(rpc_key('eth_call', [{'to': '0x1', 'data': '0x2'}, 'latest']),
+                         rpc_key('eth_call', [{'data': '0x2', 'to': '0x1'}, 'latest']))
+
+    def test_http_key_ignores_api_key_and_order(self):
+        self.assertEqual(http_key('/api?x', 'module=account&action=balance&apikey=A'),
+                         http_key('/api?x', 'action=balance&apikey=B&module=account'))
+
+class TestRecordReplay(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'node.jsonl.gz')
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.dir.cleanup()
+
+    def start(self, server):
+        self.servers.append(serve(server))
+        return url_of(server)
+
+    def record(self, polls=3):
+        node = self.start(ThreadingHTTPServer(('127.0.0.1', 0), FakeNode))
+        recorder = Recorder(self.path)
+        proxy = self.start(RecordingProxy(('127.0.0.1', 0), node, recorder))
+        heads = [post(proxy, 'eth_blockNumber', id=i)['result'] for i in range(polls)]
+        self.assertEqual(get(proxy, 'module=stats&action=ethsupply&apikey=SECRET')['result'], '42')
+        recorder.close()
+        return heads
+
+    def test_replays_responses_in_recorded_order(self):
+        heads = self.record()
+        replay = self.start(ReplayServer(('127.0.0.1', 0), Recording.load(self.path)))
+        replayed = [post(replay, 'eth_blockNumber', id=7) for _ in range(4)]
+        self.assertEqual([r['result'] for r in replayed], heads + heads[-1:])
+        self.assertEqual(replayed[0]['id'], 7)
+        self.assertEqual(get(replay, 'action=ethsupply&module=stats&apikey=OTHER')['result'], '42')
+        self.assertIn('error', post(replay, 'eth_chainId'))
+
+    def test_faults_are_deterministic_per_seed(self):
+        self.record(polls=1)
+        outcomes = []
+        for _ in range(2):
+            server = ReplayServer(('127.0.0.1', 0), Recording.load(self.path), Faults(drop=0.3, error=0.3, seed=5))
+            replay = self.start(server)
+            for _ in range(30):
+                try:
+                    post(replay, 'eth_blockNumber')
+                except (urllib.error.URLError, ConnectionError):
+                    pass
+            outcomes.append(dict(server.stats))
+        self.assertEqual(outcomes[0], outcomes[1])
+        self.assertGreater(outcomes[0]['drop'], 0)
+        self.assertGreater(outcomes[0]['error'], 0)
+
+    def test_rate_limit_and_stale_heads(self):
+        heads = self.record(polls=1)
+        replay = self.start(ReplayServer(('127.0.0.1', 0), Recording.load(self.path),
+                                         Faults(rate_limit=2, stale=(1.0, 3))))
+        self.assertEqual(int(post(replay, 'eth_blockNumber')['result'], 16), int(heads[0], 16) - 3)
+        post(replay, 'eth_blockNumber')
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            post(replay, 'eth_blockNumber')
+        self.assertEqual(raised.exception.code, 429)
+        self.assertEqual(get(replay, 'module=stats&action=ethsupply')['result'], 'Max rate limit reached')
+
+if __name__ == "__main__":
+    unittest.main()
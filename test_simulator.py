@@ -0,0 +1,84 @@
+# test_simulator.py
+import unittest
+from eth_abi import encode
+from modules.simulator import Simulator
+
+TOKEN = "0x95aD61b0a150d79219dCF64E1E6Cc01f0B64C4cE"
+WALLET = "0x" + "ab" * 20
+
+def ok(value=b'', gas=100000):
+    return {'status': '0x1', 'returnData': '0x' + value.hex(), 'gasUsed': hex(gas)}
+
+def uint(value):
+    return value.to_bytes(32, 'big')
+
+def amounts(*values):
+    return encode(['uint256[]'], [list(values)])
+
+def reverted(message):
+    return {'status': '0x0', 'returnData': '0x', 'gasUsed': '0x5208', 'error': {'message': message}}
+
+class FakeNode:
+    """Answers eth_simulateV1 for the simulator's two rounds from the amounts of one round trip."""
+    def __init__(self, expected=1000, bought=1000, expected_native=10**18, received=10**18, sell=None, error=None):
+        self.provider = self
+        self.expected, self.bought = expected, bought
+        self.expected_native, self.received = expected_native, received
+        self.sell = sell
+        self.error = error
+        self.requests = []
+
+    def make_request(self, method, params):
+        self.requests.append(method)
+        if self.error:
+            return {'jsonrpc': '2.0', 'id': 1, 'error': self.error}
+        calls = params[0]['blockStateCalls'][0]['calls']
+        if len(calls) == 4:  # Quote, buy and the token balance around it
+            results = [ok(uint(0)), ok(amounts(10**16, self.expected)), ok(gas=120000), ok(uint(self.bought))]
+        else:  # Buy, approve, quote and sell back with the native balance around the sell
+            results = [ok(), ok(uint(1)), ok(amounts(self.bought, self.expected_native)), ok(uint(0)),
+                       self.sell or ok(gas=150000), ok(uint(self.received))]
+        return {'jsonrpc': '2.0', 'id': 1, 'result': [{'calls': results}]}
+
+class TestSimulator(unittest.TestCase):
+    def simulator(self, node):
+        return Simulator(node, 'ETH', WALLET, 10**16, max_workers=2, deadline=5, max_buy_tax=0.1, max_sell_tax=0.1)
+
+    def test_clean_round_trip_passes(self):
+        result = self.simulator(FakeNode(bought=980, received=97 * 10**16)).screen(TOKEN)
+        self.assertTrue(result.passed)
+        self.assertAlmostEqual(result.buy_tax, 0.02)
+        self.assertAlmostEqual(result.sell_tax, 0.03)
+        self.assertEqual((result.buy_gas, result.sell_gas), (120000, 150000))
+        self.assertIsNone(result.error)
+
+    def test_reverting_sell_is_a_honeypot(self):
+        result = self.simulator(FakeNode(sell=reverted("TRANSFER_FAILED"))).screen(TOKEN)
+        self.assertFalse(result.passed)
+        self.assertIn("Sell reverted: TRANSFER_FAILED", result.error)
+
+    def test_high_sell_tax_fails(self):
+        result = self.simulator(FakeNode(received=6 * 10**17)).screen(TOKEN)
+        self.assertFalse(result.passed)
+        self.assertAlmostEqual(result.sell_tax, 0.4)
+        self.assertAlmostEqual(result.buy_tax, 0.0)
+
+    def test_unsupported_node_rejects_without_asking_again(self):
+        node = FakeNode(error={'code': -32601, 'message': "the method eth_simulateV1 does not exist/is not available"})
+        simulator = self.simulator(node)
+        with self.assertLogs(level='ERROR'):
+            first = simulator.screen(TOKEN)
+        second = simulator.screen(TOKEN)
+        self.assertFalse(first.passed or second.passed)
+        self.assertIn("not supported", second.error)
+        self.assertEqual(node.requests, ['eth_simulateV1'])
+
+    def test_other_node_errors_are_retried(self):
+        node = FakeNode(error={'code': -32000, 'message': "header not found"})
+        simulator = self.simulator(node)
+        self.assertFalse(simulator.screen(TOKEN).passed)
+        self.assertFalse(simulator.screen(TOKEN).passed)
+        self.assertEqual(len(node.requests), 2)
+
+if __name__ == "__main__":
+    unittest.main()
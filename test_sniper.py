@@ -2,6 +2,7 @@
 import unittest
 from unittest.mock import patch
 from sniper import determine_blockchain, process_token
+from config import MAX_INVESTMENT_AMOUNT
 
 class TestSniperFunctions(unittest.TestCase):
     def test_determine_blockchain_eth(self):
@@ -30,30 +31,53 @@ class TestSniperFunctions(unittest.TestCase):
             self.assertIsNone(determine_blockchain("UNKNOWN_TOKEN", eth_tokens, bsc_tokens, sol_tokens))
             self.assertIn("Unknown blockchain for token: UNKNOWN_TOKEN", log.output[0])
 
+    @patch('sniper.get_provider')
+    @patch('sniper.screen_token', return_value=True)
     @patch('sniper.analyze_token')
     @patch('sniper.buy_token')
     @patch('sniper.logging')
-    def test_process_token_purchase(self, mock_logging, mock_buy_token, mock_analyze_token):
+    def test_process_token_purchase(self, mock_logging, mock_buy_token, mock_analyze_token, mock_screen_token,
+                                    mock_get_provider):
         mock_analyze_token.return_value = True
         process_token("ETH_TOKEN", ["ETH_TOKEN"], [], [])
-        mock_buy_token.assert_called_once_with("ETH_TOKEN", float("MAX_INVESTMENT_AMOUNT"), "ETH")
-        mock_logging.info.assert_called_with("Purchased ETH_TOKEN on ETH.")
+        mock_buy_token.assert_called_once_with("ETH_TOKEN", MAX_INVESTMENT_AMOUNT, "ETH")
+        mock_logging.info.assert_called_with("Purchased %s on %s.", "ETH_TOKEN", "ETH")
 
+    @patch('sniper.get_provider')
+    @patch('sniper.screen_token', return_value=True)
     @patch('sniper.analyze_token')
     @patch('sniper.logging')
-    def test_process_token_no_purchase(self, mock_logging, mock_analyze_token):
+    def test_process_token_no_purchase(self, mock_logging, mock_analyze_token, mock_screen_token, mock_get_provider):
         mock_analyze_token.return_value = False
         process_token("ETH_TOKEN", ["ETH_TOKEN"], [], [])
-        mock_logging.info.assert_called_with("Token ETH_TOKEN did not pass analysis.")
+        mock_screen_token.assert_not_called()
+        mock_logging.info.assert_called_with("Token %s did not pass analysis.", "ETH_TOKEN")
 
+    @patch('sniper.get_provider')
+    @patch('sniper.screen_token', return_value=True)
     @patch('sniper.analyze_token')
     @patch('sniper.buy_token')
     @patch('sniper.logging')
-    def test_process_token_purchase_failure(self, mock_logging, mock_buy_token, mock_analyze_token):
+    def test_process_token_purchase_failure(self, mock_logging, mock_buy_token, mock_analyze_token,
+                                            mock_screen_token, mock_get_provider):
         mock_analyze_token.return_value = True
         mock_buy_token.side_effect = Exception("Purchase failed")
         process_token("ETH_TOKEN", ["ETH_TOKEN"], [], [])
-        mock_logging.error.assert_called_with("Failed to buy ETH_TOKEN on ETH: Purchase failed")
+        error = mock_logging.error.call_args.args
+        self.assertEqual(error[:3], ("Failed to buy %s on %s: %s", "ETH_TOKEN", "ETH"))
+        self.assertEqual(str(error[3]), "Purchase failed")
+
+    @patch('sniper.get_provider')
+    @patch('sniper.screen_token', return_value=False)
+    @patch('sniper.analyze_token')
+    @patch('sniper.buy_token')
+    @patch('sniper.logging')
+    def test_process_token_failed_simulation(self, mock_logging, mock_buy_token, mock_analyze_token,
+                                             mock_screen_token, mock_get_provider):
+        mock_analyze_token.return_value = True
+        process_token("ETH_TOKEN", ["ETH_TOKEN"], [], [])
+        mock_buy_token.assert_not_called()
+        mock_logging.info.assert_called_with("Token %s failed the buy/sell simulation.", "ETH_TOKEN")
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,97 @@
+# test_solana_data.py
+import asyncio
+import base64
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from utils import solana_data
+from modules.analyzer import analyze_solana_tokens
+from utils.solana_data import TOKEN_PROGRAM_IDS, SolanaData, b58encode, decode_token_account
+
+MINT = b58encode(bytes(range(1, 33)))
+OWNER = b58encode(bytes(range(33, 65)))
+
+def token_account(amount):
+    return bytes(range(1, 65)) + amount.to_bytes(8, 'little') + bytes(93)
+
+class FakeSolana(BaseHTTPRequestHandler):
+    accounts = {}
+    batches = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        calls = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeSolana.batches.append([len(call['params'][0]) for call in calls])
+        replies = []
+        for call in calls:
+            values = []
+            for pubkey in call['params'][0]:
+                data = FakeSolana.accounts.get(pubkey)
+                owner = TOKEN_PROGRAM_IDS[0] if pubkey.startswith('acct') else '11111111111111111111111111111111'
+                values.append(data and {'lamports': 2039280, 'owner': owner, 'executable': False,
+                                        'data': [base64.b64encode(data).decode(), 'base64']})
+            replies.append({'jsonrpc': '2.0', 'id': call['id'], 'result': {'context': {'slot': 1}, 'value': values}})
+        body = json.dumps(replies).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class TestSolanaData(unittest.TestCase):
+    def setUp(self):
+        FakeSolana.accounts = {f'acct{i}': token_account(i) for i in range(250)}
+        FakeSolana.batches = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSolana)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.data = SolanaData(f"http://127.0.0.1:{self.server.server_address[1]}", window=0.05)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_decode_token_account(self):
+        self.assertEqual(decode_token_account(token_account(42)), {'mint': MINT, 'owner': OWNER, 'amount': 42})
+
+    def test_concurrent_lookups_share_one_round_trip(self):
+        keys = [f'acct{i}' for i in range(32)] + ['missing']
+        with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+            results = list(pool.map(lambda key: self.data.get_accounts([key])[key], keys))
+        self.assertEqual(FakeSolana.batches, [[33]])
+        self.assertEqual(decode_token_account(results[7]['data'])['amount'], 7)
+        self.assertIsNone(results[-1])
+
+    def test_async_burst_is_split_into_calls_of_100(self):
+        async def burst():
+            return await asyncio.gather(*(self.data.get_accounts_async([f'acct{i}']) for i in range(250)))
+        results = asyncio.run(burst())
+        self.assertEqual(FakeSolana.batches, [[100, 100, 50]])
+        self.assertEqual(decode_token_account(results[3]['acct3']['data'])['amount'], 3)
+
+    def test_ata_cache_until_invalidated(self):
+        derive = lambda owner, mint: f'acct{mint}'
+        with mock.patch.object(solana_data, 'associated_token_address', derive):
+            first = self.data.get_token_accounts('me', ['1', '2', '300'])
+            self.assertEqual(first['2'], ('acct2', {'mint': MINT, 'owner': OWNER, 'amount': 2}))
+            self.assertEqual(first['300'], ('acct300', None))
+            self.data.get_token_accounts('me', ['1', '2', '300'])
+            self.assertEqual(self.data.round_trips, 1)
+
+            FakeSolana.accounts['acct2'] = token_account(5)
+            self.data.invalidate('acct2')
+            again = self.data.get_token_accounts('me', ['1', '2'])
+            self.assertEqual(again['2'][1]['amount'], 5)
+            self.assertEqual(FakeSolana.batches[-1], [1])
+
+    def test_bad_account_only_rejects_its_token(self):
+        FakeSolana.accounts.update({'acct1': token_account(2 * 10**9), 'acctshort': b'\x01' * 10,
+                                    'wallet': token_account(2 * 10**9)})
+        results = asyncio.run(analyze_solana_tokens(['acct1', 'acctshort', 'wallet', 'acct3'], self.data))
+        self.assertEqual(results, {'acct1': True, 'acctshort': False, 'wallet': False, 'acct3': False})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+# test_templates.py
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock
+import rlp
+from eth_account import Account
+from eth_account._utils.typed_transactions import TypedTransaction
+from config import ROUTER_ADDRESSES, WRAPPED_NATIVE
+from utils import templates
+from utils.fees import FeeOracle
+from utils.nonce import NonceManager
+from utils.templates import SWAP_EXACT_ETH_FOR_TOKENS, SwapTemplate
+
+GWEI = 10**9
+ACCOUNT = Account.from_key("0x" + "42" * 32)
+TOKEN = "0x00000000000000000000000000000000000000A1"
+
+def make_provider(chain_id, pending_nonce=7):
+    provider = MagicMock()
+    provider.eth.chain_id = chain_id
+    provider.eth.get_transaction_count.return_value = pending_nonce
+    provider.eth.fee_history.return_value = {'oldestBlock': 100, 'baseFeePerGas': [20 * GWEI, 20 * GWEI],
+                                             'reward': [[1 * GWEI, 2 * GWEI, 3 * GWEI]]}
+    provider.eth.gas_price = 5 * GWEI
+    provider.eth.block_number = 100
+    return provider
+
+def words(data):
+    return [data[i:i + 32] for i in range(4, len(data), 32)]
+
+class TestSwapTemplate(unittest.TestCase):
+    def make_template(self, chain, chain_id):
+        self.provider = make_provider(chain_id)
+        self.oracle = FeeOracle(self.provider, chain)
+        self.nonces = NonceManager()
+        patches = [mock.patch.object(templates, 'get_fee_oracle', return_value=self.oracle),
+                   mock.patch.object(templates, 'nonce_manager', self.nonces)]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        return SwapTemplate(self.provider, chain, ACCOUNT.address, ACCOUNT.key, value_wei=10**17).prepare()
+
+    def test_prepare_warms_nonce_and_fees(self):
+        self.make_template('ETH', 1)
+        self.assertEqual(self.nonces.peek('ETH', ACCOUNT.address), 7)
+        self.assertEqual(self.oracle.block_number, 100)
+
+    def test_signed_buy_fills_token_amount_nonce_and_fees(self):
+        template = self.make_template('ETH', 1)
+        signed_tx, nonce = template.sign(TOKEN, amount_out_min=12345, value_wei=10**18)
+        tx = TypedTransaction.from_bytes(signed_tx.rawTransaction).as_dict()
+
+        self.assertEqual(nonce, 7)
+        self.assertEqual(Account.recover_transaction(signed_tx.rawTransaction), ACCOUNT.address)
+        self.assertEqual((tx['chainId'], tx['nonce'], tx['value']), (1, 7, 10**18))
+        self.assertEqual(bytes(tx['to']), bytes.fromhex(ROUTER_ADDRESSES['ETH'][2:]))
+        self.assertEqual(tx['maxPriorityFeePerGas'], self.oracle.fee_fields()['maxPriorityFeePerGas'])
+        self.assertEqual(tx['maxFeePerGas'], self.oracle.fee_fields()['maxFeePerGas'])
+
+        data = bytes(tx['data'])
+        self.assertEqual(data[:4], SWAP_EXACT_ETH_FOR_TOKENS)
+        amount_out_min, path_offset, to, deadline, path_length, first, token = words(data)
+        self.assertEqual(int.from_bytes(amount_out_min, 'big'), 12345)
+        self.assertEqual(int.from_bytes(path_offset, 'big'), 128)
+        self.assertEqual(to[12:], bytes.fromhex(ACCOUNT.address[2:]))
+        self.assertEqual(int.from_bytes(deadline, 'big'), template._deadline)
+        self.assertEqual(int.from_bytes(path_length, 'big'), 2)
+        self.assertEqual(first[12:], bytes.fromhex(WRAPPED_NATIVE['ETH'][2:]))
+        self.assertEqual(token[12:], bytes.fromhex(TOKEN[2:]))
+
+    def test_legacy_buy_is_replay_protected(self):
+        template = self.make_template('BSC', 56)
+        signed_tx, _ = template.sign(TOKEN)
+        nonce, gas_price, _, _, value, _, v, _, _ = rlp.decode(signed_tx.rawTransaction)
+        self.assertEqual(int.from_bytes(nonce, 'big'), 7)
+        self.assertEqual(int.from_bytes(gas_price, 'big'), self.oracle.fee_fields()['gasPrice'])
+        self.assertEqual(int.from_bytes(value, 'big'), 10**17)
+        self.assertIn(int.from_bytes(v, 'big'), (56 * 2 + 35, 56 * 2 + 36))
+
+    def test_fee_moves_reach_the_next_buy(self):
+        template = self.make_template('ETH', 1)
+        first, _ = template.sign(TOKEN)
+        self.oracle.on_new_head('ETH', {'baseFeePerGas': hex(40 * GWEI), 'gasUsed': hex(15_000_000),
+                                        'gasLimit': hex(30_000_000)})
+        second, _ = template.sign(TOKEN)
+        fees = [TypedTransaction.from_bytes(signed.rawTransaction).as_dict()['maxFeePerGas'] for signed in (first, second)]
+        self.assertEqual(fees[1], self.oracle.fee_fields()['maxFeePerGas'])
+        self.assertGreater(fees[1], fees[0])
+
+    def test_nonce_moves_reach_the_next_buy(self):
+        template = self.make_template('ETH', 1)
+        self.assertEqual(template.sign(TOKEN)[1], 7)
+        self.assertEqual(template.sign(TOKEN)[1], 8)
+        # A transaction sent from elsewhere moves the node's count; a resync invalidates the local nonce
+        self.provider.eth.get_transaction_count.return_value = 12
+        self.nonces.sync(self.provider, 'ETH', ACCOUNT.address)
+        signed_tx, nonce = template.sign(TOKEN)
+        self.assertEqual(nonce, 12)
+        self.assertEqual(TypedTransaction.from_bytes(signed_tx.rawTransaction).as_dict()['nonce'], 12)
+
+    def test_failed_signing_gives_the_nonce_back(self):
+        template = self.make_template('ETH', 1)
+        with mock.patch.object(template._account, 'sign_transaction', side_effect=ValueError("bad tx")):
+            with self.assertRaises(ValueError):
+                template.sign(TOKEN)
+        self.assertEqual(template.sign(TOKEN)[1], 7)
+
+    def test_deadline_is_rebuilt_before_it_expires(self):
+        template = self.make_template('ETH', 1)
+        prepared = template._deadline
+        with mock.patch.object(templates.time, 'time', return_value=prepared - templates.DEADLINE_MARGIN + 1):
+            data = template.calldata(TOKEN)
+        self.assertGreater(template._deadline, prepared)
+        self.assertEqual(int.from_bytes(words(data)[3], 'big'), template._deadline)
+
+if __name__ == "__main__":
+    unittest.main()
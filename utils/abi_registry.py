@@ -0,0 +1,129 @@
+# utils/abi_registry.py
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from utils.explorer import explorer
+
+ABI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'abis')
+CACHE_DIR = os.path.join(ABI_DIR, 'cache')
+
+# ABIs shipped in abis/, keyed by (chain, lowercase address)
+SEED_ABIS = {
+    ('ETH', "0x5c69bee701ef814a2b6a3edd4b1652cb9cc5aa6f"): 'uniswap-v2-factory.abi.json',  # Uniswap V2 Factory
+    ('BSC', "0xca143ce32fe78f1f7019d7d551a6402fc5350c73"): 'pancakeswap_router_abi.json',  # PancakeSwap V2 Factory
+    ('ETH', "0x7a250d5630b4cf539739df2c5dacb4c659f2488d"): 'uniswap-v2-router.abi.json',  # Uniswap V2 Router02
+    ('BSC', "0x10ed43c718714eb63d5aa57b78b54704e256024e"): 'uniswap-v2-router.abi.json',  # PancakeSwap V2 Router
+}
+
+# The codebase names chains 'ETH'/'BSC', 'ethereum'/'bsc' or 'eth'/'bsc' depending on the module
+CHAIN_ALIASES = {'eth': 'ETH', 'ethereum': 'ETH', 'bsc': 'BSC'}
+
+
+def normalize_chain(chain):
+    """Map any of the chain spellings used across the bot onto 'ETH' / 'BSC'."""
+    return CHAIN_ALIASES.get(chain.lower(), chain.upper())
+
+
+class AbiRegistry:
+    """Two-tier ABI cache: an in-memory LRU in front of an on-disk store keyed by (chain, address).
+
+    Only the first lookup of a contract ever reaches the block explorer; the disk
+    store is seeded from the ABIs shipped in abis/.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries=256, client=explorer):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.client = client
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, chain, address, api_key=None):
+        """Return the ABI of a contract, raising if it is not cached and cannot be fetched."""
+        key = (normalize_chain(chain), address.lower())
+        abi = self._get_from_memory(key)
+        if abi is not None:
+            return abi
+
+        # One loader per contract, so concurrent callers wait for a single download
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            abi = self._get_from_memory(key)
+            if abi is None:
+                abi = self._load_from_disk(key)
+                if abi is None:
+                    abi = self._fetch_from_explorer(key, api_key)
+                    self._save_to_disk(key, abi)
+                self._put_in_memory(key, abi)
+        return abi
+
+    def put(self, chain, address, abi):
+        """Store an ABI obtained elsewhere in both tiers."""
+        key = (normalize_chain(chain), address.lower())
+        self._save_to_disk(key, abi)
+        self._put_in_memory(key, abi)
+
+    def _get_from_memory(self, key):
+        with self._lock:
+            abi = self._memory.get(key)
+            if abi is not None:
+                self._memory.move_to_end(key)
+            return abi
+
+    def _put_in_memory(self, key, abi):
+        with self._lock:
+            self._memory[key] = abi
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key):
+        chain, address = key
+        return os.path.join(self.cache_dir, chain, f"{address}.json")
+
+    def _load_from_disk(self, key):
+        for path in (self._disk_path(key), os.path.join(ABI_DIR, SEED_ABIS.get(key, ''))):
+            if os.path.isfile(path):
+                try:
+                    with open(path, 'r') as abi_file:
+                        return json.load(abi_file)
+                except (OSError, ValueError) as e:
+                    logging.warning("Ignoring unreadable cached ABI %s: %s", path, e)
+        return None
+
+    def _save_to_disk(self, key, abi):
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as abi_file:
+                json.dump(abi, abi_file)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning("Could not persist ABI for %s on %s: %s", key[1], key[0], e)
+
+    def _fetch_from_explorer(self, key, api_key=None):
+        chain, address = key
+        logging.info("Fetching ABI for %s on %s from block explorer...", address, chain)
+        return self.client.get_abi(chain, address, api_key)
+
+
+@lru_cache(maxsize=None)
+def load_local_abi(filename):
+    """Load a generic ABI (e.g. erc20.abi.json) shipped in abis/; not tied to any address."""
+    with open(os.path.join(ABI_DIR, filename), 'r') as abi_file:
+        return json.load(abi_file)
+
+
+# Process-wide registry shared by the monitor, analyzer and sniper
+abi_registry = AbiRegistry()
+
+
+def get_abi(chain, address, api_key=None):
+    """Return a contract ABI through the shared registry."""
+    return abi_registry.get(chain, address, api_key)
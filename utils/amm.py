@@ -0,0 +1,102 @@
+# utils/amm.py
+import numpy as np
+
+# Uniswap V2 constant-product math. The float64 functions take scalars or arrays that
+# broadcast, for screening and sizing many pools at once, and match the router's integer
+# formulas to within float rounding; the *_exact functions use Python integers and
+# reproduce the on-chain results exactly, for the amounts that go into a transaction.
+
+# Swap fee as (numerator, denominator): Uniswap V2 keeps 0.3%, PancakeSwap V2 0.25%
+SWAP_FEES = {'ETH': (997, 1000), 'BSC': (9975, 10000)}
+DEFAULT_FEE = SWAP_FEES['ETH']
+
+
+def get_amount_out(amount_in, reserve_in, reserve_out, fee=DEFAULT_FEE):
+    """UniswapV2Library.getAmountOut over arrays; zero where the pool is empty."""
+    fee_numerator, fee_denominator = fee
+    amount_in = np.asarray(amount_in, dtype=np.float64)
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    reserve_out = np.asarray(reserve_out, dtype=np.float64)
+    amount_in_with_fee = amount_in * fee_numerator
+    denominator = reserve_in * fee_denominator + amount_in_with_fee
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.floor(amount_in_with_fee * reserve_out / denominator)
+    return np.where((reserve_in > 0) & (reserve_out > 0) & (amount_in > 0), out, 0.0)
+
+
+def get_amount_in(amount_out, reserve_in, reserve_out, fee=DEFAULT_FEE):
+    """UniswapV2Library.getAmountIn over arrays; inf where the pool cannot deliver `amount_out`."""
+    fee_numerator, fee_denominator = fee
+    amount_out = np.asarray(amount_out, dtype=np.float64)
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    reserve_out = np.asarray(reserve_out, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amount_in = np.floor(reserve_in * amount_out * fee_denominator
+                             / ((reserve_out - amount_out) * fee_numerator)) + 1
+    return np.where((amount_out < reserve_out) & (reserve_in > 0), amount_in, np.inf)
+
+
+def price_impact(amount_in, reserve_in, reserve_out, fee=DEFAULT_FEE):
+    """Fraction by which the execution price is worse than the spot price, fee included."""
+    fee_numerator, fee_denominator = fee
+    amount_in = np.asarray(amount_in, dtype=np.float64)
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    # out / (amount_in * spot) simplifies to f * R_in / (R_in * d + amount_in * f)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        impact = 1 - fee_numerator * reserve_in / (reserve_in * fee_denominator + amount_in * fee_numerator)
+    return np.where(reserve_in > 0, impact, 1.0)
+
+
+def amount_out_min(expected_out, slippage):
+    """Lowest acceptable output for a swap quoted at `expected_out` under a slippage tolerance."""
+    return np.floor(np.asarray(expected_out, dtype=np.float64) * (1 - slippage))
+
+
+def max_trade_size(reserve_in, max_impact, fee=DEFAULT_FEE):
+    """Largest input whose price impact (fee included) stays within `max_impact`; 0 if even a dust trade exceeds it."""
+    fee_numerator, fee_denominator = fee
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)
+    size = np.floor(reserve_in * (fee_numerator / (1 - max_impact) - fee_denominator) / fee_numerator)
+    return np.maximum(size, 0.0)
+
+
+def size_trades(reserve_in, reserve_out, budget, max_impact, slippage, fee=DEFAULT_FEE):
+    """Size one buy per pool: as much of `budget` as fits under `max_impact`.
+
+    Returns (amount_in, expected_out, amount_out_min) arrays, one entry per pool.
+    """
+    amount_in = np.minimum(np.asarray(budget, dtype=np.float64), max_trade_size(reserve_in, max_impact, fee))
+    amount_in = np.where(np.asarray(reserve_out, dtype=np.float64) > 0, amount_in, 0.0)
+    expected_out = get_amount_out(amount_in, reserve_in, reserve_out, fee)
+    return amount_in, expected_out, amount_out_min(expected_out, slippage)
+
+
+def quote_grid(reserve_in, reserve_out, sizes, fee=DEFAULT_FEE):
+    """Outputs and price impacts of every trade size against every pool, as (pools x sizes) matrices."""
+    reserve_in = np.asarray(reserve_in, dtype=np.float64)[:, None]
+    reserve_out = np.asarray(reserve_out, dtype=np.float64)[:, None]
+    sizes = np.asarray(sizes, dtype=np.float64)[None, :]
+    return get_amount_out(sizes, reserve_in, reserve_out, fee), price_impact(sizes, reserve_in, reserve_out, fee)
+
+
+def get_amount_out_exact(amount_in, reserve_in, reserve_out, fee=DEFAULT_FEE):
+    """Integer getAmountOut exactly as the router computes it."""
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0
+    fee_numerator, fee_denominator = fee
+    amount_in_with_fee = amount_in * fee_numerator
+    return amount_in_with_fee * reserve_out // (reserve_in * fee_denominator + amount_in_with_fee)
+
+
+def get_amount_in_exact(amount_out, reserve_in, reserve_out, fee=DEFAULT_FEE):
+    """Integer getAmountIn exactly as the router computes it; None if the pool cannot deliver `amount_out`."""
+    if amount_out <= 0 or reserve_in <= 0 or amount_out >= reserve_out:
+        return None
+    fee_numerator, fee_denominator = fee
+    return reserve_in * amount_out * fee_denominator // ((reserve_out - amount_out) * fee_numerator) + 1
+
+
+def amount_out_min_exact(amount_in, reserve_in, reserve_out, slippage, fee=DEFAULT_FEE):
+    """Integer amountOutMin for a swap of `amount_in` under a slippage tolerance given as a fraction."""
+    expected_out = get_amount_out_exact(amount_in, reserve_in, reserve_out, fee)
+    return expected_out * round((1 - slippage) * 10**6) // 10**6
@@ -0,0 +1,113 @@
+# utils/broadcast.py
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+import requests
+from web3 import Web3
+from config import BROADCAST_ENDPOINTS
+
+# Node replies meaning the transaction is already in its pool, i.e. an earlier send got there first
+ALREADY_KNOWN_ERRORS = ("already known", "known transaction", "already imported")
+
+
+class BroadcastError(Exception):
+    """Raised when no endpoint accepted a transaction."""
+
+
+class RaceBroadcaster:
+    """Sends the same signed transaction to every endpoint at once and returns on the first acceptance.
+
+    Each endpoint keeps its own pooled HTTP session. The chain's own provider can join
+    the race through `primary`. Slower endpoints still receive the transaction in the
+    background, which only helps it propagate.
+    """
+
+    def __init__(self, endpoints, timeout=5):
+        if not endpoints:
+            raise ValueError("RaceBroadcaster needs at least one endpoint.")
+        self.endpoints = list(endpoints)
+        self.timeout = timeout
+        self.wins = Counter()
+        self._sessions = {url: requests.Session() for url in self.endpoints}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.endpoints) + 1, thread_name_prefix='broadcast')
+        self._lock = threading.Lock()
+
+    def broadcast(self, raw_tx, tx_hash=None, primary=None):
+        """Broadcast raw transaction bytes; returns (tx hash, winning endpoint).
+
+        `primary`, when given, is a callable sending the transaction through the chain's
+        own provider; it races the endpoints and wins under the name 'provider'.
+        """
+        tx_hash = tx_hash or Web3.keccak(raw_tx)
+        # Nodes return hashes as hex strings; to_hex only accepts those through `hexstr`
+        tx_hash = Web3.to_hex(hexstr=tx_hash) if isinstance(tx_hash, str) else Web3.to_hex(tx_hash)
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_sendRawTransaction", "params": [Web3.to_hex(raw_tx)]}
+        start = time.perf_counter()
+        futures = {self._executor.submit(self._send, url, payload, tx_hash): url for url in self.endpoints}
+        if primary is not None:
+            futures[self._executor.submit(self._send_primary, primary, tx_hash)] = 'provider'
+
+        errors = {}
+        try:
+            for future in as_completed(futures, timeout=self.timeout):
+                url = futures[future]
+                try:
+                    accepted_hash = future.result()
+                except Exception as e:
+                    errors[url] = e
+                    continue
+                with self._lock:
+                    self.wins[url] += 1
+                logging.info("Transaction %s accepted first by %s after %.1f ms",
+                             accepted_hash, url, (time.perf_counter() - start) * 1000)
+                return accepted_hash, url
+        except FutureTimeout:
+            pass
+        raise BroadcastError(f"No endpoint accepted {tx_hash} within {self.timeout}s: "
+                             + "; ".join(f"{url}: {error}" for url, error in errors.items()))
+
+    def _send_primary(self, primary, tx_hash):
+        try:
+            return Web3.to_hex(primary())
+        except Exception as e:
+            if any(text in str(e).lower() for text in ALREADY_KNOWN_ERRORS):
+                return tx_hash
+            raise
+
+    def _send(self, url, payload, tx_hash):
+        response = self._sessions[url].post(url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if 'error' in data:
+            message = str(data['error'].get('message', data['error']))
+            if any(text in message.lower() for text in ALREADY_KNOWN_ERRORS):
+                return tx_hash
+            raise ValueError(message)
+        return data['result']
+
+
+_broadcasters = {}
+_broadcasters_lock = threading.Lock()
+
+
+def get_broadcaster(chain):
+    """Return the racing broadcaster of a chain, or None if no broadcast endpoints are configured."""
+    with _broadcasters_lock:
+        if chain not in _broadcasters:
+            endpoints = BROADCAST_ENDPOINTS.get(chain)
+            _broadcasters[chain] = RaceBroadcaster(endpoints) if endpoints else None
+        return _broadcasters[chain]
+
+
+def send_raw_transaction(provider, chain, signed_tx):
+    """Broadcast a signed transaction through the provider, racing it against the configured endpoints when there are any."""
+    def primary():
+        return provider.eth.send_raw_transaction(signed_tx.rawTransaction)
+
+    broadcaster = get_broadcaster(chain)
+    if broadcaster is None:
+        return Web3.to_hex(primary())
+    tx_hash, _ = broadcaster.broadcast(signed_tx.rawTransaction, signed_tx.hash, primary=primary)
+    return tx_hash
@@ -0,0 +1,31 @@
+# utils/chains.py
+import importlib
+from config import CHAINS
+
+# Plugin module implementing each supported chain. A plugin (and the SDK it wraps)
+# is imported the first time one of its chains is used, and only if that chain is
+# enabled in CHAINS, so e.g. an ETH/BSC deployment never loads solana/spl.
+PLUGINS = {
+    'ETH': 'utils.evm',
+    'BSC': 'utils.evm',
+    'SOL': 'utils.solana_chain',
+}
+
+def is_enabled(chain):
+    return chain in CHAINS and chain in PLUGINS
+
+def get_plugin(chain):
+    """Import (once) and return the plugin module of an enabled chain."""
+    if chain not in PLUGINS:
+        raise ValueError(f"Unsupported blockchain: {chain}")
+    if chain not in CHAINS:
+        raise ValueError(f"{chain} is not enabled; add it to CHAINS in your .env file")
+    return importlib.import_module(PLUGINS[chain])
+
+def get_client(chain):
+    """The chain's shared client (a pooled Web3 on EVM chains), created on first use."""
+    return get_plugin(chain).get_client(chain)
+
+def evm_chains():
+    """Enabled chains served by the EVM plugin, in CHAINS order."""
+    return [chain for chain in CHAINS if PLUGINS.get(chain) == 'utils.evm']
@@ -0,0 +1,9 @@
+# utils/evm.py
+from config import RPC_URLS
+from utils.providers import get_web3
+
+def get_client(chain):
+    """The pooled Web3 instance of an EVM chain; endpoints are only contacted when it is first used."""
+    if not RPC_URLS.get(chain):
+        raise ValueError(f"No RPC endpoint configured for {chain}. Please check your .env file.")
+    return get_web3(chain)
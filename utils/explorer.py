@@ -0,0 +1,137 @@
+# utils/explorer.py
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import Future
+import requests
+from requests.adapters import HTTPAdapter
+from config import ETHERSCAN_API_KEY, BSCSCAN_API_KEY, ETHERSCAN_API_URL, BSCSCAN_API_URL, EXPLORER_RATE_LIMIT
+
+EXPLORER_URLS = {
+    'ETH': ETHERSCAN_API_URL,
+    'BSC': BSCSCAN_API_URL,
+}
+
+# Etherscan-family replies that mean "slow down" rather than a real failure
+RATE_LIMIT_MESSAGES = ("max rate limit reached", "rate limit")
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ExplorerClient:
+    """Shared Etherscan/BscScan client.
+
+    Connections are pooled in one session, each API key has its own token bucket,
+    identical requests that are in flight at the same time share a single call, and
+    throttled or failed calls are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, api_keys=None, rate=EXPLORER_RATE_LIMIT, max_retries=4, base_delay=0.5, timeout=10):
+        self.api_keys = api_keys or {'ETH': ETHERSCAN_API_KEY, 'BSC': BSCSCAN_API_KEY}
+        self.rate = rate
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=len(EXPLORER_URLS), pool_maxsize=16))
+        self._buckets = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, api_key):
+        with self._lock:
+            bucket = self._buckets.get(api_key)
+            if bucket is None:
+                bucket = self._buckets[api_key] = TokenBucket(self.rate)
+            return bucket
+
+    def get(self, chain, api_key=None, **params):
+        """Make an explorer API call and return the decoded JSON reply."""
+        if chain not in EXPLORER_URLS:
+            raise ValueError(f"Unsupported chain for explorer lookup: {chain}")
+        api_key = api_key or self.api_keys.get(chain)
+        key = (chain, api_key, tuple(sorted(params.items())))
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()  # Someone is already making this exact call
+
+        try:
+            data = self._request(chain, api_key, params)
+            future.set_result(data)
+            return data
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _request(self, chain, api_key, params):
+        bucket = self._bucket(api_key)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            try:
+                response = self.session.get(EXPLORER_URLS[chain], params=dict(params, apikey=api_key),
+                                            timeout=self.timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+                response.raise_for_status()
+                data = response.json()
+                if data.get('status') == '0' and any(text in str(data.get('result', '')).lower()
+                                                     for text in RATE_LIMIT_MESSAGES):
+                    raise requests.HTTPError(f"Rate limited: {data['result']}")
+                return data
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, self.base_delay * 2 ** attempt)  # Full jitter
+                logging.warning("%s explorer call %s failed (%s); retry %d/%d in %.2fs", chain, params.get('action'), e,
+                                attempt + 1, self.max_retries, delay)
+                time.sleep(delay)
+
+    def get_abi(self, chain, address, api_key=None):
+        """Return the verified ABI of a contract."""
+        data = self.get(chain, api_key, module='contract', action='getabi', address=address)
+        if data.get('status') != '1':
+            raise ValueError(f"Failed to retrieve ABI for {address} on {chain}: {data.get('result') or data.get('message')}")
+        return json.loads(data['result'])
+
+    def get_balance(self, chain, address, api_key=None):
+        """Return the native coin balance of an address, in wei."""
+        data = self.get(chain, api_key, module='account', action='balance', address=address, tag='latest')
+        if data.get('status') != '1':
+            raise ValueError("Error fetching balance: " + str(data.get('message')))
+        return int(data['result'])
+
+
+# Process-wide client shared by every explorer caller
+explorer = ExplorerClient()
@@ -0,0 +1,148 @@
+# utils/fees.py
+import logging
+import threading
+from config import FEE_AGGRESSIVENESS
+
+REWARD_PERCENTILES = [10, 50, 90]
+
+# How hard a snipe bids for inclusion
+AGGRESSIVENESS_POLICIES = {
+    'low': {'percentile': 10, 'base_fee_multiplier': 1.125, 'gas_price_multiplier': 1.0},
+    'medium': {'percentile': 50, 'base_fee_multiplier': 1.5, 'gas_price_multiplier': 1.1},
+    'high': {'percentile': 90, 'base_fee_multiplier': 2.0, 'gas_price_multiplier': 1.25},
+}
+
+
+def next_base_fee(base_fee, gas_used, gas_limit):
+    """EIP-1559 base fee of the block following one with the given base fee and gas usage."""
+    gas_target = gas_limit // 2
+    if gas_target == 0 or gas_used == gas_target:
+        return base_fee
+    if gas_used > gas_target:
+        return base_fee + max(base_fee * (gas_used - gas_target) // gas_target // 8, 1)
+    return base_fee - base_fee * (gas_target - gas_used) // gas_target // 8
+
+
+class FeeOracle:
+    """Keeps the fee market of one chain cached so building a transaction never waits on an RPC.
+
+    EIP-1559 chains (ETH) are tracked with eth_feeHistory; legacy chains (BSC) with
+    eth_gasPrice. A background thread refreshes the cache on every new block, and
+    pushed block heads (see Monitoring.add_head_listener) update the base fee at once.
+    """
+
+    def __init__(self, provider, chain, eip1559=None, history_blocks=5, poll_interval=1.0):
+        self.provider = provider
+        self.chain = chain
+        self.eip1559 = chain == 'ETH' if eip1559 is None else eip1559
+        self.history_blocks = history_blocks
+        self.poll_interval = poll_interval
+
+        self.chain_id = None
+        self.block_number = None
+        self.base_fee = None
+        self.priority_fees = {}
+        self.gas_price = None
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Warm the cache and start refreshing it in the background."""
+        if self._thread is not None:
+            return self
+        try:
+            self.refresh()
+        except Exception as e:
+            logging.error("Initial fee refresh on %s failed: %s", self.chain, e)
+        self._thread = threading.Thread(target=self._run, name=f"fee-oracle-{self.chain}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            woken = self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                if woken or self.provider.eth.block_number != self.block_number:
+                    self.refresh()
+            except Exception as e:
+                logging.error("Fee refresh on %s failed: %s", self.chain, e)
+
+    def refresh(self):
+        """Reload fee data from the node."""
+        if self.chain_id is None:
+            self.chain_id = self.provider.eth.chain_id
+
+        if self.eip1559:
+            history = self.provider.eth.fee_history(self.history_blocks, 'latest', REWARD_PERCENTILES)
+            rewards = history['reward']
+            priority_fees = {}
+            for i, percentile in enumerate(REWARD_PERCENTILES):
+                samples = sorted(block_rewards[i] for block_rewards in rewards)
+                priority_fees[percentile] = samples[len(samples) // 2] if samples else 0
+            with self._lock:
+                # The last entry is the base fee of the block after `newest`
+                self.base_fee = history['baseFeePerGas'][-1]
+                self.priority_fees = priority_fees
+                self.block_number = history['oldestBlock'] + len(rewards) - 1
+        else:
+            gas_price = self.provider.eth.gas_price
+            block_number = self.provider.eth.block_number
+            with self._lock:
+                self.gas_price = gas_price
+                self.block_number = block_number
+
+    def on_new_head(self, chain, header):
+        """Head listener: update the base fee from the header and refresh the rest in the background."""
+        if chain != self.chain:
+            return
+        if self.eip1559 and header.get('baseFeePerGas'):
+            with self._lock:
+                self.base_fee = next_base_fee(int(header['baseFeePerGas'], 16), int(header['gasUsed'], 16),
+                                              int(header['gasLimit'], 16))
+        self._wake.set()
+
+    def fee_fields(self, aggressiveness=None):
+        """Return the chain id and fee fields of a transaction for the given aggressiveness policy."""
+        policy = AGGRESSIVENESS_POLICIES[aggressiveness or FEE_AGGRESSIVENESS]
+        if self.block_number is None:
+            self.refresh()  # Cold cache: only happens if the oracle was never started
+
+        with self._lock:
+            if self.eip1559:
+                priority_fee = self.priority_fees.get(policy['percentile'], 0)
+                return {
+                    'type': 2,
+                    'chainId': self.chain_id,
+                    'maxPriorityFeePerGas': priority_fee,
+                    'maxFeePerGas': int(self.base_fee * policy['base_fee_multiplier']) + priority_fee,
+                }
+            # Legacy transactions are only replay-protected (EIP-155) when they carry the chain id
+            return {'chainId': self.chain_id, 'gasPrice': int(self.gas_price * policy['gas_price_multiplier'])}
+
+
+_oracles = {}
+_oracles_lock = threading.Lock()
+
+
+def get_fee_oracle(provider, chain):
+    """Return the running fee oracle for a chain, starting it on first use."""
+    with _oracles_lock:
+        oracle = _oracles.get(chain)
+        if oracle is None:
+            oracle = _oracles[chain] = FeeOracle(provider, chain).start()
+        return oracle
+
+
+def on_new_head(chain, header):
+    """Head listener forwarding pushed block heads to the oracle of that chain."""
+    oracle = _oracles.get(chain)
+    if oracle is not None:
+        oracle.on_new_head(chain, header)
@@ -0,0 +1,100 @@
+# utils/journal.py
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'trades.jsonl')
+
+
+class TradeJournal:
+    """Append-only JSONL record of what the bot detected, decided and sent.
+
+    `record` only appends to an in-memory buffer; a background thread writes
+    the buffer out every `flush_interval` seconds (sooner once `buffer_size`
+    entries are waiting) and rotates the file to `<path>.1 .. <path>.<backups>`
+    once it would grow past `max_bytes`.
+    """
+
+    def __init__(self, path=JOURNAL_PATH, max_bytes=64 * 2**20, backups=5, flush_interval=1.0, buffer_size=1000):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.buffer_size = buffer_size
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._size = None
+        self._thread = None
+        self._closed = False
+
+    def record(self, event, **fields):
+        """Queue one journal entry; `ts` (Unix time) and `event` are added to `fields`."""
+        entry = {'ts': time.time(), 'event': event}
+        entry.update(fields)
+        with self._lock:
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.buffer_size
+            if self._thread is None and not self._closed:
+                self._start()
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """Write out everything buffered so far; returns the number of entries written."""
+        with self._lock:
+            entries, self._buffer = self._buffer, []
+        if not entries:
+            return 0
+        data = ''.join(json.dumps(entry, default=str, separators=(',', ':')) + '\n' for entry in entries).encode()
+        with self._write_lock:
+            if self._size is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            if self._size and self._size + len(data) > self.max_bytes:
+                self._rotate()
+            with open(self.path, 'ab') as f:
+                f.write(data)
+            self._size += len(data)
+        return len(entries)
+
+    def close(self):
+        """Stop the writer thread and flush what is left."""
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _rotate(self):
+        if self.backups:
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._size = 0
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name='trade-journal', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error("Failed to write the trade journal %s: %s", self.path, e)
+
+
+# Process-wide journal; the writer thread starts with the first entry
+trade_journal = TradeJournal()
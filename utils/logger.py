@@ -1,35 +1,58 @@
 # utils/logger.py
+import atexit
 import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
-def setup_logger():
-    # Directory for log files
-    log_dir = 'logs'
-    os.makedirs(log_dir, exist_ok=True)
-    
-    # Get the root logger and configure it
+_listener = None
+
+def setup_logger(log_dir='logs', level=logging.INFO):
+    """Send the root logger's records through a queue; a listener thread writes them to the log file and console.
+
+    Logging calls on the hot path then cost a queue put instead of disk and
+    terminal writes. Safe to call more than once.
+    """
+    global _listener
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    logger.setLevel(level)
+
+    if _listener is None:
+        # Directory for log files
+        os.makedirs(log_dir, exist_ok=True)
 
-    # Avoid adding handlers multiple times if logger is reconfigured
-    if not logger.handlers:
         # File handler for logging to a file
         file_handler = logging.FileHandler(os.path.join(log_dir, 'sniper_bot.log'))
-        file_handler.setLevel(logging.INFO)
+        file_handler.setLevel(level)
 
         # Console handler for logging to the terminal
         console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
+        console_handler.setLevel(level)
 
-        # Formatter to apply to both handlers
+        # Formatter to apply to both handlers; it runs on the listener thread
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
 
-        # Adding handlers to the logger
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Replace any handlers installed before setup (e.g. by a library's basicConfig)
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(QueueHandler(log_queue))
+        _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logger)
 
     logger.info("Logger initialized.")
+    return logger
+
+def stop_logger():
+    """Flush the queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
 
 # Call this function in your main script to set up logging.
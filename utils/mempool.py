@@ -0,0 +1,138 @@
+# utils/mempool.py
+import asyncio
+import json
+import logging
+from typing import NamedTuple
+import websockets
+from config import ROUTER_ADDRESSES, WRAPPED_NATIVE
+
+ROUTER_DEXES = {'ETH': 'Uniswap', 'BSC': 'PancakeSwap'}
+
+
+class PendingLiquidity(NamedTuple):
+    """A pending addLiquidity/addLiquidityETH router call: the pool it will seed before it is mined."""
+    chain: str
+    dex: str
+    tx_hash: str
+    sender: str
+    token: str
+    paired_token: str
+    token_amount: int  # Expected token reserve if the call opens the pool
+    paired_amount: int  # Expected reserve of the other side (native coin for addLiquidityETH)
+
+
+def _word(data, index):
+    return data[10 + 64 * index:74 + 64 * index]
+
+
+def _decode_add_liquidity_eth(tx, data, chain, dex):
+    # addLiquidityETH(address token, uint amountTokenDesired, uint amountTokenMin, uint amountETHMin, address to, uint deadline)
+    return PendingLiquidity(chain, dex, tx['hash'], tx['from'], '0x' + _word(data, 0)[24:],
+                            WRAPPED_NATIVE[chain].lower(), int(_word(data, 1), 16), int(tx['value'], 16))
+
+
+def _decode_add_liquidity(tx, data, chain, dex):
+    # addLiquidity(address tokenA, address tokenB, uint amountADesired, uint amountBDesired, ...)
+    token_a, token_b = '0x' + _word(data, 0)[24:], '0x' + _word(data, 1)[24:]
+    amount_a, amount_b = int(_word(data, 2), 16), int(_word(data, 3), 16)
+    if token_a == WRAPPED_NATIVE[chain].lower():
+        token_a, token_b, amount_a, amount_b = token_b, token_a, amount_b, amount_a
+    return PendingLiquidity(chain, dex, tx['hash'], tx['from'], token_a, token_b, amount_a, amount_b)
+
+
+# Selector table keyed by the 0x-prefixed selector as it appears at the head of the input hex
+SELECTORS = {
+    '0xf305d719': (_decode_add_liquidity_eth, 6),  # addLiquidityETH
+    '0xe8e33700': (_decode_add_liquidity, 8),  # addLiquidity
+}
+
+
+def decode_pending(tx, routers):
+    """Decode a pending transaction into a PendingLiquidity, or None if it is not a router liquidity add.
+
+    `routers` maps lowercase router addresses to (chain, dex). Everything else in a
+    full pending feed is rejected by the first dict lookup.
+    """
+    target = routers.get((tx.get('to') or '').lower())
+    if target is None:
+        return None
+    data = tx.get('input') or tx.get('data') or ''
+    decoder = SELECTORS.get(data[:10])
+    if decoder is None or len(data) < 10 + 64 * decoder[1]:
+        return None
+    return decoder[0](tx, data.lower(), *target)
+
+
+class MempoolMonitor:
+    """Watch the pending transaction feed of each chain for liquidity being added through the DEX routers.
+
+    Needs a node that streams full pending transactions over WebSocket
+    (`eth_subscribe newPendingTransactions true`); a feed of bare hashes is
+    resolved with eth_getTransactionByHash on the same socket.
+    """
+
+    def __init__(self, ws_urls, routers=ROUTER_ADDRESSES, max_failures=5):
+        self.ws_urls = {chain: url for chain, url in ws_urls.items() if url}
+        self.routers = {address.lower(): (chain, ROUTER_DEXES.get(chain, chain)) for chain, address in routers.items()}
+        self.max_failures = max_failures
+        self.decoded = 0
+
+    async def stream(self):
+        """Yield PendingLiquidity candidates from every configured chain as one async stream."""
+        queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._watch(chain, url, queue)) for chain, url in self.ws_urls.items()]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _watch(self, chain, url, queue):
+        """Keep a pending-transaction subscription open, reconnecting with backoff."""
+        failures = 0
+        while failures < self.max_failures:
+            try:
+                await self._subscribe(chain, url, queue)
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                logging.error("Pending transaction feed on %s dropped (%d/%d): %s", chain, failures, self.max_failures,
+                              e)
+                await asyncio.sleep(min(2 ** failures, 30))
+        logging.error("Giving up on the pending transaction feed of %s.", chain)
+
+    async def _subscribe(self, chain, url, queue):
+        async with websockets.connect(url, max_size=None, ping_interval=20) as ws:
+            await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe",
+                                      "params": ["newPendingTransactions", True]}))
+            lookups = {}
+            next_id = 2
+            logging.info("Watching pending router transactions on %s.", chain)
+
+            async for message in ws:
+                message = json.loads(message)
+                if 'params' in message:
+                    tx = message['params']['result']
+                    if isinstance(tx, str):  # Hash-only feed: fetch the body
+                        lookups[next_id] = tx
+                        await ws.send(json.dumps({"jsonrpc": "2.0", "id": next_id,
+                                                  "method": "eth_getTransactionByHash", "params": [tx]}))
+                        next_id += 1
+                        continue
+                elif lookups.pop(message.get('id'), None) is not None:
+                    tx = message.get('result')
+                    if not tx:
+                        continue
+                elif 'error' in message:
+                    raise ConnectionError(f"eth_subscribe newPendingTransactions failed: {message['error']}")
+                else:
+                    continue
+
+                candidate = decode_pending(tx, self.routers)
+                if candidate is not None:
+                    self.decoded += 1
+                    await queue.put(candidate)
@@ -0,0 +1,218 @@
+# utils/metrics.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Stages a candidate passes through, in order. Each stamp is observed as the time since
+# the candidate's previous stamp, so e.g. 'analysis_start' measures the queueing delay
+# between the log arriving and analysis picking the token up.
+STAGES = ('block', 'log_received', 'analysis_start', 'analysis_end', 'signed', 'broadcast', 'receipt')
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+class Histogram:
+    """HDR-style log-linear histogram of millisecond latencies.
+
+    Values are kept in microseconds: exact below 2**sub_bucket_bits, and above
+    that in buckets 1 / 2**(sub_bucket_bits - 1) wide relative to their value
+    (under 1.6% with the default 7 bits), so memory stays a few hundred counters
+    from microseconds to hours.
+    """
+
+    def __init__(self, sub_bucket_bits=7):
+        self.sub_bucket_bits = sub_bucket_bits
+        self._half = 1 << (sub_bucket_bits - 1)
+        self.counts = {}
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def _index(self, value):
+        shift = value.bit_length() - self.sub_bucket_bits
+        if shift <= 0:
+            return value
+        return shift * self._half + (value >> shift)
+
+    def _bounds(self, index):
+        if index < 2 * self._half:
+            return index, index + 1
+        shift = index // self._half - 1
+        mantissa = index - shift * self._half
+        return mantissa << shift, (mantissa + 1) << shift
+
+    def record(self, ms):
+        index = self._index(max(int(ms * 1000), 0))
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.sum += ms
+            self.max = max(self.max, ms)
+
+    def percentile(self, q):
+        """Latency in ms at quantile `q` (0..1), to within the bucket resolution; 0 when empty."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(q * self.count, 1)
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= rank:
+                    low, high = self._bounds(index)
+                    return min((low + high - 1) / 2000, self.max)
+        return self.max
+
+
+class Metrics:
+    """Per-candidate stage timestamps and per-(stage, chain) latency histograms.
+
+    Call `stamp` as a token passes each stage, `observe`/`timer` for plain
+    durations, and `track_receipt` after broadcasting; head listeners feed
+    `on_new_head`, which supplies block timestamps and polls pending receipts.
+    """
+
+    def __init__(self, max_traces=10000, receipt_timeout_blocks=50, max_pending=1000):
+        self.histograms = {}
+        self.max_traces = max_traces
+        self.receipt_timeout_blocks = receipt_timeout_blocks
+        self.max_pending = max_pending
+        self._traces = OrderedDict()
+        self._block_times = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._receipt_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='metrics-receipts')
+
+    def histogram(self, stage, chain):
+        key = (stage, chain or 'unknown')
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms.setdefault(key, Histogram())
+        return histogram
+
+    def observe(self, stage, chain, ms):
+        self.histogram(stage, chain).record(ms)
+
+    @contextmanager
+    def timer(self, stage, chain):
+        """Observe the duration of the `with` block under `stage`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, chain, (time.perf_counter() - start) * 1000)
+
+    def stamp(self, token, stage, chain=None, at=None, block_number=None):
+        """Record that `token` reached `stage` (now, or at Unix time `at`) and observe the time since its last stage.
+
+        The first stamp of a token starts its trace; when `block_number` is given
+        and that block's header was seen, the trace starts at the block timestamp.
+        """
+        at = time.time() if at is None else at
+        key = token.lower()
+        with self._lock:
+            trace = self._traces.get(key)
+            if trace is None:
+                trace = self._traces[key] = {}
+                if len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+                block_time = self._block_times.get((chain, block_number))
+                if block_time is not None:
+                    trace['block'] = block_time
+            previous = max(trace.values()) if trace else None
+            first = min(trace.values()) if trace else None
+            trace[stage] = at
+        if previous is not None:
+            self.observe(stage, chain, max(at - previous, 0) * 1000)
+        if stage == 'receipt' and first is not None:
+            self.observe('total', chain, max(at - first, 0) * 1000)
+
+    def trace(self, token):
+        """Stage -> Unix timestamp of a token's trace."""
+        with self._lock:
+            return dict(self._traces.get(token.lower(), {}))
+
+    def track_receipt(self, provider, chain, token, tx_hash):
+        """Stamp `token`'s 'receipt' stage once `tx_hash` is found mined on a later head."""
+        with self._lock:
+            self._pending[tx_hash] = (provider, chain, token, None)
+            while len(self._pending) > self.max_pending:
+                dropped = next(iter(self._pending))  # Oldest first; e.g. a chain whose heads stopped arriving
+                del self._pending[dropped]
+                logging.warning("Too many unconfirmed transactions tracked; no longer tracking %s.", dropped)
+
+    def on_new_head(self, chain, header):
+        """Head listener: remember the block timestamp and look for pending receipts."""
+        number = int(header['number'], 16)
+        with self._lock:
+            self._block_times[(chain, number)] = int(header['timestamp'], 16)
+            if len(self._block_times) > 4096:
+                for key in sorted(self._block_times, key=lambda k: k[1])[:1024]:
+                    del self._block_times[key]
+            pending = [(tx_hash, entry) for tx_hash, entry in self._pending.items() if entry[1] == chain]
+            for tx_hash, (provider, _, token, since) in pending:
+                if since is None:
+                    self._pending[tx_hash] = (provider, chain, token, number)
+        if pending:
+            self._receipt_executor.submit(self._check_receipts, chain, number, pending)
+
+    def _check_receipts(self, chain, head, pending):
+        for tx_hash, (provider, _, token, since) in pending:
+            try:
+                receipt = provider.provider.make_request('eth_getTransactionReceipt', [tx_hash]).get('result')
+            except Exception as e:
+                logging.debug("Receipt lookup of %s on %s failed: %s", tx_hash, chain, e)
+                continue
+            if receipt:
+                with self._lock:
+                    self._pending.pop(tx_hash, None)
+                self.stamp(token, 'receipt', chain)
+            elif since is not None and head - since > self.receipt_timeout_blocks:
+                with self._lock:
+                    self._pending.pop(tx_hash, None)
+                logging.warning("No receipt for %s on %s after %d blocks; no longer tracking it.",
+                                tx_hash, chain, self.receipt_timeout_blocks)
+
+    def render(self):
+        """The histograms in Prometheus text exposition format, as summaries."""
+        lines = ['# HELP sniper_stage_latency_ms Time from the previous stage of a candidate (or of an operation) in ms.',
+                 '# TYPE sniper_stage_latency_ms summary']
+        for (stage, chain), histogram in sorted(self.histograms.items()):
+            labels = f'stage="{stage}",chain="{chain}"'
+            for q in QUANTILES:
+                lines.append(f'sniper_stage_latency_ms{{{labels},quantile="{q}"}} {histogram.percentile(q):.3f}')
+            lines.append(f'sniper_stage_latency_ms_sum{{{labels}}} {histogram.sum:.3f}')
+            lines.append(f'sniper_stage_latency_ms_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep scrapes out of the bot's log
+
+
+def start_metrics_server(port, host='127.0.0.1'):
+    """Serve `metrics` at http://host:port/metrics from a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logging.info("Serving latency metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
+
+
+# Process-wide metrics registry
+metrics = Metrics()
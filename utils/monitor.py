@@ -1,113 +1,390 @@
 # utils/monitor.py
+import asyncio
 import logging
-import time
 import requests
-from web3 import Web3
 import os
-from dotenv import load_dotenv
 import json
+import threading
+import time
+import websockets
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+from config import WRAPPED_NATIVE
+from utils.abi_registry import get_abi
+from utils.metrics import metrics
+from utils.providers import get_web3
+from utils.reserves import get_reserve_index
+
+# keccak256("PairCreated(address,address,address,uint256)")
+PAIR_CREATED_TOPIC = "0x0d3648bd0f6ba80134a33ba9275ac585d9d315f0ad8355cddefde31afa28d0e9"
+
+# Recently delivered pairs remembered to drop live/backfill duplicates; older repeats are left to the token registry
+MAX_SEEN_PAIRS = 10000
+
+CHECKPOINT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'checkpoints.json')
+
+
+class NewPair(NamedTuple):
+    """A decoded PairCreated event."""
+    dex: str
+    chain: str
+    token0: str
+    token1: str
+    pair: str
+    block_number: int
+
+    @property
+    def token(self):
+        """The newly listed token, i.e. the side that is not the wrapped native coin; None if neither side is."""
+        wrapped_native = WRAPPED_NATIVE.get(self.chain, '').lower()
+        if self.token0.lower() == wrapped_native:
+            return self.token1
+        if self.token1.lower() == wrapped_native:
+            return self.token0
+        return None
+
+
+def decode_pair_created(log, dex, chain):
+    """Decode a raw JSON-RPC PairCreated log straight from its hex topics and data.
+
+    token0/token1 are the indexed topics and pair is the first data word, so the
+    addresses are sliced out directly; they come back lowercase, not checksummed.
+    """
+    topics = log['topics']
+    return NewPair(dex, chain, '0x' + topics[1][26:], '0x' + topics[2][26:], '0x' + log['data'][26:66],
+                   int(log['blockNumber'], 16))
+
+
+def get_logs_chunked(provider, log_filter, from_block, to_block, chunk_size=2000, executor=None):
+    """Fetch logs over a block range as parallel eth_getLogs calls of at most `chunk_size` blocks.
 
-# Load environment variables from .env file
-load_dotenv()
+    A range the provider refuses (too many results, range too wide) is split in
+    half and retried. The logs come back merged in (block, log index) order.
+    """
+    ranges = [(start, min(start + chunk_size - 1, to_block)) for start in range(from_block, to_block + 1, chunk_size)]
+
+    def fetch(block_range):
+        start, end = block_range
+        response = provider.make_request('eth_getLogs', [dict(log_filter, fromBlock=hex(start), toBlock=hex(end))])
+        if 'error' not in response:
+            return response['result']
+        if start == end:
+            raise ValueError(f"eth_getLogs failed: {response['error']}")
+        middle = (start + end) // 2
+        return fetch((start, middle)) + fetch((middle + 1, end))
+
+    if executor is None or len(ranges) == 1:
+        chunks = map(fetch, ranges)
+    else:
+        chunks = executor.map(fetch, ranges)
+    logs = [log for chunk in chunks for log in chunk]
+    logs.sort(key=lambda log: (int(log['blockNumber'], 16), int(log['logIndex'], 16)))
+    return logs
 
-# Set up logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[logging.StreamHandler()]
-)
 
 class Monitoring:
-    def __init__(self, eth_url, bsc_url, uniswap_address, pancakeswap_address, etherscan_api_key, bscscan_api_key):
-        self.eth_web3 = Web3(Web3.HTTPProvider(eth_url))
-        self.bsc_web3 = Web3(Web3.HTTPProvider(bsc_url))
+    def __init__(self, eth_url, bsc_url, uniswap_address, pancakeswap_address, etherscan_api_key, bscscan_api_key,
+                 poll_interval=2, eth_ws_url=None, bsc_ws_url=None, ws_max_failures=3, ws_fallback_period=60,
+                 checkpoint_path=CHECKPOINT_PATH, backfill_chunk=2000, backfill_workers=8, max_backfill_blocks=100000,
+                 chains=('ETH', 'BSC')):
+        # Clients are only created for the chains being monitored
+        self.eth_web3 = get_web3('ETH', eth_url) if 'ETH' in chains else None
+        self.bsc_web3 = get_web3('BSC', bsc_url) if 'BSC' in chains else None
         self.uniswap_address = uniswap_address
         self.pancakeswap_address = pancakeswap_address
         self.etherscan_api_key = etherscan_api_key
         self.bscscan_api_key = bscscan_api_key
+        self.poll_interval = poll_interval
+        self.ws_max_failures = ws_max_failures
+        self.ws_fallback_period = ws_fallback_period
+        self.checkpoint_path = checkpoint_path
+        self.backfill_chunk = backfill_chunk
+        self.max_backfill_blocks = max_backfill_blocks
+
+        # Every factory is watched independently so one chain can never starve another
+        self.factories = [
+            {'dex': 'Uniswap', 'chain': 'ETH', 'network': 'ethereum',
+             'web3': self.eth_web3, 'address': uniswap_address, 'ws_url': eth_ws_url},
+            {'dex': 'PancakeSwap', 'chain': 'BSC', 'network': 'bsc',
+             'web3': self.bsc_web3, 'address': pancakeswap_address, 'ws_url': bsc_ws_url},
+        ]
+        self.factories = [factory for factory in self.factories if factory['chain'] in chains]
+        self.latest_heads = {}
+        self._head_listeners = []
+        self._next_block = {}
+        self._seen_pairs = OrderedDict()
+        self._executor = ThreadPoolExecutor(max_workers=len(self.factories), thread_name_prefix='monitor')
+        self._backfill_executor = ThreadPoolExecutor(max_workers=backfill_workers, thread_name_prefix='backfill')
+
+        # Last processed block per chain, so pairs created while the bot was down are caught up
+        self.checkpoints = self._load_checkpoints()
+        self._checkpoint_lock = threading.Lock()
+        self._checkpoint_saved_at = 0
+        for factory in self.factories:
+            if factory['chain'] in self.checkpoints:
+                self._next_block[factory['dex']] = self.checkpoints[factory['chain']] + 1
 
-        # Check connection to both networks
+        # Reserves of every pair seen are followed from its Sync logs
+        self.reserves = {}
+        for factory in self.factories:
+            index = self.reserves[factory['chain']] = get_reserve_index(factory['chain']).start(factory['web3'])
+            self.add_head_listener(index.on_new_head)
+
+        # Check connection to every monitored network
         self.check_connection()
 
     def check_connection(self):
-        if not self.eth_web3.is_connected():
-            logging.error("Failed to connect to Ethereum. Please check the ETH node URL.")
-        else:
-            logging.info("Successfully connected to Ethereum!")
-
-        if not self.bsc_web3.is_connected():
-            logging.error("Failed to connect to Binance Smart Chain. Please check the BSC node URL.")
-        else:
-            logging.info("Successfully connected to Binance Smart Chain!")
+        for factory in self.factories:
+            if not factory['web3'].is_connected():
+                logging.error("Failed to connect to %s. Please check the %s node URL.", factory['network'], factory['chain'])
+            else:
+                logging.info("Successfully connected to %s!", factory['network'])
 
     def monitor_new_tokens(self):
+        """Poll every factory once, concurrently, and return the newly listed token addresses."""
+        return [pair.token for pair in self.poll_new_pairs()]
+
+    def poll_new_pairs(self):
+        """Poll every factory once, concurrently, and return the decoded new pairs."""
+        futures = [self._executor.submit(self.poll_factory, factory) for factory in self.factories]
+        new_pairs = []
+        for factory, future in zip(self.factories, futures):
+            try:
+                new_pairs.extend(future.result())
+            except Exception as e:
+                logging.error("Error while fetching new events from %s: %s", factory['dex'], e)
+        return new_pairs
+
+    async def stream_new_pairs(self):
+        """Watch every factory concurrently and yield new pairs as a single async stream."""
         logging.info("Starting to monitor Uniswap (Ethereum) and PancakeSwap (BSC)...")
+        queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._watch_factory(factory, queue)) for factory in self.factories]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Fetch ABIs for Uniswap and PancakeSwap
-        uniswap_abi = self.get_abi(self.uniswap_address, network='ethereum')
-        pancakeswap_abi = self.get_abi(self.pancakeswap_address, network='bsc')
+    def add_head_listener(self, callback):
+        """Register a callback(chain, header) invoked for every new block head, pushed over WebSocket or polled."""
+        self._head_listeners.append(callback)
 
-        # Subscribe to PairCreated events
-        if uniswap_abi:
-            self.subscribe_to_event(uniswap_abi, self.uniswap_address, self.eth_web3, 'Uniswap')
+    async def _watch_factory(self, factory, queue):
+        """Watch a single factory forever, pushing decoded pairs onto the shared queue."""
+        if not factory['ws_url']:
+            await self._poll_factory_forever(factory, queue)
+            return
 
-        if pancakeswap_abi:
-            self.subscribe_to_event(pancakeswap_abi, self.pancakeswap_address, self.bsc_web3, 'PancakeSwap')
+        failures = 0
+        while True:
+            try:
+                await self._subscribe_factory(factory, queue)
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                logging.error("WebSocket subscription for %s dropped (%d/%d): %s", factory['dex'], failures,
+                              self.ws_max_failures, e)
 
-    def get_abi(self, contract_address, network):
-        if network == 'ethereum':
-            url = f"https://api.etherscan.io/api?module=contract&action=getabi&address={contract_address}&apikey={self.etherscan_api_key}"
-        elif network == 'bsc':
-            url = f"https://api.bscscan.com/api?module=contract&action=getabi&address={contract_address}&apikey={self.bscscan_api_key}"
-        else:
-            logging.error(f"Unsupported network: {network}")
-            return None
+            if failures >= self.ws_max_failures:
+                logging.warning("Falling back to polling %s for %ss.", factory['dex'], self.ws_fallback_period)
+                try:
+                    await asyncio.wait_for(self._poll_factory_forever(factory, queue), self.ws_fallback_period)
+                except asyncio.TimeoutError:
+                    pass
+                failures = 0
+            else:
+                await asyncio.sleep(min(2 ** failures, 30))
+
+    async def _poll_factory_forever(self, factory, queue):
+        """Poll a single factory over HTTP, pushing decoded pairs onto the shared queue."""
+        while True:
+            try:
+                new_pairs = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, self.poll_factory, factory)
+                for pair in new_pairs:
+                    await queue.put(pair)
+                await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error("Error while fetching new events from %s: %s", factory['dex'], e)
+                await asyncio.sleep(self.poll_interval * 5)
+
+    async def _subscribe_factory(self, factory, queue):
+        """Push-based watcher: eth_subscribe to PairCreated logs and new heads, returns when the socket closes."""
+        async with websockets.connect(factory['ws_url'], max_size=None, ping_interval=20) as ws:
+            early = []  # Notifications that arrive before both subscription ids are known
+            logs_id = await self._eth_subscribe(ws, 1, ["logs", {"address": factory['address'],
+                                                                 "topics": [PAIR_CREATED_TOPIC]}], early)
+            heads_id = await self._eth_subscribe(ws, 2, ["newHeads"], early)
+            logging.info("Subscribed to PairCreated logs and new heads on %s over WebSocket.", factory['dex'])
+
+            async def dispatch(message):
+                params = message.get('params', {})
+                subscription, result = params.get('subscription'), params.get('result')
+                if subscription == logs_id:
+                    pair = self.process_event(result, factory['dex'], factory['chain'])
+                    if pair is not None:
+                        await queue.put(pair)
+                elif subscription == heads_id:
+                    self._on_new_head(factory['chain'], result)
+
+            # Catch up from the last seen block (or the head, on a first connect) to cover the time offline and
+            # before the subscription took effect; the socket buffers live messages meanwhile and overlaps are dropped
+            for pair in await asyncio.get_running_loop().run_in_executor(self._executor, self.poll_factory, factory):
+                await queue.put(pair)
+            for message in early:
+                await dispatch(message)
+            async for message in ws:
+                await dispatch(json.loads(message))
+
+    async def _eth_subscribe(self, ws, request_id, params, early):
+        """Send an eth_subscribe request and return its id; notifications that arrive first are kept in `early`."""
+        await ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "eth_subscribe", "params": params}))
+        while True:
+            response = json.loads(await ws.recv())
+            if response.get('method') == 'eth_subscription':
+                early.append(response)
+                continue
+            if response.get('id') != request_id:
+                continue
+            if 'error' in response:
+                raise ConnectionError(f"eth_subscribe {params[0]} failed: {response['error']}")
+            return response['result']
 
+    def _on_new_head(self, chain, header):
+        """Record the latest block number of a chain and notify head listeners."""
+        head = self.latest_heads[chain] = int(header['number'], 16)
+        # Logs of the head block may still be in flight, so only blocks before it count as processed
+        for factory in self.factories:
+            if factory['chain'] == chain:
+                self._next_block[factory['dex']] = head
+        self.record_checkpoint(chain, head - 1)
+        self._notify_head_listeners(chain, header)
+
+    def _notify_head_listeners(self, chain, header):
+        for callback in self._head_listeners:
+            try:
+                callback(chain, header)
+            except Exception as e:
+                logging.error("Head listener failed on %s: %s", chain, e)
+
+    def _poll_head(self, provider, chain, head):
+        """Polling mode: hand the header of a newly reached head to the head listeners."""
+        if head <= self.latest_heads.get(chain, -1):
+            return
+        self.latest_heads[chain] = head
         try:
-            response = requests.get(url)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            data = response.json()
+            header = provider.make_request('eth_getBlockByNumber', [hex(head), False]).get('result')
+        except Exception as e:
+            logging.debug("Could not fetch header %d on %s: %s", head, chain, e)
+            return
+        if header:
+            self._notify_head_listeners(chain, header)
 
-            if data.get('status') == '1':
-                return json.loads(data['result'])
-            else:
-                logging.error(f"Failed to fetch ABI for {contract_address} on {network}: {data.get('message')}")
-                return None
-        except requests.RequestException as e:
-            logging.error(f"Error while fetching ABI for {contract_address}: {e}")
-            return None
+    def poll_factory(self, factory):
+        """Fetch the PairCreated logs emitted by a factory since the previous poll or saved checkpoint.
+
+        The first poll without a checkpoint starts at the latest block; a larger gap
+        is backfilled in parallel chunks by get_logs_chunked.
+        """
+        # One endpoint serves the head and its logs, so a lagging node cannot report a mined range as empty
+        provider = factory['web3'].provider
+        provider = provider.pinned() if hasattr(provider, 'pinned') else provider
+        head = int(provider.make_request('eth_blockNumber', [])['result'], 16)
+        from_block = self._next_block.get(factory['dex'], head)
+        if from_block > head:
+            return []
+        if head - from_block >= self.max_backfill_blocks:
+            logging.warning("%s is %d blocks behind; backfilling only the last %d.", factory['dex'], head - from_block,
+                            self.max_backfill_blocks)
+            from_block = head - self.max_backfill_blocks + 1
+        if head - from_block >= self.backfill_chunk:
+            logging.info("Backfilling %s blocks %s-%s...", factory['dex'], from_block, head)
 
-    def subscribe_to_event(self, abi, contract_address, web3_instance, dex_name):
+        logs = get_logs_chunked(provider, {'address': factory['address'], 'topics': [PAIR_CREATED_TOPIC]},
+                                from_block, head, self.backfill_chunk, self._backfill_executor)
+        self._next_block[factory['dex']] = head + 1
+        self._poll_head(provider, factory['chain'], head)
+
+        new_pairs = []
+        for log in logs:
+            pair = self.process_event(log, factory['dex'], factory['chain'])
+            if pair is not None:
+                new_pairs.append(pair)
+        self.record_checkpoint(factory['chain'], head)
+        return new_pairs
+
+    def _load_checkpoints(self):
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
         try:
-            contract = web3_instance.eth.contract(address=contract_address, abi=abi)
-            pair_created_event = contract.events.PairCreated.create_filter(fromBlock='latest')
+            with open(self.checkpoint_path) as f:
+                return {chain: int(block) for chain, block in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            logging.warning("Ignoring unreadable checkpoint file %s: %s", self.checkpoint_path, e)
+            return {}
 
-            logging.info(f"Subscribed to PairCreated event on {dex_name}. Monitoring for new pairs...")
+    def record_checkpoint(self, chain, block_number, min_interval=5):
+        """Remember that every block of a chain up to `block_number` was processed; saved at most every few seconds."""
+        with self._checkpoint_lock:
+            if block_number <= self.checkpoints.get(chain, -1):
+                return
+            self.checkpoints[chain] = block_number
+            if not self.checkpoint_path or time.monotonic() - self._checkpoint_saved_at < min_interval:
+                return
+            self._checkpoint_saved_at = time.monotonic()
+            try:
+                os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+                tmp_path = self.checkpoint_path + '.tmp'
+                with open(tmp_path, 'w') as f:
+                    json.dump(self.checkpoints, f)
+                os.replace(tmp_path, self.checkpoint_path)
+            except OSError as e:
+                logging.warning("Failed to save checkpoints to %s: %s", self.checkpoint_path, e)
 
-            # Continuously poll for new events
-            while True:
-                try:
-                    new_events = pair_created_event.get_new_entries()
-                    for event in new_events:
-                        self.process_event(event, dex_name)
-                    time.sleep(5)  # Adjust the sleep duration if necessary
-                except Exception as poll_error:
-                    logging.error(f"Error while fetching new events from {dex_name}: {poll_error}")
-                    time.sleep(10)  # Retry after delay if error occurs
-        except Exception as e:
-            logging.error(f"Failed to set up subscription for {dex_name}: {e}")
+    def get_abi(self, contract_address, network):
+        api_key = self.etherscan_api_key if network == 'ethereum' else self.bscscan_api_key
+        try:
+            return get_abi(network, contract_address, api_key)
+        except (requests.RequestException, ValueError) as e:
+            logging.error("Failed to fetch ABI for %s on %s: %s", contract_address, network, e)
+            return None
 
-    def process_event(self, event, dex_name):
+    def process_event(self, event, dex_name, chain=None):
+        """Turn a raw PairCreated log (or a web3-decoded event) into a NewPair."""
         try:
-            args = event.get('args', {})
-            token0 = args.get('token0')
-            token1 = args.get('token1')
-            pair_address = args.get('pair')
-            logging.info(
-                f"[{dex_name}] New Pair Created: Token0: {token0}, Token1: {token1}, Pair Address: {pair_address}"
-            )
+            if 'args' in event:
+                args = event['args']
+                pair = NewPair(dex_name, chain, args['token0'], args['token1'], args['pair'], event.get('blockNumber'))
+            elif event.get('removed'):
+                return None  # Reorged out; the replacement log arrives separately
+            else:
+                pair = decode_pair_created(event, dex_name, chain)
+            if pair.token is None:
+                logging.debug("[%s] Skipping pair %s: neither %s nor %s is the wrapped native coin.",
+                              dex_name, pair.pair, pair.token0, pair.token1)
+                return None  # Only native pairs can be bought and priced
+            if pair.pair.lower() in self._seen_pairs:
+                return None  # Already delivered by the live stream or an overlapping backfill
+            self._seen_pairs[pair.pair.lower()] = None
+            if len(self._seen_pairs) > MAX_SEEN_PAIRS:
+                self._seen_pairs.popitem(last=False)
+            metrics.stamp(pair.token, 'log_received', pair.chain, block_number=pair.block_number)
+            if pair.chain in self.reserves and pair.block_number is not None:
+                self.reserves[pair.chain].track(pair.pair, pair.token0, pair.token1, pair.block_number)
+            logging.info("[%s] New Pair Created: Token0: %s, Token1: %s, Pair Address: %s",
+                         dex_name, pair.token0, pair.token1, pair.pair)
+            return pair
         except Exception as e:
-            logging.error(f"Failed to process event from {dex_name}: {e}")
+            logging.error("Failed to process event from %s: %s", dex_name, e)
+            return None
 
 if __name__ == "__main__":
     eth_url = f"https://mainnet.infura.io/v3/{os.getenv('INFURA_PROJECT_ID')}"
@@ -116,6 +393,8 @@ if __name__ == "__main__":
     pancakeswap_address = "0xcA143Ce32Fe78f1f7019d7d551a6402fC5350c73"  # PancakeSwap V2 Factory
     etherscan_api_key = os.getenv('ETHERSCAN_API_KEY')
     bscscan_api_key = os.getenv('BSCSCAN_API_KEY')
+    eth_ws_url = os.getenv('ETH_WS_URL')  # e.g. ws://127.0.0.1:8545 for a local anvil/hardhat node
+    bsc_ws_url = os.getenv('BSC_WS_URL')
 
     monitor = Monitoring(
         eth_url=eth_url,
@@ -123,6 +402,13 @@ if __name__ == "__main__":
         uniswap_address=uniswap_address,
         pancakeswap_address=pancakeswap_address,
         etherscan_api_key=etherscan_api_key,
-        bscscan_api_key=bscscan_api_key
+        bscscan_api_key=bscscan_api_key,
+        eth_ws_url=eth_ws_url,
+        bsc_ws_url=bsc_ws_url
     )
-    monitor.monitor_new_tokens()  # Call the method directly
+
+    async def watch():
+        async for pair in monitor.stream_new_pairs():
+            logging.info("[%s] New token listed: %s (pair %s)", pair.chain, pair.token, pair.pair)
+
+    asyncio.run(watch())
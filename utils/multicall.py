@@ -0,0 +1,67 @@
+# utils/multicall.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from eth_abi import decode, encode
+from web3 import Web3
+
+# Multicall3 is deployed at the same address on Ethereum, BSC and most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3 = bytes.fromhex("82ad56cb")  # aggregate3((address,bool,bytes)[])
+
+# View-function selectors used by the batched readers
+DECIMALS = bytes.fromhex("313ce567")
+TOTAL_SUPPLY = bytes.fromhex("18160ddd")
+BALANCE_OF = bytes.fromhex("70a08231")
+OWNER = bytes.fromhex("8da5cb5b")
+TOKEN0 = bytes.fromhex("0dfe1681")
+TOKEN1 = bytes.fromhex("d21220a7")
+GET_RESERVES = bytes.fromhex("0902f1ac")
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='multicall')
+
+
+def with_address(selector, address):
+    """Calldata for a single-address-argument call such as balanceOf(address)."""
+    return selector + bytes(12) + bytes.fromhex(address[2:])
+
+
+def to_uint(result):
+    """Decode the first word of a successful call as an unsigned integer, or None."""
+    success, data = result
+    return int.from_bytes(data[:32], 'big') if success and len(data) >= 32 else None
+
+
+def to_address(result):
+    """Decode the first word of a successful call as a lowercase address, or None."""
+    success, data = result
+    return '0x' + data[12:32].hex() if success and len(data) >= 32 else None
+
+
+def _aggregate3(provider, calls, block):
+    calldata = AGGREGATE3 + encode(['(address,bool,bytes)[]'],
+                                   [[(Web3.to_checksum_address(target), True, data) for target, data in calls]])
+    response = provider.provider.make_request('eth_call', [{'to': MULTICALL3_ADDRESS, 'data': Web3.to_hex(calldata)},
+                                                           block])
+    if 'error' in response:
+        raise ValueError(f"Multicall3 eth_call failed: {response['error']}")
+    return decode(['(bool,bytes)[]'], bytes.fromhex(response['result'][2:]))[0]
+
+
+def multicall(provider, calls, chunk_size=500, block='latest'):
+    """Run many (target, calldata) view calls through Multicall3 aggregate3.
+
+    Calls are packed into chunks of `chunk_size`, and the chunks are sent concurrently,
+    so any number of calls costs about one round trip. Individual calls may fail;
+    every result is a (success, return data) pair in the order of `calls`.
+    """
+    if not calls:
+        return []
+    chunks = [calls[i:i + chunk_size] for i in range(0, len(calls), chunk_size)]
+    if len(chunks) == 1:
+        return list(_aggregate3(provider, chunks[0], block))
+
+    logging.debug("Multicall of %d calls split into %d chunks", len(calls), len(chunks))
+    results = []
+    for chunk_results in _executor.map(lambda chunk: _aggregate3(provider, chunk, block), chunks):
+        results.extend(chunk_results)
+    return results
@@ -0,0 +1,99 @@
+# utils/nonce.py
+import asyncio
+import logging
+import threading
+
+# Node error messages meaning our local nonce view has drifted from the chain
+NONCE_ERRORS = (
+    "nonce too low",
+    "replacement transaction underpriced",
+    "replacement underpriced",
+)
+
+
+def is_nonce_error(error):
+    """Return True if a send failure was caused by a stale or reused nonce."""
+    message = str(error).lower()
+    return any(text in message for text in NONCE_ERRORS)
+
+
+class NonceManager:
+    """Hands out nonces locally for each (chain, account).
+
+    The first allocation syncs with the node's pending transaction count; after
+    that nonces come from a local counter, so back-to-back sends neither wait on
+    an RPC round trip nor reuse a nonce. Safe to call from threads and from
+    coroutines, since the lock is never held across an await.
+    """
+
+    def __init__(self):
+        self._next = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def _key(chain, account):
+        return chain, account.lower()
+
+    def _lock_for(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def sync(self, provider, chain, account):
+        """(Re)load the next nonce from the node's pending transaction count."""
+        key = self._key(chain, account)
+        with self._lock_for(key):
+            self._next[key] = provider.eth.get_transaction_count(account, 'pending')
+            logging.info("Nonce for %s on %s synced to %s", account, chain, self._next[key])
+            return self._next[key]
+
+    def allocate(self, provider, chain, account):
+        """Reserve and return the next nonce, syncing with the node on first use."""
+        key = self._key(chain, account)
+        with self._lock_for(key):
+            if key not in self._next:
+                self._next[key] = provider.eth.get_transaction_count(account, 'pending')
+                logging.info("Nonce for %s on %s synced to %s", account, chain, self._next[key])
+            nonce = self._next[key]
+            self._next[key] = nonce + 1
+            return nonce
+
+    async def allocate_async(self, provider, chain, account):
+        """Coroutine flavour of allocate(); only the initial sync leaves the event loop."""
+        if self._key(chain, account) not in self._next:
+            await asyncio.to_thread(self.sync, provider, chain, account)
+        return self.allocate(provider, chain, account)
+
+    def peek(self, chain, account):
+        """Return the nonce the next allocation would hand out, or None before the first sync."""
+        return self._next.get(self._key(chain, account))
+
+    def release(self, chain, account, nonce):
+        """Give back a nonce whose transaction never reached the network.
+
+        The nonce is reused if it was the latest one handed out. Otherwise later
+        nonces are already in flight, so the account resyncs on its next allocation.
+        """
+        key = self._key(chain, account)
+        with self._lock_for(key):
+            if self._next.get(key) == nonce + 1:
+                self._next[key] = nonce
+            else:
+                self._next.pop(key, None)
+
+    def handle_error(self, provider, chain, account, error):
+        """Resync after a nonce-related send failure; returns True if the error was one."""
+        if not is_nonce_error(error):
+            return False
+        logging.warning("Nonce conflict for %s on %s (%s); resyncing with the node.", account, chain, error)
+        try:
+            self.sync(provider, chain, account)
+        except Exception as e:
+            logging.error("Nonce resync for %s on %s failed, retrying on next send: %s", account, chain, e)
+            with self._lock_for(self._key(chain, account)):
+                self._next.pop(self._key(chain, account), None)
+        return True
+
+
+# Process-wide allocator shared by every sender
+nonce_manager = NonceManager()
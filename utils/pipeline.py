@@ -0,0 +1,164 @@
+# utils/pipeline.py
+import asyncio
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# What a stage's queue does when it is full
+BLOCK = 'block'  # Backpressure: the upstream stage waits for room
+DROP_OLDEST = 'drop_oldest'  # Evict the longest-waiting item to make room
+DROP_NEWEST = 'drop_newest'  # Discard the incoming item
+PRIORITY = 'priority'  # Serve items by priority key (lowest first), waiting for room when full
+POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, PRIORITY)
+
+
+class StageQueue:
+    """Bounded asyncio queue with an overflow policy."""
+
+    def __init__(self, maxsize, policy=BLOCK, priority=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        if policy == PRIORITY and priority is None:
+            raise ValueError("The priority policy needs a priority key function.")
+        self.policy = policy
+        self.priority = priority
+        self.dropped = 0
+        self._queue = asyncio.PriorityQueue(maxsize) if policy == PRIORITY else asyncio.Queue(maxsize)
+        self._order = itertools.count()  # Keeps equal priorities first-in first-out
+
+    async def put(self, item):
+        """Enqueue an item according to the policy; returns False if an item was dropped."""
+        if self.policy == PRIORITY:
+            await self._queue.put((self.priority(item), next(self._order), item))
+            return True
+        if self.policy == BLOCK or not self._queue.full():
+            await self._queue.put(item)
+            return True
+
+        self.dropped += 1
+        if self.policy == DROP_NEWEST:
+            return False
+        self._queue.get_nowait()
+        self._queue.task_done()
+        self._queue.put_nowait(item)
+        return False
+
+    async def get(self):
+        item = await self._queue.get()
+        return item[2] if self.policy == PRIORITY else item
+
+    def task_done(self):
+        self._queue.task_done()
+
+    async def join(self):
+        await self._queue.join()
+
+    def qsize(self):
+        return self._queue.qsize()
+
+
+class Stage:
+    """One pipeline step: `handler(item)` run by `concurrency` workers fed from a bounded queue.
+
+    The handler may be a coroutine function or a plain (blocking) function, which
+    runs in a worker thread. Whatever it returns is passed on to the next stage;
+    returning None drops the item. An exception fails only the item at hand.
+    """
+
+    def __init__(self, name, handler, concurrency=1, maxsize=100, policy=BLOCK, priority=None, timeout=None):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.queue = StageQueue(maxsize, policy, priority)
+        self.processed = 0
+        self.failed = 0
+        self._is_async = asyncio.iscoroutinefunction(handler)
+
+    async def _handle(self, item):
+        call = self.handler(item) if self._is_async else asyncio.to_thread(self.handler, item)
+        return await asyncio.wait_for(call, self.timeout) if self.timeout else await call
+
+    async def _work(self, next_stage):
+        while True:
+            item = await self.queue.get()
+            try:
+                result = await self._handle(item)
+                self.processed += 1
+                if result is not None and next_stage is not None:
+                    if not await next_stage.queue.put(result):
+                        logging.warning("Pipeline stage %s is full; dropped an item (%s).",
+                                        next_stage.name, next_stage.queue.policy)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logging.error("Pipeline stage %s failed on %r: %s", self.name, item, e)
+            finally:
+                self.queue.task_done()
+
+
+class Pipeline:
+    """Chain of stages connected by bounded queues.
+
+    Items submitted to the first stage flow through every stage in order. Each
+    stage has its own worker count and queue policy, so a slow or failing item
+    only ever occupies one worker of one stage.
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self._workers = []
+        self._executor = None
+
+    async def start(self):
+        """Spawn every stage's workers."""
+        # Size the thread pool so blocking handlers get all the workers they were given
+        threads = sum(stage.concurrency for stage in self.stages if not stage._is_async)
+        if threads:
+            self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='pipeline')
+            asyncio.get_running_loop().set_default_executor(self._executor)
+        for i, stage in enumerate(self.stages):
+            next_stage = self.stages[i + 1] if i + 1 < len(self.stages) else None
+            for n in range(stage.concurrency):
+                self._workers.append(asyncio.create_task(stage._work(next_stage), name=f"{stage.name}-{n}"))
+
+    async def submit(self, item):
+        """Hand an item to the first stage."""
+        return await self.stages[0].queue.put(item)
+
+    async def run(self, source):
+        """Start the pipeline, feed it everything from an async iterable, then shut down cleanly."""
+        await self.start()
+        drain = True
+        try:
+            async for item in source:
+                await self.submit(item)
+        except asyncio.CancelledError:
+            drain = False  # Shutting down: do not wait for queued items
+            raise
+        finally:
+            await self.close(drain)
+
+    async def close(self, drain=True):
+        """Stop the workers, first letting queued items finish stage by stage when `drain` is set."""
+        try:
+            if drain:
+                for stage in self.stages:
+                    await stage.queue.join()
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            logging.info("Pipeline stopped: %s", ", ".join(
+                f"{name}(processed={s['processed']}, failed={s['failed']}, dropped={s['dropped']})"
+                for name, s in self.stats().items()))
+
+    def stats(self):
+        """Per-stage counters and queue depth."""
+        return {stage.name: {'processed': stage.processed, 'failed': stage.failed,
+                             'dropped': stage.queue.dropped, 'queued': stage.queue.qsize()}
+                for stage in self.stages}
@@ -0,0 +1,187 @@
+# utils/providers.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from web3.middleware import geth_poa_middleware
+from web3.providers.base import BaseProvider
+from config import RPC_URLS
+
+POA_CHAINS = {'BSC'}
+
+
+class Endpoint:
+    """One JSON-RPC endpoint with a persistent keep-alive session and its health figures."""
+
+    def __init__(self, url, pool_size=32):
+        self.url = url
+        session = requests.Session()
+        session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.provider = Web3.HTTPProvider(url, session=session, request_kwargs={'timeout': 10})
+        self.latency = None  # EWMA of probe round trips, in seconds
+        self.head = None
+        self.failures = 0
+        self.healthy = True
+
+    def record_success(self, latency, head=None):
+        self.latency = latency if self.latency is None else 0.7 * self.latency + 0.3 * latency
+        if head is not None:
+            self.head = head
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+
+
+class RpcPool:
+    """Process-wide pool of endpoints for one chain.
+
+    A background thread probes every endpoint's head block and latency; reads are
+    routed to the fastest endpoint that is no more than `max_lag` blocks behind the
+    best head, and endpoints that fail or fall behind are taken out until they recover.
+    """
+
+    def __init__(self, chain, urls=(), probe_interval=5, max_lag=2, max_failures=2):
+        self.chain = chain
+        self.probe_interval = probe_interval
+        self.max_lag = max_lag
+        self.max_failures = max_failures
+        self.endpoints = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._executor = None
+        self._executor_size = 0
+        for url in urls:
+            self.add_endpoint(url)
+
+    def add_endpoint(self, url):
+        """Add an endpoint unless it is already in the pool."""
+        with self._lock:
+            if url and all(endpoint.url != url for endpoint in self.endpoints):
+                self.endpoints.append(Endpoint(url))
+
+    def start(self):
+        """Start probing endpoints in the background."""
+        with self._lock:
+            if self._thread is None and self.endpoints:
+                self._thread = threading.Thread(target=self._run, name=f"rpc-pool-{self.chain}", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try:
+                self.probe()
+            except Exception as e:
+                logging.error("RPC pool probe on %s failed: %s", self.chain, e)
+            time.sleep(self.probe_interval)
+
+    def probe(self):
+        """Measure head block and latency of every endpoint concurrently, then update health."""
+        endpoints = list(self.endpoints)
+        if self._executor_size < len(endpoints):
+            self._executor = ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix=f"probe-{self.chain}")
+            self._executor_size = len(endpoints)
+        list(self._executor.map(self._probe_endpoint, endpoints))
+
+        heads = [endpoint.head for endpoint in endpoints if endpoint.head is not None and endpoint.failures == 0]
+        best_head = max(heads, default=None)
+        for endpoint in endpoints:
+            in_sync = best_head is None or (endpoint.head is not None and best_head - endpoint.head <= self.max_lag)
+            healthy = endpoint.failures < self.max_failures and in_sync
+            if healthy != endpoint.healthy:
+                logging.warning("%s endpoint %s is now %s (head %s, best %s, failures %d)", self.chain, endpoint.url,
+                                'healthy' if healthy else 'unhealthy', endpoint.head, best_head, endpoint.failures)
+            endpoint.healthy = healthy
+
+    @staticmethod
+    def _probe_endpoint(endpoint):
+        start = time.perf_counter()
+        try:
+            response = endpoint.provider.make_request('eth_blockNumber', [])
+            endpoint.record_success(time.perf_counter() - start, int(response['result'], 16))
+        except Exception as e:
+            endpoint.record_failure()
+            logging.debug("Probe of %s failed: %s", endpoint.url, e)
+
+    def ranked(self):
+        """Endpoints in routing order: healthy ones by latency, then the rest by failure count."""
+        def rank(endpoint):
+            return (not endpoint.healthy, endpoint.latency is None, endpoint.latency or 0, endpoint.failures)
+        return sorted(self.endpoints, key=rank)
+
+    def best(self):
+        """The endpoint reads should go to right now."""
+        if not self.endpoints:
+            raise ConnectionError(f"No RPC endpoints configured for {self.chain}")
+        return self.ranked()[0]
+
+
+class PooledProvider(BaseProvider):
+    """web3 provider that sends every request to the pool's current best endpoint.
+
+    Transport errors mark the endpoint as failing and the request is retried once
+    on the next endpoint in line.
+    """
+
+    def __init__(self, pool):
+        super().__init__()
+        self.pool = pool
+
+    def make_request(self, method, params):
+        candidates = self.pool.ranked()[:2]
+        for i, endpoint in enumerate(candidates):
+            try:
+                return endpoint.provider.make_request(method, params)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                endpoint.record_failure()
+                if endpoint.failures >= self.pool.max_failures:
+                    endpoint.healthy = False
+                if i == len(candidates) - 1:
+                    raise
+                logging.warning("%s endpoint %s failed (%s); retrying on next endpoint.", self.pool.chain, endpoint.url,
+                                e)
+        raise ConnectionError(f"No RPC endpoints configured for {self.pool.chain}")
+
+    def pinned(self):
+        """Provider of the current best endpoint, for requests that must all see the same node's chain view."""
+        return self.pool.best().provider
+
+    def is_connected(self, show_traceback=False):
+        return any(endpoint.provider.is_connected() for endpoint in self.pool.ranked()[:2])
+
+
+_pools = {}
+_web3s = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(chain, url=None):
+    """Return the process-wide pool of a chain, built from its configured RPC_URLS.
+
+    `url` is accepted for older callers but never joins the pool: live traffic only
+    goes to endpoints configured in the environment.
+    """
+    with _pools_lock:
+        pool = _pools.get(chain)
+        if pool is None:
+            pool = _pools[chain] = RpcPool(chain, RPC_URLS.get(chain, []))
+    if url and url not in RPC_URLS.get(chain, []):
+        logging.debug("Ignoring unconfigured %s endpoint %s; add it to %s_RPC_URLS to use it.", chain, url, chain)
+    return pool.start()
+
+
+def get_web3(chain, url=None):
+    """Return the shared Web3 instance of a chain, routed through its endpoint pool."""
+    pool = get_pool(chain, url)
+    with _pools_lock:
+        web3 = _web3s.get(chain)
+        if web3 is None:
+            web3 = _web3s[chain] = Web3(PooledProvider(pool))
+            if chain in POA_CHAINS:
+                web3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        return web3
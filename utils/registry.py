@@ -0,0 +1,152 @@
+# utils/registry.py
+import logging
+import os
+import threading
+from enum import Enum
+
+REGISTRY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'token_registry.log')
+
+
+class TokenState(Enum):
+    SEEN = 'seen'
+    ANALYZED = 'analyzed'
+    BOUGHT = 'bought'
+    REJECTED = 'rejected'
+
+
+def address_key(address):
+    """Normalize an address to its raw bytes: 20 bytes for EVM hex addresses, UTF-8 for anything else."""
+    if len(address) == 42 and address[:2] in ('0x', '0X'):
+        try:
+            return bytes.fromhex(address[2:])
+        except ValueError:
+            pass
+    return address.encode()
+
+
+class TokenRecord:
+    """What the bot knows about one token."""
+    __slots__ = ('address', 'chain', 'pair', 'state')
+
+    def __init__(self, address, chain, pair=None, state=TokenState.SEEN):
+        self.address = address
+        self.chain = chain
+        self.pair = pair
+        self.state = state
+
+
+class TokenRegistry:
+    """Every token and pair the bot has seen, keyed by (chain, normalized address bytes).
+
+    The same address may exist on several chains, so lookups take the chain; without
+    one they resolve to the first chain the address was registered on. Changes are
+    appended to a tab-separated log that is replayed on load and compacted when it
+    grows well past the number of tokens.
+    """
+
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        self._tokens = {}
+        self._chains = {}
+        self._pairs = set()
+        self._lock = threading.Lock()
+        self._log = None
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def _key(self, token, chain=None):
+        key = address_key(token)
+        if chain is None:
+            chains = self._chains.get(key)
+            chain = chains[0] if chains else None
+        return chain, key
+
+    def get(self, token, chain=None):
+        """Return the token's record, or None if it was never registered."""
+        return self._tokens.get(self._key(token, chain))
+
+    def chain_of(self, token):
+        record = self.get(token)
+        return record.chain if record else None
+
+    def seen_pair(self, pair, chain):
+        return (chain, address_key(pair)) in self._pairs
+
+    def _add(self, record):
+        key = address_key(record.address)
+        self._tokens[(record.chain, key)] = record
+        chains = self._chains.setdefault(key, [])
+        if record.chain not in chains:
+            chains.append(record.chain)
+        if record.pair is not None:
+            self._pairs.add((record.chain, address_key(record.pair)))
+
+    def register(self, token, chain, pair=None):
+        """Record a newly detected token and its pair; returns False if the pair or token is already known."""
+        with self._lock:
+            if pair is not None and (chain, address_key(pair)) in self._pairs:
+                return False
+            if (chain, address_key(token)) in self._tokens:
+                if pair is not None:
+                    self._pairs.add((chain, address_key(pair)))
+                return False
+            record = TokenRecord(token, chain, pair)
+            self._add(record)
+            self._append(record)
+            return True
+
+    def set_state(self, token, state, chain=None):
+        """Move a registered token to a new state."""
+        with self._lock:
+            record = self._tokens.get(self._key(token, chain))
+            if record is None or record.state == state:
+                return
+            record.state = state
+            self._append(record)
+
+    def _append(self, record):
+        if self.path is None:
+            return
+        try:
+            if self._log is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._log = open(self.path, 'a', buffering=1)
+            self._log.write(f"{record.address}\t{record.chain}\t{record.pair or '-'}\t{record.state.value}\n")
+        except OSError as e:
+            logging.warning("Failed to persist token %s to %s: %s", record.address, self.path, e)
+
+    def load(self):
+        """Replay the on-disk log into memory, compacting it if it has grown large."""
+        if self.path is None or not os.path.exists(self.path):
+            return self
+        lines = 0
+        with self._lock, open(self.path) as f:
+            for line in f:
+                try:
+                    address, chain, pair, state = line.rstrip('\n').split('\t')
+                    record = TokenRecord(address, chain, None if pair == '-' else pair, TokenState(state))
+                except ValueError:
+                    continue  # Torn last line after a crash
+                lines += 1
+                self._add(record)
+        logging.info("Loaded %s tokens from %s.", len(self._tokens), self.path)
+        if lines > 2 * len(self._tokens):
+            self.compact()
+        return self
+
+    def compact(self):
+        """Rewrite the log with one line per token."""
+        with self._lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                for record in self._tokens.values():
+                    f.write(f"{record.address}\t{record.chain}\t{record.pair or '-'}\t{record.state.value}\n")
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            os.replace(tmp_path, self.path)
+
+
+# Process-wide registry; sniper.main loads it from disk at startup
+token_registry = TokenRegistry()
@@ -0,0 +1,254 @@
+# utils/reserves.py
+import logging
+import threading
+from config import WRAPPED_NATIVE
+from utils.amm import SWAP_FEES, get_amount_out_exact
+
+# keccak256("Sync(uint112,uint112)")
+SYNC_TOPIC = "0x1c411e9a96e071241c2f21f7726b17ae89e3cab4c78be50e062b03a9fffbbad1"
+
+MAX_ADDRESSES_PER_QUERY = 1000
+
+# Pairs followed at most per chain; the oldest are dropped first
+MAX_TRACKED_PAIRS = 2000
+
+
+class PairReserves:
+    """Latest known reserves of one pair."""
+    __slots__ = ('token0', 'token1', 'reserve0', 'reserve1', 'position', 'created_block', 'synced')
+
+    def __init__(self, token0, token1, created_block):
+        self.token0 = token0
+        self.token1 = token1
+        self.reserve0 = 0
+        self.reserve1 = 0
+        self.position = (-1, -1)  # (block, log index) of the Sync applied last
+        self.created_block = created_block
+        self.synced = False  # True once the Sync logs since creation have been applied
+
+
+class ReserveIndex:
+    """In-memory reserves of every tracked pair of one chain, kept current from Sync logs.
+
+    Pairs are added as PairCreated events arrive; a background thread pulls the
+    Sync logs of all tracked pairs with eth_getLogs whenever the head moves, so
+    liquidity, price and price-impact queries are answered from memory.
+    Pairs are dropped once their token has been decided on (`untrack`), and
+    the oldest are evicted past `max_pairs` so the Sync query stays bounded.
+    """
+
+    def __init__(self, chain, poll_interval=1.0, max_pairs=MAX_TRACKED_PAIRS):
+        self.chain = chain
+        self.poll_interval = poll_interval
+        self.max_pairs = max_pairs
+        self.fee = SWAP_FEES.get(chain, SWAP_FEES['ETH'])
+        self.wrapped_native = WRAPPED_NATIVE.get(chain, '').lower()
+        self.pairs = {}
+        self.token_pairs = {}
+        self.last_block = None
+        self._new_pairs = []
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._synced = threading.Condition()
+        self._wake = threading.Event()
+        self._thread = None
+        self.provider = None
+
+    def track(self, pair, token0, token1, created_block):
+        """Start following a pair from the block it was created in."""
+        pair = pair.lower()
+        with self._lock:
+            if pair not in self.pairs:
+                self.pairs[pair] = PairReserves(token0.lower(), token1.lower(), created_block)
+                self._new_pairs.append(pair)
+                for token in (token0.lower(), token1.lower()):
+                    if token != self.wrapped_native:
+                        self.token_pairs.setdefault(token, pair)
+                while len(self.pairs) > self.max_pairs:
+                    self._remove(next(iter(self.pairs)))  # Insertion order: the oldest pair goes first
+        self._wake.set()
+
+    def untrack(self, token):
+        """Stop following the pair a token was listed in, e.g. once it was rejected or bought."""
+        with self._lock:
+            pair = self.token_pairs.get(token.lower())
+            if pair is not None:
+                self._remove(pair)
+
+    def _remove(self, pair):
+        reserves = self.pairs.pop(pair)
+        for token in (reserves.token0, reserves.token1):
+            if self.token_pairs.get(token) == pair:
+                del self.token_pairs[token]
+        if pair in self._new_pairs:
+            self._new_pairs.remove(pair)
+
+    def start(self, provider):
+        """Start following Sync logs in the background through `provider`."""
+        if self._thread is None:
+            self.provider = provider
+            self._thread = threading.Thread(target=self._run, name=f"reserves-{self.chain}", daemon=True)
+            self._thread.start()
+        return self
+
+    def on_new_head(self, chain, header):
+        """Head listener: pull the new block's Sync logs right away."""
+        if chain == self.chain:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                self.update(self.provider)
+            except Exception as e:
+                logging.error("Reserve update on %s failed: %s", self.chain, e)
+
+    def update(self, provider):
+        """Apply every Sync log of the tracked pairs up to the current head."""
+        with self._update_lock:
+            self._update(provider)
+
+    def _update(self, provider):
+        head = int(provider.provider.make_request('eth_blockNumber', [])['result'], 16)
+        with self._lock:
+            new_pairs, self._new_pairs = self._new_pairs, []
+            pending = set(new_pairs)
+            known_pairs = [pair for pair in self.pairs if pair not in pending]
+            created_blocks = {pair: self.pairs[pair].created_block for pair in new_pairs}
+        last_block = head - 1 if self.last_block is None else self.last_block
+        error = None
+
+        if known_pairs and last_block < head:
+            try:
+                self._apply_logs(provider, known_pairs, last_block + 1, head)
+                self.last_block = head
+            except Exception as e:
+                error = e  # Known pairs keep their cursor and retry the range next time
+        else:
+            self.last_block = max(last_block, head)
+
+        # Pairs seen for the first time are caught up from their creation block, those created in the same block together
+        groups, retry, synced = {}, [], []
+        for pair, created_block in created_blocks.items():
+            if created_block is not None and created_block > head:
+                retry.append(pair)  # The node has not reached the creation block yet
+            else:
+                groups.setdefault(created_block or head, []).append(pair)
+        for from_block, pairs in groups.items():
+            failed, group_error = self._catch_up(provider, pairs, from_block, head)
+            retry += failed
+            synced += [pair for pair in pairs if pair not in failed]
+            error = group_error or error
+
+        with self._lock:
+            # Retry their catch-up on the next update, unless they were untracked meanwhile
+            self._new_pairs.extend(pair for pair in retry if pair in self.pairs)
+            for pair in synced:
+                reserves = self.pairs.get(pair)
+                if reserves is not None:
+                    reserves.synced = True
+        if synced:
+            with self._synced:
+                self._synced.notify_all()
+        if error is not None:
+            raise error
+
+    def _catch_up(self, provider, pairs, from_block, to_block):
+        """Apply the Sync logs of new pairs; returns the pairs that failed and the error."""
+        try:
+            self._apply_logs(provider, pairs, from_block, to_block)
+            return [], None
+        except Exception as e:
+            error = e
+        if len(pairs) == 1:
+            return pairs, error
+        # Retry pair by pair, so one bad pair does not hold up the others
+        failed = []
+        for pair in pairs:
+            pair_failed, pair_error = self._catch_up(provider, [pair], from_block, to_block)
+            failed += pair_failed
+            error = pair_error or error
+        return failed, error if failed else None
+
+    def wait_synced(self, pair, timeout=5.0):
+        """Block until a freshly tracked pair has been caught up; False if that did not happen in time."""
+        reserves = self.pairs.get(pair.lower())
+        if reserves is None:
+            return False
+        with self._synced:
+            return self._synced.wait_for(lambda: reserves.synced, timeout)
+
+    def pair_for(self, token):
+        """The tracked pair a token was listed in, or None."""
+        return self.token_pairs.get(token.lower())
+
+    def _apply_logs(self, provider, pairs, from_block, to_block):
+        from utils.monitor import get_logs_chunked  # utils.monitor imports this module
+        for i in range(0, len(pairs), MAX_ADDRESSES_PER_QUERY):
+            log_filter = {'address': pairs[i:i + MAX_ADDRESSES_PER_QUERY], 'topics': [SYNC_TOPIC]}
+            for log in get_logs_chunked(provider.provider, log_filter, from_block, to_block):
+                self.apply_sync_log(log)
+
+    def apply_sync_log(self, log):
+        """Apply one raw Sync log; stale or reorged-out logs are ignored."""
+        reserves = self.pairs.get(log['address'].lower())
+        if reserves is None or log.get('removed'):
+            return
+        position = (int(log['blockNumber'], 16), int(log['logIndex'], 16))
+        if position <= reserves.position:
+            return
+        data = log['data']
+        reserves.reserve0 = int(data[2:66], 16)
+        reserves.reserve1 = int(data[66:130], 16)
+        reserves.position = position
+
+    def reserves_for(self, pair, token_in):
+        """Return (reserve_in, reserve_out) of a pair for a swap selling `token_in`, or None."""
+        reserves = self.pairs.get(pair.lower())
+        if reserves is None:
+            return None
+        token_in = token_in.lower()
+        if token_in == reserves.token0:
+            return reserves.reserve0, reserves.reserve1
+        if token_in == reserves.token1:
+            return reserves.reserve1, reserves.reserve0
+        return None
+
+    def native_liquidity(self, pair):
+        """Wrapped native coin held by the pair, in wei; None if the pair is not tracked or has no native side."""
+        reserves = self.reserves_for(pair, self.wrapped_native)
+        return reserves[0] if reserves else None
+
+    def price(self, pair, token):
+        """Spot price of `token` in units of the other token of the pair."""
+        reserves = self.reserves_for(pair, token)
+        if not reserves or not reserves[0]:
+            return None
+        return reserves[1] / reserves[0]
+
+    def amount_out(self, pair, token_in, amount_in):
+        """Output of a swap of `amount_in` of `token_in`, per the Uniswap V2 getAmountOut formula."""
+        reserve_in, reserve_out = self.reserves_for(pair, token_in) or (0, 0)
+        return get_amount_out_exact(amount_in, reserve_in, reserve_out, self.fee)
+
+    def price_impact(self, pair, token_in, amount_in):
+        """Fraction by which a swap's execution price is worse than the spot price (fee included)."""
+        reserve_in, reserve_out = self.reserves_for(pair, token_in) or (0, 0)
+        if amount_in <= 0 or not reserve_in or not reserve_out:
+            return None
+        return 1 - self.amount_out(pair, token_in, amount_in) * reserve_in / (amount_in * reserve_out)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_reserve_index(chain):
+    """Return the process-wide reserve index of a chain."""
+    with _indexes_lock:
+        index = _indexes.get(chain)
+        if index is None:
+            index = _indexes[chain] = ReserveIndex(chain)
+        return index
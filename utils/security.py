@@ -1,10 +1,7 @@
 # utils/security.py
 import os
 import logging
-from dotenv import load_dotenv
-
-# Load environment variables from the .env file
-load_dotenv()
+import config
 
 def validate_private_key(private_key):
     """Validate the format of a private key."""
@@ -24,6 +21,7 @@ def check_address_format(address):
 
 def get_wallet_details():
     """Retrieve and display wallet address and private key details."""
+    config.load()
     wallet_address = os.getenv("WALLET_ADDRESS")
     private_key = os.getenv("PRIVATE_KEY")
     
@@ -43,6 +41,7 @@ def get_wallet_details():
 
 def check_env_variables():
     """Check the presence of all required environment variables."""
+    config.load()
     required_env_vars = [
         "INFURA_PROJECT_ID",
         "PRIVATE_KEY",
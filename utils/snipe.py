@@ -2,61 +2,49 @@
 
 import logging
 import time
-import requests
 from web3 import Web3
+from utils.abi_registry import get_abi
 from utils.blockchain import Blockchain
+from utils.providers import get_web3
 from utils.wallet import buy_token
 from utils.monitor import Monitoring
 from modules.analyzer import analyze_token
 from config import (BSC_NODE_URL, WALLET_ADDRESS, PRIVATE_KEY, MAX_INVESTMENT_AMOUNT, 
                     ETHERSCAN_API_KEY, BSCSCAN_API_KEY)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+def fetch_abi_from_scan(chain, contract_address):
+    """Fetch the ABI of a contract from Etherscan or BscScan, through the shared ABI cache.
 
-def fetch_abi_from_scan(chain, contract_address, retries=3, delay=5):
-    """Fetch the ABI of a contract from Etherscan or BscScan."""
-    api_key = ETHERSCAN_API_KEY if chain == "ethereum" else BSCSCAN_API_KEY
-    scan_url = {
-        "ethereum": f"https://api.etherscan.io/api?module=contract&action=getabi&address={contract_address}&apikey={api_key}",
-        "bsc": f"https://api.bscscan.com/api?module=contract&action=getabi&address={contract_address}&apikey={api_key}"
-    }.get(chain)
-
-    if not scan_url:
+    Throttling and transient failures are retried by the explorer client with jittered backoff.
+    """
+    if chain not in ("ethereum", "bsc"):
         logging.error("Unsupported chain type.")
         return None
+    api_key = ETHERSCAN_API_KEY if chain == "ethereum" else BSCSCAN_API_KEY
 
-    for attempt in range(1, retries + 1):
-        try:
-            response = requests.get(scan_url)
-            data = response.json()
-            if data.get("status") == "1":
-                logging.info(f"Successfully fetched ABI for {contract_address} on {chain}.")
-                return data["result"]
-            else:
-                logging.warning(f"Attempt {attempt}/{retries} failed: {data.get('message', 'Unknown error')}")
-                time.sleep(delay)
-        except Exception as e:
-            logging.error(f"Error fetching ABI: {str(e)} - Attempt {attempt}/{retries}")
-            time.sleep(delay)
-
-    logging.error(f"Failed to fetch ABI for {contract_address} on {chain} after {retries} attempts.")
-    return None
+    try:
+        abi = get_abi(chain, contract_address, api_key)
+        logging.info("Successfully fetched ABI for %s on %s.", contract_address, chain)
+        return abi
+    except Exception as e:
+        logging.error("Failed to fetch ABI for %s on %s: %s", contract_address, chain, e)
+        return None
 
 
-def connect_to_blockchain(provider_url, retries=3, delay=5):
-    """Connect to a blockchain provider and return the Web3 object."""
+def connect_to_blockchain(provider_url, retries=3, delay=5, chain=None):
+    """Connect to a blockchain provider and return the chain's shared, pooled Web3 object."""
+    chain = chain or ('BSC' if 'bsc' in provider_url else 'ETH')
     for attempt in range(1, retries + 1):
-        provider = Web3(Web3.HTTPProvider(provider_url))
+        provider = get_web3(chain, provider_url)
         if provider.is_connected():
-            logging.info(f"Successfully connected to blockchain at {provider_url}")
+            logging.info("Successfully connected to blockchain at %s", provider_url)
             return provider
         else:
-            logging.warning(f"Connection attempt {attempt}/{retries} failed.")
+            logging.warning("Connection attempt %s/%s failed.", attempt, retries)
             time.sleep(delay)
 
-    logging.error(f"Failed to connect to the blockchain at {provider_url} after {retries} attempts.")
+    logging.error("Failed to connect to the blockchain at %s after %s attempts.", provider_url, retries)
     return None
 
 
@@ -90,30 +78,31 @@ def snipe_tokens(provider, router_address, chain, max_attempts=5, delay_between_
 
             for token in new_tokens:
                 if analyze_token(token, provider):
-                    logging.info(f"Attempting to snipe token: {token}")
+                    logging.info("Attempting to snipe token: %s", token)
                     success = False
                     attempts = 0
 
                     while not success and attempts < max_attempts:
                         try:
-                            buy_token(token, float(MAX_INVESTMENT_AMOUNT))
-                            logging.info(f"Successfully sniped token: {token}")
+                            buy_token(token, float(MAX_INVESTMENT_AMOUNT), 'BSC' if chain == 'bsc' else 'ETH')
+                            logging.info("Successfully sniped token: %s", token)
                             success = True
                         except Exception as e:
                             attempts += 1
-                            logging.error(f"Failed to snipe token {token}: {str(e)} - Attempt {attempts}/{max_attempts}")
+                            logging.error("Failed to snipe token %s: %s - Attempt %d/%d", token, e, attempts,
+                                          max_attempts)
                             if attempts < max_attempts:
                                 time.sleep(delay_between_attempts)
 
                     if not success:
-                        logging.error(f"Max attempts reached. Could not snipe token {token}. Moving to next.")
+                        logging.error("Max attempts reached. Could not snipe token %s. Moving to next.", token)
 
             time.sleep(delay_between_attempts)
 
     except KeyboardInterrupt:
         logging.info("Sniping process interrupted. Exiting gracefully...")
     except Exception as e:
-        logging.error(f"Unexpected error in sniping process: {str(e)}")
+        logging.error("Unexpected error in sniping process: %s", e)
 
 
 def main():
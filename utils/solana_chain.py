@@ -0,0 +1,82 @@
+# utils/solana_chain.py
+import logging
+import threading
+from solana.rpc.api import Client
+from solana.rpc.types import TxOpts
+from solana.transaction import Transaction
+from spl.token.constants import TOKEN_PROGRAM_ID
+from spl.token.instructions import create_associated_token_account, transfer as spl_transfer
+from config import SOLANA_RPC_URL, WALLET_ADDRESS
+from utils.solana_data import get_solana_data
+
+_client = None
+_client_lock = threading.Lock()
+
+def connect(url):
+    """A new Solana RPC client for `url`."""
+    return Client(url)
+
+def get_client(chain='SOL'):
+    """The shared Solana RPC client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            if not SOLANA_RPC_URL:
+                raise ValueError("SOLANA_RPC_URL is not set. Please check your .env file.")
+            _client = connect(SOLANA_RPC_URL)
+        return _client
+
+def get_or_create_associated_token_account(wallet_address, token_address):
+    """Get or create an associated token account for a specific token."""
+    try:
+        data = get_solana_data()
+        # Known ATAs come from the cache; unknown ones are read in the current account batch
+        ata, state = data.get_token_accounts(wallet_address, [token_address])[token_address]
+
+        if state is None:
+            logging.info("Creating associated token account for %s...", token_address)
+            transaction = Transaction().add(create_associated_token_account(wallet_address, token_address))
+            get_client().send_transaction(transaction, wallet_address)
+            data.remember_ata(wallet_address, token_address, {'mint': token_address, 'owner': wallet_address,
+                                                              'amount': 0})
+            logging.info("Created associated token account: %s", ata)
+        else:
+            logging.debug("Associated token account already exists: %s", ata)
+
+        return ata
+    except Exception as e:
+        logging.error("Failed to get or create associated token account: %s", e)
+        return None
+
+def trade_token(action, token, amount):
+    """Buy or sell a token on Solana."""
+    logging.info("Trading %s %s of token %s on Solana...", action, amount, token)
+
+    # Get or create the associated token account for the token
+    ata = get_or_create_associated_token_account(WALLET_ADDRESS, token)
+    if ata is None:
+        return None
+
+    # Create the instruction for the transfer
+    if action == 'buy':
+        # Placeholder: Implement buying logic here (you might need a swap instruction)
+        logging.info("Buying %s of token %s...", amount, token)  # Replace with actual swap logic
+        # Example: Add swap logic here using Serum DEX or similar
+
+    elif action == 'sell':
+        logging.info("Selling %s of token %s...", amount, token)
+        transaction = Transaction().add(
+            spl_transfer(
+                amount=amount,
+                source=ata,
+                dest=WALLET_ADDRESS,  # Or destination address for selling
+                owner=WALLET_ADDRESS,
+                token_program=TOKEN_PROGRAM_ID,
+            )
+        )
+
+        # Send the transaction
+        tx_hash = get_client().send_transaction(transaction, WALLET_ADDRESS, opts=TxOpts(skip_preflight=True))
+        get_solana_data().invalidate(ata)  # Its balance changed; re-read it next time
+        logging.info("Transaction sent! TX Hash: %s", tx_hash['result'])
+        return tx_hash['result']
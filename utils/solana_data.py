@@ -0,0 +1,196 @@
+# utils/solana_data.py
+import asyncio
+import base64
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+import requests
+from config import SOLANA_RPC_URL
+
+# getMultipleAccounts accepts at most this many keys per call
+MAX_ACCOUNTS_PER_CALL = 100
+
+# Programs whose accounts use the SPL token account layout (Token and Token-2022)
+TOKEN_PROGRAM_IDS = ('TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA', 'TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb')
+TOKEN_ACCOUNT_LEN = 165
+
+B58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+
+def b58encode(data):
+    value = int.from_bytes(data, 'big')
+    encoded = ''
+    while value:
+        value, remainder = divmod(value, 58)
+        encoded = B58_ALPHABET[remainder] + encoded
+    return '1' * (len(data) - len(data.lstrip(b'\0'))) + encoded
+
+
+def decode_token_account(data):
+    """Mint, owner and raw amount of an SPL token account's data (165-byte layout)."""
+    if len(data) < TOKEN_ACCOUNT_LEN:
+        raise ValueError(f"Not an SPL token account ({len(data)} bytes)")
+    return {
+        'mint': b58encode(data[0:32]),
+        'owner': b58encode(data[32:64]),
+        'amount': int.from_bytes(data[64:72], 'little'),
+    }
+
+
+@lru_cache(maxsize=4096)
+def associated_token_address(owner, mint):
+    """The associated token account of `owner` for `mint` (a PDA search, so results are cached)."""
+    from solders.pubkey import Pubkey  # Solana SDK is only needed once an address is derived
+    from spl.token.instructions import get_associated_token_address
+    return str(get_associated_token_address(Pubkey.from_string(owner), Pubkey.from_string(mint)))
+
+
+class SolanaData:
+    """Batched Solana account reads with a cache of our associated token accounts.
+
+    Account lookups requested within `window` seconds of each other, from any
+    thread or coroutine, are merged into getMultipleAccounts calls of up to 100
+    keys, all sent as one JSON-RPC batch request, so a burst of analyses or
+    trades costs one round trip. Known ATAs (and their last seen state) are
+    cached per (owner, mint) until `invalidate` is called for them after one of
+    our transactions touches them.
+    """
+
+    def __init__(self, url, window=0.005, commitment='confirmed', timeout=10):
+        self.url = url
+        self.window = window
+        self.commitment = commitment
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.round_trips = 0
+        self._pending = {}
+        self._flush_scheduled = False
+        self._atas = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='solana-data')
+
+    def fetch_accounts(self, pubkeys):
+        """Fetch accounts now, in one HTTP round trip; pubkey -> {'lamports', 'owner', 'data'} or None if missing."""
+        pubkeys = list(dict.fromkeys(pubkeys))
+        if not pubkeys:
+            return {}
+        chunks = [pubkeys[i:i + MAX_ACCOUNTS_PER_CALL] for i in range(0, len(pubkeys), MAX_ACCOUNTS_PER_CALL)]
+        calls = [{'jsonrpc': '2.0', 'id': i, 'method': 'getMultipleAccounts',
+                  'params': [chunk, {'encoding': 'base64', 'commitment': self.commitment}]}
+                 for i, chunk in enumerate(chunks)]
+        self.round_trips += 1
+        response = self.session.post(self.url, json=calls, timeout=self.timeout)
+        response.raise_for_status()
+        replies = {reply.get('id'): reply for reply in response.json()}
+
+        accounts = {}
+        for i, chunk in enumerate(chunks):
+            reply = replies.get(i, {})
+            if 'result' not in reply:
+                raise ValueError(f"getMultipleAccounts failed: {reply.get('error', reply)}")
+            for pubkey, value in zip(chunk, reply['result']['value']):
+                accounts[pubkey] = value and {
+                    'lamports': value['lamports'],
+                    'owner': value['owner'],
+                    'data': base64.b64decode(value['data'][0]),
+                }
+        return accounts
+
+    def request_accounts(self, pubkeys):
+        """Futures of accounts, fetched together with everything else requested within `window`."""
+        with self._lock:
+            futures = {}
+            for pubkey in pubkeys:
+                future = self._pending.get(pubkey)
+                if future is None:
+                    future = self._pending[pubkey] = Future()
+                futures[pubkey] = future
+            if futures and not self._flush_scheduled:
+                self._flush_scheduled = True
+                self._executor.submit(self._flush)
+        return futures
+
+    def _flush(self):
+        time.sleep(self.window)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flush_scheduled = False
+        try:
+            accounts = self.fetch_accounts(pending)
+        except Exception as e:
+            logging.error("Solana account batch of %d failed: %s", len(pending), e)
+            for future in pending.values():
+                future.set_exception(e)
+            return
+        for pubkey, future in pending.items():
+            future.set_result(accounts.get(pubkey))
+
+    def get_accounts(self, pubkeys):
+        """Blocking batched lookup: pubkey -> account or None."""
+        futures = self.request_accounts(pubkeys)
+        return {pubkey: future.result(self.timeout + self.window) for pubkey, future in futures.items()}
+
+    async def get_accounts_async(self, pubkeys):
+        """Batched lookup for coroutines: pubkey -> account or None."""
+        futures = self.request_accounts(pubkeys)
+        results = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures.values()))
+        return dict(zip(futures, results))
+
+    def _ata_lookups(self, owner, mints):
+        """Cached entries for the mints, and the addresses of the ones still to fetch."""
+        with self._lock:
+            cached = {mint: self._atas[(owner, mint)] for mint in mints if (owner, mint) in self._atas}
+        missing = {mint: associated_token_address(owner, mint) for mint in mints if mint not in cached}
+        return cached, missing
+
+    def _remember_atas(self, owner, missing, accounts):
+        entries = {}
+        with self._lock:
+            for mint, address in missing.items():
+                account = accounts.get(address)
+                state = account and decode_token_account(account['data'])
+                entries[mint] = self._atas[(owner, mint)] = (address, state)
+        return entries
+
+    def get_token_accounts(self, owner, mints):
+        """mint -> (ATA address, {'mint', 'owner', 'amount'} or None if it does not exist) for `owner`."""
+        cached, missing = self._ata_lookups(owner, mints)
+        if missing:
+            cached.update(self._remember_atas(owner, missing, self.get_accounts(missing.values())))
+        return cached
+
+    async def get_token_accounts_async(self, owner, mints):
+        cached, missing = self._ata_lookups(owner, mints)
+        if missing:
+            accounts = await self.get_accounts_async(missing.values())
+            cached.update(self._remember_atas(owner, missing, accounts))
+        return cached
+
+    def remember_ata(self, owner, mint, state):
+        """Record an ATA state we know without a lookup, e.g. one our own transaction just created."""
+        with self._lock:
+            self._atas[(owner, mint)] = (associated_token_address(owner, mint), state)
+
+    def invalidate(self, *addresses):
+        """Forget cached ATAs that one of our transactions touched; they are re-read on next use."""
+        addresses = set(addresses)
+        with self._lock:
+            for key in [key for key, (address, _) in self._atas.items() if address in addresses]:
+                del self._atas[key]
+
+
+_data = None
+_data_lock = threading.Lock()
+
+
+def get_solana_data():
+    """The shared Solana data layer for SOLANA_RPC_URL."""
+    global _data
+    with _data_lock:
+        if _data is None:
+            if not SOLANA_RPC_URL:
+                raise ValueError("SOLANA_RPC_URL is not set. Please check your .env file.")
+            _data = SolanaData(SOLANA_RPC_URL)
+        return _data
@@ -0,0 +1,164 @@
+# utils/templates.py
+import logging
+import threading
+import time
+from eth_account import Account
+from web3 import Web3
+from config import ROUTER_ADDRESSES, SWAP_GAS_LIMIT, WRAPPED_NATIVE
+from utils.broadcast import send_raw_transaction
+from utils.fees import get_fee_oracle
+from utils.journal import trade_journal
+from utils.metrics import metrics
+from utils.nonce import nonce_manager
+
+# bytes4(keccak256("swapExactETHForTokens(uint256,address[],address,uint256)"))
+SWAP_EXACT_ETH_FOR_TOKENS = bytes.fromhex("7ff36ab5")
+PATH_OFFSET = (4 * 32).to_bytes(32, 'big')  # `path` is encoded after the four head words
+DEADLINE_TTL = 300  # seconds a signed swap stays valid
+DEADLINE_MARGIN = 60  # rebuild the deadline word when less than this is left
+
+DETECTION_TTL = 600  # seconds a detection stamp waits for a buy before it is dropped
+
+# perf_counter() stamps of when each token was first detected, consumed by the buy path
+_detected_at = {}
+_detected_lock = threading.Lock()
+_detected_swept_at = 0.0
+
+
+def mark_detected(token, timestamp=None):
+    """Record when a token was first detected so its detection-to-broadcast time can be reported.
+
+    An earlier stamp (e.g. from its pending addLiquidity) is kept. Stamps of tokens
+    that are never bought, such as liquidity added to old pools, expire after DETECTION_TTL.
+    """
+    global _detected_swept_at
+    now = time.perf_counter()
+    with _detected_lock:
+        _detected_at.setdefault(token.lower(), timestamp or now)
+        if now - _detected_swept_at > DETECTION_TTL / 10:
+            _detected_swept_at = now
+            for key in [key for key, stamp in _detected_at.items() if now - stamp > DETECTION_TTL]:
+                del _detected_at[key]
+
+
+def pop_detected(token):
+    """Take the detection stamp of a token, or None if it has none."""
+    with _detected_lock:
+        return _detected_at.pop(token.lower(), None)
+
+
+def address_word(address):
+    """ABI-encode an address as a left-padded 32-byte word."""
+    return bytes(12) + bytes.fromhex(address[2:])
+
+
+class SwapTemplate:
+    """A swapExactETHForTokens transaction built ahead of time for one chain.
+
+    Everything except the token, amountOutMin and nonce is prepared in advance:
+    the calldata around the path, the gas limit, the chain id and the signing
+    key. Fee fields come from the chain's fee oracle cache and the nonce from
+    the local nonce manager, so filling in a pair costs no RPC before broadcast.
+    """
+
+    def __init__(self, provider, chain, wallet_address, private_key, value_wei, gas_limit=SWAP_GAS_LIMIT):
+        self.provider = provider
+        self.chain = chain
+        self.wallet_address = Web3.to_checksum_address(wallet_address)
+        self.value_wei = value_wei
+        self.gas_limit = gas_limit
+        self.router_address = Web3.to_checksum_address(ROUTER_ADDRESSES[chain])
+        self.last_timings = {}
+
+        self._account = Account.from_key(private_key)
+        self._fee_oracle = get_fee_oracle(provider, chain)
+        self._to_word = address_word(self.wallet_address.lower())
+        # path = [wrapped native, token]: the length word and first element never change
+        self._path_head = (2).to_bytes(32, 'big') + address_word(WRAPPED_NATIVE[chain].lower())
+        self._deadline = 0
+        self._middle = b''
+        self._lock = threading.Lock()
+
+    def prepare(self):
+        """Warm every cache the hot path relies on; call at startup and whenever convenient."""
+        if nonce_manager.peek(self.chain, self.wallet_address) is None:
+            nonce_manager.sync(self.provider, self.chain, self.wallet_address)
+        self._fee_oracle.fee_fields()
+        self._refresh_deadline()
+        return self
+
+    def _refresh_deadline(self):
+        with self._lock:
+            self._deadline = int(time.time()) + DEADLINE_TTL
+            # Static words between amountOutMin and the token: path offset, to, deadline, path head
+            self._middle = PATH_OFFSET + self._to_word + self._deadline.to_bytes(32, 'big') + self._path_head
+
+    def calldata(self, token, amount_out_min=0):
+        """Fill the token and amountOutMin into the pre-encoded calldata."""
+        if self._deadline - time.time() < DEADLINE_MARGIN:
+            self._refresh_deadline()
+        return SWAP_EXACT_ETH_FOR_TOKENS + amount_out_min.to_bytes(32, 'big') + self._middle + address_word(token.lower())
+
+    def sign(self, token, amount_out_min=0, value_wei=None):
+        """Return (signed transaction, nonce) for buying `token`."""
+        tx = {
+            'to': self.router_address,
+            'value': value_wei or self.value_wei,
+            'gas': self.gas_limit,
+            'data': self.calldata(token, amount_out_min),
+        }
+        tx.update(self._fee_oracle.fee_fields())
+        # The nonce is taken last so a failure above cannot leave a gap in the wallet's nonces
+        nonce = tx['nonce'] = nonce_manager.allocate(self.provider, self.chain, self.wallet_address)
+        try:
+            return self._account.sign_transaction(tx), nonce
+        except Exception:
+            nonce_manager.release(self.chain, self.wallet_address, nonce)
+            raise
+
+    def buy(self, token, amount_out_min=0, value_wei=None):
+        """Sign and broadcast a buy of `token`; returns the transaction hash."""
+        detected_at = pop_detected(token)
+        start = time.perf_counter()
+        signed_tx, nonce = self.sign(token, amount_out_min, value_wei)
+        signed = time.perf_counter()
+        metrics.stamp(token, 'signed', self.chain)
+        try:
+            tx_hash = send_raw_transaction(self.provider, self.chain, signed_tx)
+        except Exception as e:
+            if not nonce_manager.handle_error(self.provider, self.chain, self.wallet_address, e):
+                nonce_manager.release(self.chain, self.wallet_address, nonce)
+            raise
+        sent = time.perf_counter()
+        metrics.stamp(token, 'broadcast', self.chain)
+        metrics.track_receipt(self.provider, self.chain, token, tx_hash)
+
+        self.last_timings = {
+            'sign_ms': (signed - start) * 1000,
+            'send_ms': (sent - signed) * 1000,
+        }
+        metrics.observe('sign', self.chain, self.last_timings['sign_ms'])
+        metrics.observe('send', self.chain, self.last_timings['send_ms'])
+        if detected_at is not None:
+            self.last_timings['detection_to_broadcast_ms'] = (sent - detected_at) * 1000
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("Buy of %s on %s broadcast: %s %s", token, self.chain, tx_hash,
+                         ", ".join(f"{name}={value:.1f}" for name, value in self.last_timings.items()))
+        trade_journal.record('buy', chain=self.chain, token=token, tx_hash=tx_hash, nonce=nonce,
+                             value_wei=value_wei or self.value_wei, amount_out_min=amount_out_min, **self.last_timings)
+        return tx_hash
+
+
+_templates = {}
+_templates_lock = threading.Lock()
+
+
+def get_swap_template(provider, chain, wallet_address, private_key, value_wei):
+    """Return the prepared swap template of a chain, building it on first use with `value_wei` as its default size."""
+    with _templates_lock:
+        template = _templates.get(chain)
+        if template is None:
+            template = _templates[chain] = SwapTemplate(provider, chain, wallet_address, private_key, value_wei)
+    if not template._middle:
+        template.prepare()
+    return template
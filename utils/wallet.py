@@ -1,46 +1,25 @@
 # utils/wallet.py
 
 import logging
-import os
-import sys
+import time
 import requests
-from solana.rpc.api import Client
 from web3 import Web3
-from dotenv import load_dotenv
 from config import (
     WALLET_ADDRESS,
     PRIVATE_KEY,
-    ETHERSCAN_API_KEY,
-    BSCSCAN_API_KEY,
     SOLANA_RPC_URL,
+    ROUTER_ADDRESSES,
+    SWAP_GAS_LIMIT,
+    WRAPPED_NATIVE,
 )
-from utils.security import get_wallet_details
-from solana.transaction import Transaction
-from solana.system_program import TransferParams, transfer
-from spl.token.constants import TOKEN_PROGRAM_ID
-from spl.token.instructions import get_associated_token_address, create_associated_token_account, transfer as spl_transfer
-from spl.token import Token
-from solana.rpc.types import TxOpts
-
-# Load environment variables
-load_dotenv()
-
-# Initialize logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
-# Initialize Blockchain Clients
-solana_client = Client(SOLANA_RPC_URL)
-
-infura_url = os.getenv('INFURA_URL')
-if infura_url is None:
-    logging.error("Infura URL not found. Please check your .env file.")
-    sys.exit(1)
-
-eth_provider = Web3(Web3.HTTPProvider(infura_url))
-bsc_provider = Web3(Web3.HTTPProvider('https://bsc-dataseed.binance.org/'))
+from utils.abi_registry import get_abi, load_local_abi
+from utils.broadcast import send_raw_transaction
+from utils.chains import evm_chains, get_client, get_plugin, is_enabled
+from utils.explorer import explorer
+from utils.fees import get_fee_oracle
+from utils.metrics import metrics
+from utils.nonce import nonce_manager
+from utils.templates import get_swap_template
 
 def initialize_wallet():
     """Connect to the wallet using the provided address and private key."""
@@ -49,28 +28,20 @@ def initialize_wallet():
         private_key = PRIVATE_KEY.strip()
         return wallet_address, private_key
     except Exception as e:
-        logging.error(f"Failed to initialize wallet: {e}")
+        logging.error("Failed to initialize wallet: %s", e)
         return None, None
 
-def fetch_balance(url):
-    """Fetch balance from a given API URL."""
-    response = requests.get(url)
-    data = response.json()
-    
-    if data["status"] == "1":
-        return int(data["result"]) / 10**18  # Convert from Wei to respective cryptocurrency
-    else:
-        raise ValueError("Error fetching balance: " + data["message"])
+def fetch_balance(chain, address):
+    """Fetch a native coin balance through the shared block explorer client."""
+    return explorer.get_balance(chain, address) / 10**18  # Convert from Wei to respective cryptocurrency
 
 def get_eth_balance():
     """Fetch Ethereum balance of the configured wallet."""
-    url = f"https://api.etherscan.io/api?module=account&action=balance&address={WALLET_ADDRESS}&tag=latest&apikey={ETHERSCAN_API_KEY}"
-    return fetch_balance(url)
+    return fetch_balance('ETH', WALLET_ADDRESS)
 
 def get_bsc_balance():
     """Fetch Binance Smart Chain (BNB) balance of the configured wallet."""
-    url = f"https://api.bscscan.com/api?module=account&action=balance&address={WALLET_ADDRESS}&tag=latest&apikey={BSCSCAN_API_KEY}"
-    return fetch_balance(url)
+    return fetch_balance('BSC', WALLET_ADDRESS)
 
 def get_sol_balance():
     """Fetch Solana balance of the configured wallet."""
@@ -90,132 +61,172 @@ def get_sol_balance():
 
 def get_or_create_associated_token_account(wallet_address, token_address):
     """Get or create an associated token account for a specific token."""
+    return get_plugin('SOL').get_or_create_associated_token_account(wallet_address, token_address)
+
+def get_provider(chain):
+    """Return the Web3 provider of an EVM chain ('ETH' or 'BSC'), created on first use."""
+    if chain not in ('ETH', 'BSC'):
+        raise ValueError(f"Unsupported EVM chain: {chain}")
+    return get_client(chain)
+
+def prepare_buy_templates(amount, chains=None):
+    """Build and warm the swap templates of each enabled EVM chain so the first snipe pays no setup cost."""
+    wallet_address, private_key = initialize_wallet()
+    for chain in chains or evm_chains():
+        try:
+            get_swap_template(get_provider(chain), chain, wallet_address, private_key, Web3.to_wei(amount, 'ether'))
+            logging.info("Buy template ready on %s for %s per snipe.", chain, amount)
+        except Exception as e:
+            logging.error("Failed to prepare buy template on %s: %s", chain, e)
+
+def buy_token(token, amount, blockchain, amount_out_min=0):
+    """Buy `amount` (in the chain's native coin) worth of a token, receiving at least `amount_out_min` base units."""
+    return trade_token('buy', token, amount, blockchain, amount_out_min)
+
+def sell_token(token, amount, blockchain, amount_out_min=0):
+    """Sell `amount` (in token base units) of a token back to the chain's native coin."""
+    return trade_token('sell', token, amount, blockchain, amount_out_min)
+
+def trade_token(action, token, amount, blockchain_instance, amount_out_min=0):
+    """Buy or sell a token on the specified blockchain ('ETH', 'BSC', 'SOL' or a Blockchain instance)."""
+    chain = getattr(blockchain_instance, 'blockchain_type', blockchain_instance)
     try:
-        token = Token(solana_client, token_address, TOKEN_PROGRAM_ID, wallet_address)
-        ata = get_associated_token_address(wallet_address, token_address)
-
-        # Check if the associated token account exists
-        account_info = solana_client.get_account_info(ata)
-        if account_info['result']['value'] is None:
-            logging.info(f"Creating associated token account for {token_address}...")
-            transaction = Transaction().add(create_associated_token_account(wallet_address, token_address))
-            solana_client.send_transaction(transaction, wallet_address)
-            logging.info(f"Created associated token account: {ata}")
+        if chain in ['ETH', 'BSC']:
+            provider = get_provider(chain)
+            wallet_address, private_key = initialize_wallet()
+            if action == 'buy':
+                value_wei = Web3.to_wei(amount, 'ether')
+                template = get_swap_template(provider, chain, wallet_address, private_key, value_wei)
+                return template.buy(token, amount_out_min, value_wei)
+            return sell_evm_token(provider, chain, token, amount, amount_out_min)
+
+        elif chain == 'SOL':
+            return get_plugin('SOL').trade_token(action, token, amount)
+
         else:
-            logging.info(f"Associated token account already exists: {ata}")
+            raise ValueError(f"Unsupported blockchain: {chain}")
 
-        return ata
     except Exception as e:
-        logging.error(f"Failed to get or create associated token account: {e}")
-        return None
+        logging.error("Failed to %s token %s: %s", action, token, e)
+        raise
 
-def trade_token(action, token, amount, blockchain_instance):
-    """Buy or sell a token on the specified blockchain."""
+def sell_evm_token(provider, chain, token, amount, amount_out_min=0):
+    """Approve the router if needed and swap `amount` of a token for at least `amount_out_min` of the native coin."""
+    wallet_address, _ = initialize_wallet()
+    router_address = Web3.to_checksum_address(ROUTER_ADDRESSES[chain])
+    token_address = Web3.to_checksum_address(token)
+    router = provider.eth.contract(address=router_address, abi=get_abi(chain, router_address))
+    token_contract = provider.eth.contract(address=token_address, abi=load_local_abi('erc20.abi.json'))
+
+    if token_contract.functions.allowance(wallet_address, router_address).call() < amount:
+        send_contract_transaction(provider, chain, token_contract.functions.approve(router_address, 2**256 - 1),
+                                  gas_limit=100000)
+
+    deadline = int(time.time()) + 300
+    swap = router.functions.swapExactTokensForETHSupportingFeeOnTransferTokens(
+        amount, amount_out_min, [token_address, Web3.to_checksum_address(WRAPPED_NATIVE[chain])], wallet_address,
+        deadline)
+    return send_contract_transaction(provider, chain, swap, gas_limit=SWAP_GAS_LIMIT)
+
+def send_contract_transaction(provider, chain, contract_function, value_wei=0, gas_limit=SWAP_GAS_LIMIT):
+    """Sign and send a contract call with a locally allocated nonce and cached fee fields."""
+    wallet_address, private_key = initialize_wallet()
+    oracle = get_fee_oracle(provider, chain)
+    tx = {
+        'from': wallet_address,
+        'value': value_wei,
+        'gas': gas_limit,
+    }
+    tx.update(oracle.fee_fields())
+    tx = contract_function.build_transaction(tx)
+    tx_hash = sign_and_send(provider, chain, tx, private_key)
+    if tx_hash is None:
+        raise RuntimeError(f"Transaction to {tx['to']} was not sent")
+    return tx_hash
+
+def sign_and_send(provider, chain, tx, private_key):
+    """Fill in the nonce, sign and broadcast a transaction; returns its hash, or None on failure."""
+    wallet_address = tx['from']
+    nonce = None
     try:
-        if blockchain_instance.network in ['ETH', 'BSC']:
-            token_contract = blockchain_instance.w3.eth.contract(address=token, abi=TOKEN_ABI)  # Replace <TOKEN_ABI> with actual ABI
-            value_in_ether = amount * token_contract.functions.price().call()  # Adapt to your token's contract
-            tx_hash = send_transaction(blockchain_instance.provider, token, value_in_ether)
-            return tx_hash
-
-        elif blockchain_instance.network == 'SOL':
-            logging.info(f"Trading {action} {amount} of token {token} on Solana...")
-
-            # Get or create the associated token account for the token
-            ata = get_or_create_associated_token_account(WALLET_ADDRESS, token)
-            if ata is None:
-                return None
-
-            # Create the instruction for the transfer
-            if action == 'buy':
-                # Placeholder: Implement buying logic here (you might need a swap instruction)
-                logging.info(f"Buying {amount} of token {token}...")  # Replace with actual swap logic
-                # Example: Add swap logic here using Serum DEX or similar
-
-            elif action == 'sell':
-                logging.info(f"Selling {amount} of token {token}...")
-                transaction = Transaction().add(
-                    spl_transfer(
-                        amount=amount,
-                        source=ata,
-                        dest=WALLET_ADDRESS,  # Or destination address for selling
-                        owner=WALLET_ADDRESS,
-                        token_program=TOKEN_PROGRAM_ID,
-                    )
-                )
-
-                # Send the transaction
-                tx_hash = solana_client.send_transaction(transaction, WALLET_ADDRESS, opts=TxOpts(skip_preflight=True))
-                logging.info(f"Transaction sent! TX Hash: {tx_hash['result']}")
-                return tx_hash['result']
-
+        nonce = tx['nonce'] = nonce_manager.allocate(provider, chain, wallet_address)
+        with metrics.timer('sign', chain):
+            signed_tx = provider.eth.account.sign_transaction(tx, private_key)
+        with metrics.timer('send', chain):
+            tx_hash = send_raw_transaction(provider, chain, signed_tx)
+
+        logging.info("Transaction sent! TX Hash: %s", tx_hash)
+        return tx_hash
     except Exception as e:
-        logging.error(f"Failed to {action} token {token}: {str(e)}")
-        raise
+        logging.error("Failed to send transaction: %s", e)
+        if nonce is not None and not nonce_manager.handle_error(provider, chain, wallet_address, e):
+            nonce_manager.release(chain, wallet_address, nonce)
+        return None
 
-def send_transaction(provider, to_address, value_in_ether, gas_limit=21000, gas_price_wei=None):
+def send_transaction(provider, to_address, value_in_ether, gas_limit=21000, gas_price_wei=None, chain=None):
     """
     Send a transaction on the specified provider (ETH or BSC).
     
     Args:
-        provider (Web3): Blockchain provider (e.g., eth_provider or bsc_provider)
+        provider (Web3): Blockchain provider (e.g., get_provider('ETH'))
         to_address (str): Recipient address
         value_in_ether (float): Amount to send
         gas_limit (int): Gas limit for the transaction
-        gas_price_wei (int, optional): Custom gas price in wei; defaults to current network gas price
+        gas_price_wei (int, optional): Custom legacy gas price in wei; defaults to the chain's cached
+            fee oracle (EIP-1559 fields on ETH, gas price on BSC)
+        chain (str, optional): 'ETH' or 'BSC'; inferred from the provider when omitted
 
     Returns:
         str: Transaction hash, if successful
     """
+    chain = chain or ('BSC' if is_enabled('BSC') and provider is get_provider('BSC') else 'ETH')
+    wallet_address, private_key = initialize_wallet()
     try:
-        wallet_address, private_key = get_wallet_details()
         tx = {
             'from': wallet_address,
             'to': to_address,
             'value': Web3.to_wei(value_in_ether, 'ether'),
             'gas': gas_limit,
-            'gasPrice': gas_price_wei or provider.eth.gas_price,
-            'nonce': provider.eth.get_transaction_count(wallet_address),
         }
-
-        signed_tx = provider.eth.account.sign_transaction(tx, private_key)
-        tx_hash = provider.eth.send_raw_transaction(signed_tx.rawTransaction)
-
-        logging.info(f"Transaction sent! TX Hash: {Web3.to_hex(tx_hash)}")
-        return Web3.to_hex(tx_hash)
+        if gas_price_wei:
+            tx['chainId'] = provider.eth.chain_id
+            tx['gasPrice'] = gas_price_wei
+        else:
+            tx.update(get_fee_oracle(provider, chain).fee_fields())
     except Exception as e:
-        logging.error(f"Failed to send transaction: {e}")
+        logging.error("Failed to send transaction: %s", e)
         return None
+    return sign_and_send(provider, chain, tx, private_key)
 
 def log_wallet_balances():
     """Fetch and log wallet balances for ETH, BSC, and Solana."""
     try:
         eth_balance = get_eth_balance()
-        logging.info(f"Ethereum balance: {eth_balance} ETH")
+        logging.info("Ethereum balance: %s ETH", eth_balance)
     except Exception as e:
-        logging.error("Could not fetch Ethereum balance: " + str(e))
+        logging.error("Could not fetch Ethereum balance: %s", e)
 
     try:
         bnb_balance = get_bsc_balance()
-        logging.info(f"Binance Smart Chain balance: {bnb_balance} BNB")
+        logging.info("Binance Smart Chain balance: %s BNB", bnb_balance)
     except Exception as e:
-        logging.error("Could not fetch Binance Smart Chain balance: " + str(e))
+        logging.error("Could not fetch Binance Smart Chain balance: %s", e)
 
     try:
         sol_balance = get_sol_balance()
-        logging.info(f"Solana balance: {sol_balance} SOL")
+        logging.info("Solana balance: %s SOL", sol_balance)
     except Exception as e:
-        logging.error("Could not fetch Solana balance: " + str(e))
+        logging.error("Could not fetch Solana balance: %s", e)
 
 # Entry Point
 if __name__ == "__main__":
     # Check provider connections
-    if eth_provider.is_connected():
+    if get_provider('ETH').is_connected():
         logging.info("Connected to Ethereum!")
     else:
         logging.error("Failed to connect to Ethereum.")
 
-    if bsc_provider.is_connected():
+    if get_provider('BSC').is_connected():
         logging.info("Connected to Binance Smart Chain!")
     else:
         logging.error("Failed to connect to Binance Smart Chain.")